@@ -0,0 +1,281 @@
+"""
+Asyncio Hand Streaming
+Async iteration over detection results with capture and inference in worker threads
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from capture import CaptureThread, FrameRing, detector_time
+
+Source = Union[int, str, cv2.VideoCapture]
+
+
+@dataclass
+class FrameResult:
+    """Detection output for one processed frame"""
+    index: int
+    timestamp: float           # Capture time (time.time())
+    hands: List[Dict]
+    frame: Optional[np.ndarray] = None
+    dropped: int = 0           # Frames skipped so far (capture and delivery)
+
+
+class LatestQueue:
+    """
+    Bounded asyncio queue that drops the oldest item instead of blocking
+
+    With maxsize=1 a slow consumer always gets the newest result and never
+    holds up the producer, or any other consumer.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self.maxsize = max(1, maxsize)
+        self._items = deque()
+        self._event = asyncio.Event()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.dropped = 0
+
+    def put_nowait(self, item: Any):
+        """Add an item, dropping the oldest when full (ignored once closed)"""
+        if self._closed:
+            return
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(item)
+        self._event.set()
+
+    async def get(self) -> Any:
+        """
+        Oldest queued item
+
+        Raises:
+            StopAsyncIteration: closed and drained
+            Exception: the error the queue was closed with
+        """
+        while not self._items:
+            if self._closed:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+            self._event.clear()
+            await self._event.wait()
+        return self._items.popleft()
+
+    def close(self, error: Optional[BaseException] = None):
+        """No more items; waiting consumers finish after draining"""
+        self._closed = True
+        self._error = error
+        self._event.set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self.get()
+
+
+def _open_capture(source: Source, resolution: Optional[Tuple[int, int]]) -> cv2.VideoCapture:
+    cap = source if isinstance(source, cv2.VideoCapture) else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open source: {source}")
+    if resolution is not None and isinstance(source, int):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+async def stream_hands(detector, source: Source = 0, maxsize: int = 1, flip: bool = False,
+                       resolution: Optional[Tuple[int, int]] = None, include_frame: bool = False,
+                       skip_frames: Optional[bool] = None) -> AsyncIterator[FrameResult]:
+    """
+    Detect hands on a camera or video without blocking the event loop
+
+    For live sources a capture thread keeps only the newest frame; files are
+    read frame by frame. Detection runs on one dedicated executor thread
+    (detectors are not thread-safe) and its results go through a LatestQueue,
+    so a slow consumer skips results instead of building up latency. Leaving
+    the loop or cancelling the task stops capture and releases the source.
+
+    Args:
+        detector: Anything with detect_hands(frame, timestamp) -> (frame, hands)
+        source: Camera index, video path/URL, or an opened VideoCapture
+        maxsize: Results buffered for the consumer (1 = latest only)
+        flip: Mirror frames before detection, like the live app
+        resolution: (width, height) requested from cameras
+        include_frame: Attach the processed frame to each result
+        skip_frames: Detect only the newest captured frame (default: cameras
+            only; video files are read in full)
+
+    Yields:
+        FrameResult per processed frame
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HandDetect")
+    results = LatestQueue(maxsize)
+    capture: Optional[CaptureThread] = None
+
+    async def next_frame() -> Optional[Tuple[np.ndarray, float, float]]:
+        """(frame, capture time, detector clock), or None at the end"""
+        if capture is None:
+            ret, frame = await loop.run_in_executor(executor, cap.read)
+            if not ret:
+                return None
+            timestamp = time.time()
+            return frame, timestamp, detector_time(cap, isinstance(source, int), timestamp)
+        while True:
+            item = await loop.run_in_executor(executor, capture.ring.get_latest, 0.1)
+            if item is not None:
+                return item[0], item[1], item[1]
+            if capture.ring.closed:
+                return None
+
+    async def detect_loop():
+        index = 0
+        try:
+            while True:
+                item = await next_frame()
+                if item is None:
+                    break
+                frame, timestamp, clock = item
+                if flip:
+                    frame = cv2.flip(frame, 1)
+                frame, hands = await loop.run_in_executor(executor, detector.detect_hands, frame, clock)
+                # The detector refills its result buffer on the next call
+                hands = hands.copy()
+                dropped = results.dropped + (capture.ring.dropped if capture is not None else 0)
+                results.put_nowait(FrameResult(index, timestamp, hands,
+                                               frame if include_frame else None, dropped))
+                index += 1
+            results.close()
+        except asyncio.CancelledError:
+            results.close()
+            raise
+        except Exception as e:
+            results.close(e)
+
+    cap = None
+    try:
+        cap = await loop.run_in_executor(executor, _open_capture, source, resolution)
+        if skip_frames if skip_frames is not None else isinstance(source, int):
+            capture = CaptureThread(cap, FrameRing(capacity=1))
+            capture.start()
+        producer = asyncio.ensure_future(detect_loop())
+        try:
+            async for result in results:
+                yield result
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+    finally:
+        # Wait off-loop for the in-flight read/detection before releasing
+        if capture is not None:
+            capture.ring.close()
+            await loop.run_in_executor(None, capture.stop)
+        await loop.run_in_executor(None, executor.shutdown, True)
+        if cap is not None:
+            cap.release()
+
+
+class ResultHub:
+    """
+    Fans one detection stream out to any number of async consumers
+
+    Each subscriber has its own LatestQueue, so a slow client only drops its
+    own results; no thread is created per client.
+    """
+
+    def __init__(self, results: AsyncIterator[FrameResult]):
+        """
+        Initialize hub
+
+        Args:
+            results: Source stream, e.g. detector.stream(0)
+        """
+        self.results = results
+        self._subscribers: List[LatestQueue] = []
+        self.latest: Optional[FrameResult] = None
+
+    def subscribe(self, maxsize: int = 1) -> LatestQueue:
+        """New consumer queue; iterate it with `async for`"""
+        queue = LatestQueue(maxsize)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: LatestQueue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+        queue.close()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'subscribers': len(self._subscribers),
+            'dropped': sum(q.dropped for q in self._subscribers),
+        }
+
+    async def run(self):
+        """Pump the source into every subscriber until it ends or is cancelled"""
+        error = None
+        try:
+            async for result in self.results:
+                self.latest = result
+                for queue in self._subscribers:
+                    queue.put_nowait(result)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            for queue in self._subscribers:
+                queue.close(error)
+            close = getattr(self.results, 'aclose', None)
+            if close is not None:
+                await close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from hand_detection import HandDetector
+
+    parser = argparse.ArgumentParser(description="Print hand detection results from an asyncio loop")
+    parser.add_argument("--source", type=str, default="0", help="Camera ID or video file")
+    parser.add_argument("--flip", action="store_true", help="Mirror frames before detection")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="Stop after this many seconds (0 = until the source ends)")
+
+    args = parser.parse_args()
+    source = int(args.source) if args.source.isdigit() else args.source
+
+    async def main():
+        start = time.time()
+        async for result in HandDetector().stream(source, flip=args.flip):
+            gestures = ', '.join(f"{h['id']}:{h['gesture']['name']}" for h in result.hands)
+            print(f"[{result.index}] {len(result.hands)} hands {gestures} (dropped {result.dropped})")
+            if args.duration and time.time() - start >= args.duration:
+                break
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,588 @@
+"""
+Microbenchmark Suite
+Measures detection features, gesture rules, drawing and controllers on
+synthetic or recorded landmark sets, with JSON baselines for regression checks
+"""
+
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import hand_detection
+from gesture_controller import ControlMode, GestureController, VirtualKeyboard
+from gesture_registry import GestureRegistry, default_gestures
+from hand_detection import FallbackHandDetector, HandDetector, ReplayDetector
+from landmark_features import HandFeatures, to_pixels
+from landmark_recording import HANDEDNESS, LandmarkRecorder, LandmarkRecording
+
+HAND_COUNTS = [1, 2, 4]
+FRAME_SIZES = [(640, 360), (1280, 720), (1920, 1080)]
+BATCHES = 64
+RULE_COUNTS = [6, 40]
+
+# detect_hands runs with the model stubbed out, on a small frame so the color
+# conversion does not hide the per-hand cost; it must beat the legacy loop
+DETECT_HAND_COUNTS = [1, 2]
+DETECT_FRAME_SIZE = (128, 72)
+
+# Feature columns synthetic rules draw from, with a typical threshold range each
+RULE_FEATURES = {
+    'curls': ([f'curls[{i}]' for i in range(5)], (0.2, 0.8)),
+    'tip_distances': ([f'tip_distances[{i}]' for i in range(10)], (0.02, 0.3)),
+    'orientation': (['orientation'], (-60.0, 60.0)),
+    'thumb_up': (['thumb_up'], (0.2, 0.8)),
+}
+
+# Open right hand, normalized image coordinates
+TEMPLATE_HAND = np.array([
+    [0.50, 0.80, 0.00],
+    [0.44, 0.76, -0.02], [0.40, 0.70, -0.03], [0.37, 0.65, -0.04], [0.34, 0.61, -0.05],
+    [0.46, 0.62, -0.01], [0.45, 0.54, -0.02], [0.45, 0.49, -0.03], [0.45, 0.45, -0.03],
+    [0.50, 0.61, -0.01], [0.50, 0.52, -0.02], [0.50, 0.47, -0.03], [0.50, 0.42, -0.03],
+    [0.54, 0.62, -0.01], [0.55, 0.54, -0.02], [0.55, 0.49, -0.03], [0.56, 0.45, -0.03],
+    [0.58, 0.64, -0.01], [0.60, 0.58, -0.02], [0.61, 0.54, -0.03], [0.62, 0.51, -0.03],
+], dtype=np.float32)
+
+
+def synthetic_hands(count: int, seed: int = 0) -> np.ndarray:
+    """Generate `count` plausible hands by scaling, shifting and jittering a template"""
+    rng = np.random.default_rng(seed)
+    wrist = TEMPLATE_HAND[0]
+    scale = rng.uniform(0.6, 1.4, size=(count, 1, 1)).astype(np.float32)
+    shift = rng.uniform(-0.25, 0.25, size=(count, 1, 3)).astype(np.float32)
+    shift[..., 2] = 0
+    hands = (TEMPLATE_HAND - wrist) * scale + wrist + shift
+    hands += rng.normal(0, 0.01, size=hands.shape).astype(np.float32)
+
+    # Curl a random subset of fingers onto their MCP joints
+    curled = rng.random((count, 5)) < 0.4
+    for finger, (mcp, tip) in enumerate([(2, 4), (5, 8), (9, 12), (13, 16), (17, 20)]):
+        rows = np.nonzero(curled[:, finger])[0]
+        hands[rows, mcp + 1:tip + 1] = hands[rows, mcp:mcp + 1] + 0.01
+    return np.clip(hands, 0.0, 1.0)
+
+
+def recorded_hands(path: str) -> np.ndarray:
+    """All hands in a landmark recording as one (hands, 21, 3) array"""
+    recording = LandmarkRecording(path)
+    hands = [chunk_hands['landmarks'] for _, chunk_hands, _ in recording.chunks if len(chunk_hands)]
+    if not hands:
+        raise ValueError(f"Recording has no hands: {path}")
+    return np.concatenate(hands)
+
+
+def make_batches(pool: np.ndarray, hands: int, batches: int = BATCHES) -> List[np.ndarray]:
+    """Cut a hand pool into batches of `hands` so ops do not reuse one input"""
+    idx = np.arange(batches * hands) % len(pool)
+    return [pool[idx[i * hands:(i + 1) * hands]] for i in range(batches)]
+
+
+def synthetic_registry(rules: int, features: int, seed: int = 0) -> GestureRegistry:
+    """Registry of `rules` random 2-4 condition rules over the first `features` RULE_FEATURES"""
+    rng = np.random.default_rng(seed)
+    refs = [(ref, bounds) for columns, bounds in list(RULE_FEATURES.values())[:features]
+            for ref in columns]
+    registry = GestureRegistry()
+    for r in range(rules):
+        conditions = []
+        for k in rng.choice(len(refs), size=min(len(refs), rng.integers(2, 5)), replace=False):
+            ref, (lo, hi) = refs[k]
+            conditions.append((ref, '<' if rng.random() < 0.5 else '>', rng.uniform(lo, hi)))
+        registry.add_rule(f"rule{r}", conditions)
+    return registry
+
+
+def make_detector(pool: np.ndarray) -> ReplayDetector:
+    """Replay detector over a throwaway recording of the pool"""
+    fd, path = tempfile.mkstemp(suffix=".hlmk")
+    os.close(fd)
+    with LandmarkRecorder(path, (1280, 720)) as recorder:
+        recorder.write_frame(pool[:1], ['Right'], [1.0], 0.0)
+    detector = ReplayDetector(path)
+    if os.name != 'nt':
+        os.unlink(path)  # The mapping stays valid after unlinking
+    return detector
+
+
+def build_hands_data(detector: ReplayDetector, batch: np.ndarray,
+                     frame_size: Tuple[int, int]) -> List[Dict]:
+    """Hand dicts for a batch at a given frame size"""
+    features = HandFeatures(batch, frame_size)
+    handedness = [HANDEDNESS[i % 2] for i in range(len(batch))]
+    return detector._build_hands(features, handedness, [0.9] * len(batch))
+
+
+def read_features(features: HandFeatures) -> HandFeatures:
+    """Compute every lazy feature array once"""
+    for name in ('landmarks_px', 'centers', 'bboxes', 'curls', 'tip_distances', 'volume'):
+        getattr(features, name)
+    return features
+
+
+class CannedHands:
+    """Stand-in for mediapipe Hands returning prepared results in turn"""
+
+    def __init__(self, results: List[SimpleNamespace]):
+        self.results = results
+        self.calls = 0
+
+    def process(self, image: np.ndarray) -> SimpleNamespace:
+        result = self.results[self.calls % len(self.results)]
+        self.calls += 1
+        return result
+
+
+def mediapipe_result(batch: np.ndarray) -> SimpleNamespace:
+    """A MediaPipe Hands result holding a batch of hands"""
+    return SimpleNamespace(
+        multi_hand_landmarks=[
+            SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand])
+            for hand in batch.tolist()
+        ],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label=HANDEDNESS[(i + 1) % 2], score=0.9)])
+            for i in range(len(batch))
+        ],
+    )
+
+
+def drifting_results(pool: np.ndarray, hands: int, batches: int = BATCHES) -> List[SimpleNamespace]:
+    """Results of `hands` hands sliding back and forth, so tracks and filter state carry over"""
+    steps = np.minimum(np.arange(batches), batches - np.arange(batches))
+    return [mediapipe_result(pool[:hands] + np.float32(0.002 * step)) for step in steps]
+
+
+def stubbed_detector(results: List[SimpleNamespace]) -> HandDetector:
+    """Default HandDetector (smoothing, tracking, gestures) whose model returns `results`"""
+    solutions = SimpleNamespace(
+        hands=SimpleNamespace(Hands=lambda **kwargs: CannedHands(results)), drawing_utils=None)
+    installed = hand_detection.mp
+    hand_detection.mp = SimpleNamespace(solutions=solutions)
+    try:
+        return HandDetector()
+    finally:
+        hand_detection.mp = installed
+
+
+class LegacyDetector:
+    """
+    detect_hands as it was before the feature engine, where every feature walks
+    per-landmark Python tuples. Kept as the speed floor detect_hands must beat.
+    """
+
+    fingertips = [4, 8, 12, 16, 20]
+    finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+
+    def __init__(self, hands: CannedHands):
+        self.hands = hands
+        self.hand_trails = {0: deque(maxlen=30), 1: deque(maxlen=30)}
+
+    def detect_hands(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w, c = frame.shape
+        results = self.hands.process(frame_rgb)
+        hands_data = []
+        if results.multi_hand_landmarks and results.multi_handedness:
+            for hand_idx, (landmarks, handedness) in enumerate(
+                zip(results.multi_hand_landmarks, results.multi_handedness)
+            ):
+                hand_info = {
+                    'id': hand_idx,
+                    'handedness': handedness.classification[0].label,
+                    'confidence': handedness.classification[0].score,
+                    'landmarks': [],
+                    'landmarks_px': [],
+                }
+                for lm in landmarks.landmark:
+                    hand_info['landmarks'].append((lm.x, lm.y, lm.z))
+                    hand_info['landmarks_px'].append((int(lm.x * w), int(lm.y * h)))
+                hand_info['center'] = self._get_hand_center(hand_info['landmarks_px'])
+                hand_info['bbox'] = self._get_bounding_box(hand_info['landmarks_px'])
+                hand_info['gesture'] = self._recognize_gesture(hand_info['landmarks'])
+                hand_info['fingertip_distances'] = self._get_fingertip_distances(hand_info['landmarks'])
+                hand_info['volume_control'] = self._calculate_volume_level(hand_info['landmarks'])
+                hands_data.append(hand_info)
+                if hand_idx < 2:
+                    self.hand_trails[hand_idx].append(hand_info['center'])
+        return frame, hands_data
+
+    def _get_hand_center(self, landmarks_px: List[Tuple[int, int]]) -> Tuple[int, int]:
+        x_coords = [p[0] for p in landmarks_px]
+        y_coords = [p[1] for p in landmarks_px]
+        return (int(np.mean(x_coords)), int(np.mean(y_coords)))
+
+    def _get_bounding_box(self, landmarks_px: List[Tuple[int, int]]) -> Tuple[int, int, int, int]:
+        x_coords = [p[0] for p in landmarks_px]
+        y_coords = [p[1] for p in landmarks_px]
+        margin = 20
+        return (max(0, min(x_coords) - margin), max(0, min(y_coords) - margin),
+                max(x_coords) + margin, max(y_coords) + margin)
+
+    def _recognize_gesture(self, landmarks: List[Tuple[float, float, float]]) -> Dict:
+        fingertips = [landmarks[i] for i in self.fingertips]
+        curls = self._calculate_finger_curl(landmarks)
+        thumb_index_dist = self._distance(landmarks[4], landmarks[8])
+        thumb_middle_dist = self._distance(landmarks[4], landmarks[12])
+        index_middle_dist = self._distance(landmarks[8], landmarks[12])
+
+        gesture_name = "Unknown"
+        confidence = 0.0
+        if sum(curls) < 1.5:
+            gesture_name, confidence = "Open Palm", 0.95
+        elif sum(curls) > 4.0:
+            gesture_name, confidence = "Fist", 0.95
+        elif curls[0] < 0.5 and sum(curls[1:]) > 3.5:
+            if landmarks[4][1] < landmarks[3][1] < landmarks[2][1]:
+                gesture_name, confidence = "Thumbs Up", 0.85
+        elif thumb_index_dist < 0.05 and sum(curls[1:]) < 2.0:
+            gesture_name, confidence = "OK Sign", 0.90
+        elif curls[1] < 0.5 and curls[2] < 0.5 and curls[3] > 0.8 and curls[4] > 0.8:
+            gesture_name, confidence = "Peace Sign", 0.90
+        else:
+            gesture_name, confidence = "Open Palm", 0.5
+        return {'name': gesture_name, 'confidence': confidence, 'curls': curls}
+
+    def _calculate_finger_curl(self, landmarks: List[Tuple[float, float, float]]) -> List[float]:
+        curls = []
+        finger_indices = [[2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 16], [17, 18, 19, 20]]
+        for finger in finger_indices:
+            tip_pos = landmarks[finger[-1]]
+            distances = []
+            for i in range(len(finger) - 1):
+                distances.append(self._distance(landmarks[finger[i]], tip_pos))
+            curls.append(1.0 if min(distances) < 0.1 else 0.0)
+        return curls
+
+    def _get_fingertip_distances(self, landmarks: List[Tuple[float, float, float]]) -> Dict[str, float]:
+        distances = {}
+        for i, name1 in enumerate(self.finger_names):
+            for j, name2 in enumerate(self.finger_names):
+                if i < j:
+                    distances[f"{name1}-{name2}"] = self._distance(
+                        landmarks[self.fingertips[i]], landmarks[self.fingertips[j]])
+        return distances
+
+    def _calculate_volume_level(self, landmarks: List[Tuple[float, float, float]]) -> float:
+        return max(0, min(100, self._distance(landmarks[4], landmarks[8]) * 333))
+
+    @staticmethod
+    def _distance(p1: Tuple[float, float, float], p2: Tuple[float, float, float]) -> float:
+        return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2)
+
+
+def make_skin_frame(batch: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+    """Frame with each hand's landmark hull filled in a skin tone on a noisy background"""
+    w, h = frame_size
+    rng = np.random.default_rng(0)
+    frame = rng.integers(20, 90, (h, w, 3), dtype=np.uint8)
+    for points in to_pixels(batch, w, h):
+        cv2.fillConvexPoly(frame, cv2.convexHull(points), (80, 120, 200))
+    return frame
+
+
+def calibrate(fn: Callable[[int], object], seconds: float) -> int:
+    """Iterations of a benchmark body that take about `seconds`"""
+    iterations = 1
+    while True:
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            fn(i)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= seconds * 1e9 / 4 or iterations >= 1 << 24:
+            break
+        iterations *= 2
+    return max(1, int(iterations * seconds * 1e9 / max(elapsed, 1)))
+
+
+def measure(fn: Callable[[int], object], min_time: float = 0.2, repeats: int = 5) -> Dict[str, float]:
+    """
+    Time a benchmark body
+
+    Args:
+        fn: Callable taking the iteration index
+        min_time: Minimum seconds per repeat
+        repeats: Timed repeats; the median is reported
+
+    Returns:
+        ns_per_op, ops_per_sec and peak_alloc_bytes (peak traced memory of one call)
+    """
+    iterations = calibrate(fn, min_time)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            fn(i)
+        samples.append((time.perf_counter_ns() - start) / iterations)
+    ns_per_op = float(np.median(samples))
+
+    tracemalloc.start()
+    fn(0)
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    fn(1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'ns_per_op': ns_per_op,
+        'ops_per_sec': 1e9 / ns_per_op if ns_per_op > 0 else 0.0,
+        'peak_alloc_bytes': max(0, peak - baseline),
+        'iterations': iterations,
+    }
+
+
+def detect_hands_bodies(pool: np.ndarray, hands: int) -> Tuple[Callable[[int], object],
+                                                                Callable[[int], object]]:
+    """
+    Whole detect_hands frames (tracking, smoothing, features, gesture read) and
+    the legacy per-hand loop, on the same stubbed model output of `hands` hands
+    """
+    w, h = DETECT_FRAME_SIZE
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    results = drifting_results(pool, hands)
+    detector, clock = stubbed_detector(results), itertools.count()
+    legacy = LegacyDetector(CannedHands(results))
+    return (
+        lambda i: [hand['gesture']['name'] for hand in detector.detect_hands(frame, next(clock) / 30)[1]],
+        lambda i: [hand['gesture']['name'] for hand in legacy.detect_hands(frame)[1]],
+    )
+
+
+def build_cases(pool: np.ndarray, hand_counts: List[int],
+                frame_sizes: List[Tuple[int, int]]) -> Dict[str, Tuple[Callable[[int], object], int]]:
+    """Benchmark bodies keyed by case name, with the number of hands per op"""
+    detector = make_detector(pool)
+    singles = make_batches(pool, 1)
+    single_lists = [list(map(tuple, b[0].tolist())) for b in singles]
+    cases = {}
+
+    cases['recognize_gesture'] = (
+        lambda i: detector._recognize_gesture(single_lists[i % BATCHES]), 1)
+    cases['finger_curl'] = (
+        lambda i: detector._calculate_finger_curl(single_lists[i % BATCHES]), 1)
+    cases['fingertip_distances'] = (
+        lambda i: detector._get_fingertip_distances(single_lists[i % BATCHES]), 1)
+
+    # Rule matching including the features it reads; more rules over the same
+    # features should cost about the same, more features should cost more
+    cases['classify[default]'] = (
+        lambda i, r=default_gestures(): r.classify(HandFeatures(singles[i % BATCHES], (1280, 720))), 1)
+    for rules in RULE_COUNTS:
+        for features in (1, len(RULE_FEATURES)):
+            cases[f'classify[rules={rules},features={features}]'] = (
+                lambda i, r=synthetic_registry(rules, features):
+                    r.classify(HandFeatures(singles[i % BATCHES], (1280, 720))), 1)
+
+    for hands in hand_counts:
+        batches = make_batches(pool, hands)
+        cases[f'features[hands={hands}]'] = (
+            lambda i, b=batches: read_features(HandFeatures(b[i % BATCHES], (1280, 720))), hands)
+        cases[f'build_hands[hands={hands}]'] = (
+            lambda i, b=batches: build_hands_data(detector, b[i % BATCHES], (1280, 720)), hands)
+        cases[f'build_hands_filled[hands={hands}]'] = (
+            lambda i, b=batches: build_hands_data(detector, b[i % BATCHES], (1280, 720)).fill(), hands)
+
+        for w, h in frame_sizes:
+            frame = np.zeros((h, w, 3), dtype=np.uint8)
+            data = [build_hands_data(detector, b, (w, h)).copy() for b in batches]
+            cases[f'draw_hands[hands={hands},frame={w}x{h}]'] = (
+                lambda i, f=frame, d=data: detector.draw_hands(f, d[i % BATCHES]), hands)
+
+    # Whole detect_hands frames against the legacy per-hand loop
+    for hands in DETECT_HAND_COUNTS:
+        current, legacy = detect_hands_bodies(pool, hands)
+        cases[f'detect_hands[hands={hands}]'] = (current, hands)
+        cases[f'detect_hands_legacy[hands={hands}]'] = (legacy, hands)
+
+    # One streaming DTW step per hand; the state persists across iterations
+    motion_state = {}
+    cases['motion_update'] = (
+        lambda i: detector.motion.update(motion_state, singles[i % BATCHES][0], i / 30.0), 1)
+
+    hand_data = [build_hands_data(detector, b, (1280, 720)).copy()[0] for b in singles]
+    controllers = []
+    for mode in ControlMode:
+        controller = GestureController(detector)
+        controller.mode = mode
+        controllers.append(controller)
+        cases[f'controller.process[mode={mode.name}]'] = (
+            lambda i, c=controller: c.process(hand_data[i % BATCHES]), 1)
+
+    # Features plus one controller step, computing only what the mode declares
+    for mode in ControlMode:
+        mode_detector = make_detector(pool)
+        controller = GestureController(mode_detector)
+        controller.mode = mode
+        cases[f'controller.frame[mode={mode.name}]'] = (
+            lambda i, d=mode_detector, c=controller:
+                c.process(build_hands_data(d, singles[i % BATCHES], (1280, 720))[0]), 1)
+
+    # Drawing overlay with a few strokes on an otherwise empty canvas
+    drawing = GestureController(detector)
+    drawing.mode = ControlMode.DRAWING
+    for y in range(200, 400, 50):
+        drawing.virtual_drawing._draw_segment((300, y), (700, y + 20))
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for controller in controllers + [drawing]:  # Drop the modes they declared
+        detector.require_features(None, consumer=controller)
+    cases['draw_ui[mode=DRAWING]'] = (lambda i, c=drawing, f=frame: c.draw_ui(f, {}), 0)
+
+    for w, h in frame_sizes:
+        keyboard = VirtualKeyboard((h, w))
+        frame = np.zeros((h, w, 3), dtype=np.uint8)
+        cases[f'draw_keyboard[frame={w}x{h}]'] = (
+            lambda i, k=keyboard, f=frame: k.draw_keyboard(f), 0)
+
+    # Skin segmentation on frames with two hand silhouettes from the pool
+    for w, h in frame_sizes:
+        fallback = FallbackHandDetector()
+        frames = [make_skin_frame(b, (w, h)) for b in make_batches(pool, 2, 8)]
+        cases[f'fallback_detect[frame={w}x{h}]'] = (
+            lambda i, d=fallback, f=frames: d.detect_hands(f[i % len(f)]), 2)
+
+    return cases
+
+
+def run_benchmarks(pool: np.ndarray, hand_counts: List[int] = HAND_COUNTS,
+                   frame_sizes: List[Tuple[int, int]] = FRAME_SIZES,
+                   pattern: Optional[str] = None, min_time: float = 0.2) -> Dict[str, Dict]:
+    """Run every case (optionally filtered by substring) and return results"""
+    results = {}
+    for name, (fn, hands) in build_cases(pool, hand_counts, frame_sizes).items():
+        if pattern and pattern not in name:
+            continue
+        result = measure(fn, min_time=min_time)
+        result['hands_per_op'] = hands
+        result['hands_per_sec'] = result['ops_per_sec'] * hands
+        results[name] = result
+        print(f"  {name:<48} {result['ns_per_op']:>14,.0f} ns/op"
+              f" {result['ops_per_sec']:>12,.0f} op/s"
+              f" {result['peak_alloc_bytes']:>10,} B")
+    return results
+
+
+def measure_paired(current: Callable[[int], object], legacy: Callable[[int], object],
+                   min_time: float = 0.2, rounds: int = 25) -> Tuple[float, float, float]:
+    """
+    Time two benchmark bodies in alternating short rounds
+
+    Machine speed drifts over the seconds between two measure() calls, which
+    can swamp a difference of a few percent; alternating makes the drift hit
+    both bodies alike. Which body runs first also flips every round, since
+    the second one inherits the first one's warm caches.
+
+    Returns:
+        Median ns/op of each body and the median of their per-round ratios
+    """
+    iterations = calibrate(legacy, min_time / 10)
+    samples: Tuple[List[float], List[float]] = ([], [])
+    pairs = list(zip((current, legacy), samples))
+    for round_index in range(rounds):
+        for fn, times in pairs[::-1] if round_index % 2 else pairs:
+            start = time.perf_counter_ns()
+            for i in range(iterations):
+                fn(i)
+            times.append((time.perf_counter_ns() - start) / iterations)
+    ratios = [new / old for new, old in zip(*samples)]
+    return float(np.median(samples[0])), float(np.median(samples[1])), float(np.median(ratios))
+
+
+def detect_hands_gate(pool: np.ndarray, pattern: Optional[str] = None,
+                      min_time: float = 0.2) -> List[str]:
+    """Time detect_hands against the legacy loop, print the ratios and return cases that are slower"""
+    slower = []
+    for hands in DETECT_HAND_COUNTS:
+        name = f'detect_hands[hands={hands}]'
+        if pattern and pattern not in name:
+            continue
+        current, legacy, ratio = measure_paired(*detect_hands_bodies(pool, hands), min_time=min_time)
+        flag = ""
+        if ratio >= 1.0:
+            flag = "  SLOWER THAN LEGACY"
+            slower.append(name)
+        print(f"{name:<50} {legacy:>12,.0f} {current:>12,.0f} {ratio:>6.2f}x{flag}")
+    return slower
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            threshold: float = 0.10) -> List[str]:
+    """Print ratios against a baseline and return names of regressed cases"""
+    regressions = []
+    print(f"\n{'Case':<50} {'Baseline':>12} {'Current':>12} {'Ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['ns_per_op']
+        new = result['ns_per_op']
+        ratio = new / old if old > 0 else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<50} {old:>12,.0f} {new:>12,.0f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hand detection microbenchmarks")
+    parser.add_argument("--recording", type=str, default=None,
+                        help="Use hands from a landmark recording instead of synthetic ones")
+    parser.add_argument("--filter", type=str, default=None, help="Only run cases containing this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed repeat")
+    parser.add_argument("--save", type=str, default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--compare", type=str, default=None, help="Compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown ratio counted as a regression")
+
+    args = parser.parse_args()
+
+    pool = recorded_hands(args.recording) if args.recording else synthetic_hands(1024)
+    source = args.recording or "synthetic"
+
+    print(f"\n{'='*60}")
+    print(f"Microbenchmarks ({source}, {len(pool)} hands)")
+    print(f"{'='*60}")
+    results = run_benchmarks(pool, pattern=args.filter, min_time=args.min_time)
+
+    print(f"\n{'detect_hands vs legacy loop':<50} {'Legacy':>12} {'Current':>12} {'Ratio':>7}")
+    slower = detect_hands_gate(pool, pattern=args.filter, min_time=args.min_time)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'source': source,
+                    'python': sys.version.split()[0],
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'time': time.time(),
+                },
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+
+    if slower:
+        print(f"\n{len(slower)} detect_hands case(s) slower than the legacy loop")
+        sys.exit(1)
@@ -0,0 +1,133 @@
+"""
+Threaded Frame Capture
+Reads the camera on its own thread and hands only the newest frame to the detector
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def detector_time(cap: cv2.VideoCapture, live: bool, capture_time: float) -> float:
+    """
+    Clock for the frame just read: capture time for live sources, media time for files
+
+    Files decode faster (or slower) than real time, so smoothing, tracking
+    and motion would otherwise depend on the machine's speed.
+    """
+    return capture_time if live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+
+class FrameRing:
+    """Small drop-oldest ring buffer shared between capture and detection"""
+
+    def __init__(self, capacity: int = 2):
+        """
+        Initialize frame ring
+
+        Args:
+            capacity: Number of frames held before the oldest is dropped
+        """
+        self.capacity = max(1, capacity)
+        self._frames = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._seq = 0
+
+        # Counters
+        self.captured = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def put(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """Push a new frame, dropping the oldest one if the ring is full"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._cond:
+            if len(self._frames) >= self.capacity:
+                self._frames.popleft()
+                self.dropped += 1
+            self._seq += 1
+            self._frames.append((frame, timestamp, self._seq))
+            self.captured += 1
+            self._cond.notify()
+
+    def get_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Take the newest frame and discard any older ones
+
+        Args:
+            timeout: Seconds to wait for a frame (None = wait forever)
+
+        Returns:
+            (frame, capture timestamp, sequence number), or None on timeout/close
+        """
+        with self._cond:
+            if not self._frames and not self._closed:
+                self._cond.wait(timeout)
+            if not self._frames:
+                return None
+            item = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            self.processed += 1
+            return item
+
+    def close(self):
+        """Wake up any waiting reader; no more frames will arrive"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        """Capture counters"""
+        with self._cond:
+            return {
+                'captured': self.captured,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'pending': len(self._frames),
+            }
+
+
+class CaptureThread(threading.Thread):
+    """Background camera reader feeding a FrameRing"""
+
+    def __init__(self, cap: cv2.VideoCapture, ring: Optional[FrameRing] = None):
+        """
+        Initialize capture thread
+
+        Args:
+            cap: Opened video capture
+            ring: Destination ring (a 2-slot ring is created if omitted)
+        """
+        super().__init__(name="CaptureThread", daemon=True)
+        self.cap = cap
+        self.ring = ring or FrameRing()
+        self._running = threading.Event()
+        self._running.set()
+
+    def run(self):
+        """Read frames until stopped or the source ends"""
+        try:
+            while self._running.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.ring.put(frame)
+        finally:
+            self.ring.close()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop reading and wait for the thread to exit"""
+        self._running.clear()
+        if self.is_alive():
+            self.join(timeout)
@@ -3,9 +3,12 @@ Example Usage: Hand Detection & Gesture Control
 Demonstrates various uses of the hand detection system
 """
 
+import asyncio
 import cv2
+from async_stream import ResultHub
 from hand_detection import HandDetector, GestureApp, FallbackHandDetector
 from gesture_controller import GestureController, ControlMode, VirtualMouse, VolumeControl
+from gesture_registry import GestureRegistry
 
 
 def example_1_basic_detection():
@@ -191,18 +194,12 @@ def example_5_custom_gesture_detection():
     print("Detects: Rock, Paper, Scissors")
     print("\nRunning...\n")
     
-    def detect_rps(hand):
-        """Rock-Paper-Scissors detection"""
-        curls = hand['gesture']['curls']
-        
-        if sum(curls) > 4.5:
-            return "ROCK"
-        elif sum(curls) < 1.5:
-            return "PAPER"
-        elif curls[1] < 0.5 and curls[2] < 0.5 and curls[3] > 0.8 and curls[4] > 0.8:
-            return "SCISSORS"
-        else:
-            return "UNKNOWN"
+    # Rock-Paper-Scissors rules reuse the detector's cached curl features
+    rps_gestures = GestureRegistry(default=("UNKNOWN", 0.0))
+    rps_gestures.add_rule("ROCK", [('curl_sum', '>', 4.5)])
+    rps_gestures.add_rule("PAPER", [('curl_sum', '<', 1.5)])
+    rps_gestures.add_rule("SCISSORS", [('curls[1]', '<', 0.5), ('curls[2]', '<', 0.5),
+                                       ('curls[3]', '>', 0.8), ('curls[4]', '>', 0.8)])
     
     detector = HandDetector(max_hands=1)
     rps_stats = {}
@@ -221,7 +218,7 @@ def example_5_custom_gesture_detection():
         frame = detector.draw_hands(frame, hands)
         
         if hands:
-            rps = detect_rps(hands[0])
+            rps = rps_gestures.classify(detector.last_features)[0]['name']
             rps_stats[rps] = rps_stats.get(rps, 0) + 1
             
             color = (0, 255, 0) if rps != "UNKNOWN" else (0, 0, 255)
@@ -286,6 +283,39 @@ def example_6_multi_hand_tracking():
     cv2.destroyAllWindows()
 
 
+def example_7_async_stream():
+    """Example 7: Async detection stream shared by several consumers"""
+    print("\n" + "="*60)
+    print("Example 7: Async Detection Stream")
+    print("="*60)
+    print("\nThis example serves one detection stream to several asyncio consumers")
+    print("Features:")
+    print("  - Capture and inference run in worker threads")
+    print("  - Each consumer gets the latest result; slow ones skip frames")
+    print("  - No window and no thread per consumer")
+    print("\nRunning for 10 seconds...\n")
+    
+    async def consumer(name, queue, delay):
+        async for result in queue:
+            gestures = [hand['gesture']['name'] for hand in result.hands]
+            print(f"{name}: frame {result.index} {gestures}")
+            await asyncio.sleep(delay)  # Simulated slow network client
+    
+    async def run():
+        detector = HandDetector(max_hands=2)
+        hub = ResultHub(detector.stream(0, flip=True, resolution=(1280, 720)))
+        clients = [consumer("fast", hub.subscribe(), 0.0),
+                   consumer("slow", hub.subscribe(), 0.5)]
+        pump = asyncio.ensure_future(hub.run())
+        try:
+            await asyncio.wait_for(asyncio.gather(pump, *clients), timeout=10)
+        except asyncio.TimeoutError:
+            pass
+        print(f"\nHub stats: {hub.stats()}")
+    
+    asyncio.run(run())
+
+
 def main():
     """Main example menu"""
     print("\n" + "="*60)
@@ -298,10 +328,11 @@ def main():
     print("  4. Gesture Statistics")
     print("  5. Custom Gesture (Rock-Paper-Scissors)")
     print("  6. Multi-Hand Tracking")
+    print("  7. Async Detection Stream")
     print("  0. Exit")
     print()
     
-    choice = input("Enter your choice (0-6): ").strip()
+    choice = input("Enter your choice (0-7): ").strip()
     
     examples = {
         '1': example_1_basic_detection,
@@ -310,6 +341,7 @@ def main():
         '4': example_4_gesture_statistics,
         '5': example_5_custom_gesture_detection,
         '6': example_6_multi_hand_tracking,
+        '7': example_7_async_stream,
     }
     
     if choice in examples:
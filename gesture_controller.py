@@ -5,10 +5,11 @@ Features: Virtual keyboard, mouse control, volume adjustment, drawing
 
 import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Callable
+from typing import Dict, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 from enum import Enum
 import time
+from collections import deque
 
 class ControlMode(Enum):
     """Available control modes"""
@@ -18,42 +19,44 @@ class ControlMode(Enum):
     KEYBOARD = "Virtual Keyboard"
 
 
+# Hand features each mode reads (see HandDetector.require_features)
+MODE_FEATURES = {
+    ControlMode.MOUSE: ('landmarks_px', 'fingertip_distances', 'gesture', 'motion'),
+    ControlMode.VOLUME: ('fingertip_distances',),
+    ControlMode.DRAWING: ('landmarks_px',),
+    ControlMode.KEYBOARD: ('landmarks_px', 'fingertip_distances'),
+}
+
+
 @dataclass
 class VirtualMouse:
-    """Virtual mouse control using hand landmarks"""
+    """Virtual mouse control using hand landmarks
+    
+    Landmarks arrive already smoothed by the detector's landmark filter,
+    so the cursor follows the index fingertip directly.
+    """
     
     sensitivity: float = 1.0
-    smoothing: float = 0.7
     left_click_threshold: float = 0.05
     right_click_threshold: float = 0.08
     double_click_threshold: float = 0.3
+    scroll_speed: float = 3.0
+    scroll_deadzone: float = 0.5
     
     def __init__(self):
-        self.prev_x = 0
-        self.prev_y = 0
-        self.smoothed_x = 0
-        self.smoothed_y = 0
         self.left_click_time = 0
         self.right_click_time = 0
 
     def process(self, hand_data: Dict) -> Dict:
         """Process hand data for mouse control"""
         
-        landmarks = hand_data['landmarks']
-        landmarks_px = hand_data['landmarks_px']
+        distances = hand_data['fingertip_distances']
         
         # Index finger tip for cursor position
-        index_tip = landmarks_px[8]
-        
-        # Smooth cursor movement
-        self.smoothed_x = self.prev_x * self.smoothing + index_tip[0] * (1 - self.smoothing)
-        self.smoothed_y = self.prev_y * self.smoothing + index_tip[1] * (1 - self.smoothing)
-        
-        self.prev_x = self.smoothed_x
-        self.prev_y = self.smoothed_y
+        index_tip = hand_data['landmarks_px'][8]
         
         # Detect clicks based on thumb-index distance
-        thumb_index_dist = self._distance(landmarks[4], landmarks[8])
+        thumb_index_dist = distances['Thumb-Index']
         
         left_click = False
         right_click = False
@@ -67,28 +70,38 @@ class VirtualMouse:
             self.left_click_time = current_time
         
         # Right click: thumb-middle distance
-        thumb_middle_dist = self._distance(landmarks[4], landmarks[12])
+        thumb_middle_dist = distances['Thumb-Middle']
         if thumb_middle_dist < self.right_click_threshold:
             right_click = True
             self.right_click_time = time.time()
         
         return {
-            'cursor_pos': (int(self.smoothed_x), int(self.smoothed_y)),
+            'cursor_pos': (int(index_tip[0]), int(index_tip[1])),
             'left_click': left_click,
             'right_click': right_click,
             'double_click': double_click,
-            'scroll': self._calculate_scroll(landmarks)
+            'scroll': self._calculate_scroll(hand_data)
         }
 
-    def _calculate_scroll(self, landmarks: List) -> int:
-        """Calculate scroll amount based on hand motion"""
-        # This would require frame-to-frame tracking
-        return 0
-
-    @staticmethod
-    def _distance(p1: Tuple, p2: Tuple) -> float:
-        """Calculate distance between two points"""
-        return ((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2) ** 0.5
+    def _calculate_scroll(self, hand_data: Dict) -> int:
+        """Scroll with vertical hand motion while index and middle fingers are extended
+        
+        Uses the palm velocity (hand lengths per second) tracked by the
+        detector's temporal gesture engine; moving the hand up scrolls up.
+        """
+        motion = hand_data.get('motion')
+        curls = hand_data['gesture'].get('curls')
+        if motion is None or curls is None:
+            return 0
+        
+        # Scroll pose: index + middle extended, ring + pinky curled
+        if not (curls[1] < 0.5 and curls[2] < 0.5 and curls[3] > 0.5 and curls[4] > 0.5):
+            return 0
+        
+        vy = motion['velocity'][1]
+        if abs(vy) < self.scroll_deadzone:
+            return 0
+        return int(round(-vy * self.scroll_speed))
 
 
 @dataclass
@@ -97,49 +110,61 @@ class VolumeControl:
     
     min_distance: float = 0.03
     max_distance: float = 0.15
-    smoothing: float = 0.8
-
-    def __init__(self):
-        self.prev_volume = 0
 
     def process(self, hand_data: Dict) -> Dict:
         """Calculate volume level from hand gesture"""
         
-        landmarks = hand_data['landmarks']
-        
-        # Distance between thumb and index finger
-        thumb_index_dist = self._distance(landmarks[4], landmarks[8])
+        # Distance between thumb and index finger (from filtered landmarks)
+        thumb_index_dist = hand_data['fingertip_distances']['Thumb-Index']
         
         # Map to volume (0-100%)
         normalized = (thumb_index_dist - self.min_distance) / (self.max_distance - self.min_distance)
         volume = max(0, min(100, normalized * 100))
         
-        # Smooth volume changes
-        smoothed_volume = self.prev_volume * self.smoothing + volume * (1 - self.smoothing)
-        self.prev_volume = smoothed_volume
-        
         return {
-            'volume': int(smoothed_volume),
+            'volume': int(volume),
             'gesture_open': thumb_index_dist > self.max_distance,
             'gesture_closed': thumb_index_dist < self.min_distance
         }
 
-    @staticmethod
-    def _distance(p1: Tuple, p2: Tuple) -> float:
-        """Calculate distance"""
-        return ((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2) ** 0.5
-
 
 class VirtualDrawing:
-    """Virtual drawing using index finger"""
+    """Virtual drawing using index finger
+    
+    Each stroke (one pen-down run) keeps the pre-stroke pixels of the tiles
+    it touched, so undo restores just those tiles instead of replaying the
+    whole history. Only the last max_strokes strokes can be undone. The same
+    tiles track where the canvas has ink, so overlays skip empty areas.
+    """
     
-    def __init__(self, canvas_shape: Tuple[int, int] = (720, 1280)):
+    def __init__(self, canvas_shape: Tuple[int, int] = (720, 1280),
+                 max_strokes: int = 50, tile_size: int = 64):
+        """
+        Initialize virtual drawing
+        
+        Args:
+            canvas_shape: (height, width) of the canvas
+            max_strokes: Undoable strokes kept; older ones are committed
+            tile_size: Edge length (px) of undo and ink-tracking tiles
+        """
         self.canvas = np.zeros((canvas_shape[0], canvas_shape[1], 3), dtype=np.uint8)
+        self.ink_mask = np.zeros(canvas_shape[:2], dtype=np.uint8)
         self.drawing = False
         self.prev_pos = None
         self.brush_size = 5
         self.brush_color = (0, 255, 255)
-        self.strokes = []
+        self.tile_size = tile_size
+        self.ink_tiles = np.zeros((-(-canvas_shape[0] // tile_size), -(-canvas_shape[1] // tile_size)),
+                                  dtype=bool)
+        
+        # Undo records: {'segments': [...], 'tiles': {(ty, tx): (canvas patch, mask patch)}}
+        self.strokes = deque(maxlen=max_strokes)
+        self._stroke = None
+        
+        # Bumped on every canvas change so consumers can skip unchanged frames
+        self.version = 0
+        self._canvas_view = self.canvas.view()
+        self._canvas_view.flags.writeable = False
 
     def process(self, hand_data: Dict) -> Dict:
         """Process drawing input"""
@@ -156,39 +181,133 @@ class VirtualDrawing:
         drawing_active = index_extended and not middle_extended
         
         if drawing_active and self.prev_pos:
-            cv2.line(self.canvas, self.prev_pos, index_tip, self.brush_color, self.brush_size)
-            self.strokes.append((self.prev_pos, index_tip, self.brush_color, self.brush_size))
+            self._draw_segment(self.prev_pos, index_tip)
+        elif not drawing_active:
+            self._stroke = None
         
         self.prev_pos = index_tip if drawing_active else None
         
         return {
             'drawing_active': drawing_active,
             'current_pos': index_tip,
-            'canvas': self.canvas.copy()
+            'canvas': self._canvas_view,
+            'canvas_version': self.version
         }
 
+    def _segment_tiles(self, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Tiles a line segment with the current brush can touch"""
+        h, w = self.canvas.shape[:2]
+        pad = self.brush_size
+        x1 = max(0, min(start[0], end[0]) - pad)
+        x2 = min(w - 1, max(start[0], end[0]) + pad)
+        y1 = max(0, min(start[1], end[1]) - pad)
+        y2 = min(h - 1, max(start[1], end[1]) + pad)
+        if x1 > x2 or y1 > y2:
+            return []
+        t = self.tile_size
+        return [(ty, tx) for ty in range(y1 // t, y2 // t + 1) for tx in range(x1 // t, x2 // t + 1)]
+
+    def _draw_segment(self, start: Tuple[int, int], end: Tuple[int, int]):
+        """Draw one segment, saving tiles the current stroke touches for the first time"""
+        if self._stroke is None:
+            self._stroke = {'segments': [], 'tiles': {}}
+            self.strokes.append(self._stroke)
+        
+        t = self.tile_size
+        saved = self._stroke['tiles']
+        for tile in self._segment_tiles(start, end):
+            if tile not in saved:
+                ty, tx = tile
+                area = (slice(ty * t, (ty + 1) * t), slice(tx * t, (tx + 1) * t))
+                saved[tile] = (self.canvas[area].copy(), self.ink_mask[area].copy())
+            self.ink_tiles[tile] = True
+        
+        # The mask mirrors the canvas so overlays need no per-frame ink test;
+        # a black brush erases
+        cv2.line(self.canvas, start, end, self.brush_color, self.brush_size)
+        cv2.line(self.ink_mask, start, end, 255 if any(self.brush_color) else 0, self.brush_size)
+        self._stroke['segments'].append((start, end, self.brush_color, self.brush_size))
+        self.version += 1
+
     def clear_canvas(self):
         """Clear the drawing canvas"""
         self.canvas.fill(0)
+        self.ink_mask.fill(0)
+        self.ink_tiles[:] = False
         self.strokes.clear()
+        self._stroke = None
+        self.version += 1
 
     def undo(self):
         """Undo last stroke"""
-        if self.strokes:
-            self.strokes.pop()
-            self._redraw_canvas()
+        if not self.strokes:
+            return
+        stroke = self.strokes.pop()
+        if stroke is self._stroke:
+            # Undoing mid-stroke: the next segment starts a new stroke
+            self._stroke = None
+        
+        t = self.tile_size
+        for (ty, tx), (patch, mask) in stroke['tiles'].items():
+            area = (slice(ty * t, ty * t + patch.shape[0]), slice(tx * t, tx * t + patch.shape[1]))
+            self.canvas[area] = patch
+            self.ink_mask[area] = mask
+            self.ink_tiles[ty, tx] = mask.any()
+        self.version += 1
 
-    def _redraw_canvas(self):
-        """Redraw canvas from strokes"""
-        self.canvas.fill(0)
-        for start, end, color, size in self.strokes:
-            cv2.line(self.canvas, start, end, color, size)
+    def _ink_regions(self) -> List[Tuple[int, int, int, int]]:
+        """Pixel rects (x1, y1, x2, y2) covering runs of inked tiles in each tile row"""
+        t = self.tile_size
+        h, w = self.canvas.shape[:2]
+        regions = []
+        for ty in np.flatnonzero(self.ink_tiles.any(axis=1)):
+            row = self.ink_tiles[ty]
+            # Run starts/ends from the padded row's edges
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False])).astype(np.int8)))
+            for start, stop in zip(edges[::2], edges[1::2]):
+                regions.append((start * t, ty * t, min(stop * t, w), min((ty + 1) * t, h)))
+        return regions
+
+    def overlay(self, frame: np.ndarray, alpha: float = 0.7) -> np.ndarray:
+        """
+        Blend inked canvas pixels into the frame in place
+        
+        Args:
+            frame: Frame to draw on (same size as the canvas)
+            alpha: Weight of the camera image under the ink
+        
+        Returns:
+            The frame
+        """
+        fh, fw = frame.shape[:2]
+        for x1, y1, x2, y2 in self._ink_regions():
+            x2, y2 = min(x2, fw), min(y2, fh)
+            if x1 >= x2 or y1 >= y2:
+                continue
+            target = frame[y1:y2, x1:x2]
+            blended = cv2.addWeighted(target, alpha, self.canvas[y1:y2, x1:x2], 1 - alpha, 0)
+            cv2.copyTo(blended, self.ink_mask[y1:y2, x1:x2], target)
+        return frame
 
 
 class VirtualKeyboard:
-    """Virtual keyboard using hand gestures"""
+    """Virtual keyboard using hand gestures
+    
+    The layout is rendered once into a cached layer plus a per-pixel key
+    index map, so hit tests match the drawing exactly and each frame only
+    composites the layer and redraws the hovered key.
+    """
     
-    def __init__(self, frame_shape: Tuple[int, int] = (720, 1280)):
+    def __init__(self, frame_shape: Tuple[int, int] = (720, 1280),
+                 key_rects: Optional[List[Tuple[str, Tuple[int, int, int, int]]]] = None):
+        """
+        Initialize virtual keyboard
+        
+        Args:
+            frame_shape: (height, width) of the frames the keyboard is drawn on
+            key_rects: Optional free-form layout as (label, (x1, y1, x2, y2))
+                pairs in pixels; defaults to the QWERTY grid along the bottom
+        """
         self.frame_height, self.frame_width = frame_shape
         
         # Define keyboard layout
@@ -197,12 +316,83 @@ class VirtualKeyboard:
             ['A', 'S', 'D', 'F', 'G', 'H', 'J', 'K', 'L', ' '],
             ['Z', 'X', 'C', 'V', 'B', 'N', 'M', '<-', 'ENTER', '']
         ]
+        self.custom_rects = key_rects
         
         self.key_size = (self.frame_width // 10, 40)
         self.input_text = ""
         self.hover_key = None
+        self.hover_index = -1
         self.last_click_time = 0
         self.click_debounce = 0.5
+        
+        # Cached render state, rebuilt when the frame shape changes
+        self._layout_shape = None
+        self._rendered_text = None
+        self._build_layout((self.frame_height, self.frame_width))
+
+    def _grid_rects(self, height: int, width: int) -> List[Tuple[str, Tuple[int, int, int, int]]]:
+        """Key rectangles for the default grid, 50px row pitch above the bottom edge"""
+        y_offset = height - 200
+        key_width = width // 10
+        rects = []
+        for row_idx, row in enumerate(self.keys):
+            y = y_offset + row_idx * 50
+            for col_idx, key in enumerate(row):
+                x = col_idx * key_width
+                rects.append((key, (x, y, x + key_width, y + 40)))
+        return rects
+
+    def _build_layout(self, shape: Tuple[int, int]):
+        """Render the idle keyboard layer and the key index map for a frame shape"""
+        height, width = shape
+        self.frame_height, self.frame_width = height, width
+        self.key_size = (width // 10, 40)
+        self.key_rects = self.custom_rects or self._grid_rects(height, width)
+        
+        # Input bar sits right above the keys
+        top = min(y1 for _, (_, y1, _, _) in self.key_rects)
+        self._bar = (0, max(0, top - 40), width, top)
+        band_top = self._bar[1]
+        band_bottom = min(height, max(y2 for _, (_, _, _, y2) in self.key_rects) + 1)
+        self._band = (band_top, max(band_top, band_bottom))
+        
+        # Per-pixel key index (-1 = no key); later keys win on overlap
+        self.hit_map = np.full((height, width), -1, dtype=np.int16)
+        for index, (_, (x1, y1, x2, y2)) in enumerate(self.key_rects):
+            self.hit_map[max(0, y1):max(0, y2), max(0, x1):max(0, x2)] = index
+        
+        # Idle layer and coverage mask for the band rows only
+        band_height = self._band[1] - self._band[0]
+        self._layer = np.zeros((band_height, width, 3), dtype=np.uint8)
+        self._mask = np.zeros((band_height, width), dtype=np.uint8)
+        for index in range(len(self.key_rects)):
+            self._draw_key(self._layer, index, (255, 255, 255), 1, band_top)
+            self._draw_key(self._mask, index, 255, 1, band_top)
+        
+        # The input bar rows and the key outlines and labels are copied through
+        # a mask (keys are drawn with LINE_8, so their pixels are fully on or off)
+        bar_rows = slice(self._bar[1] - band_top, self._bar[3] - band_top + 1)
+        self._copy_mask = (self._mask > 0).astype(np.uint8)
+        self._copy_mask[bar_rows] = 1
+        
+        self._layout_shape = shape
+        self._rendered_text = None
+
+    def _draw_key(self, image: np.ndarray, index: int, color, thickness: int, y_origin: int = 0):
+        """Draw one key box and label; y_origin shifts frame rows into band rows"""
+        key, (x1, y1, x2, y2) = self.key_rects[index]
+        cv2.rectangle(image, (x1, y1 - y_origin), (x2, y2 - y_origin), color, thickness, cv2.LINE_8)
+        cv2.putText(image, key, (x1 + 10, y1 - y_origin + 28),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_8)
+
+    def _render_input_bar(self):
+        """Redraw the input bar into the cached layer after the text changes"""
+        x1, y1, x2, y2 = self._bar
+        top = self._band[0]
+        cv2.rectangle(self._layer, (x1, y1 - top), (x2, y2 - top), (100, 100, 100), -1)
+        cv2.putText(self._layer, f"Input: {self.input_text}", (10, y2 - top - 10),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        self._rendered_text = self.input_text
 
     def process(self, hand_data: Dict) -> Dict:
         """Process keyboard input from hand tracking"""
@@ -211,13 +401,11 @@ class VirtualKeyboard:
         index_tip = hand_data['landmarks_px'][8]
         
         # Find which key is being hovered
-        self.hover_key = self._get_key_at_position(index_tip)
+        self.hover_index = self._get_key_index(index_tip)
+        self.hover_key = self.key_rects[self.hover_index][0] if self.hover_index >= 0 else None
         
         # Detect click (thumb-index touch)
-        landmarks = hand_data['landmarks']
-        thumb_index_dist = ((landmarks[4][0] - landmarks[8][0])**2 + 
-                          (landmarks[4][1] - landmarks[8][1])**2 + 
-                          (landmarks[4][2] - landmarks[8][2])**2) ** 0.5
+        thumb_index_dist = hand_data['fingertip_distances']['Thumb-Index']
         
         clicked_key = None
         current_time = time.time()
@@ -235,18 +423,17 @@ class VirtualKeyboard:
             'keyboard_layout': self.keys
         }
 
+    def _get_key_index(self, pos: Tuple[int, int]) -> int:
+        """Index into key_rects under a pixel position (-1 = none)"""
+        x, y = int(pos[0]), int(pos[1])
+        if 0 <= y < self.hit_map.shape[0] and 0 <= x < self.hit_map.shape[1]:
+            return int(self.hit_map[y, x])
+        return -1
+
     def _get_key_at_position(self, pos: Tuple[int, int]) -> str:
         """Get key at given position"""
-        x, y = pos
-        
-        # Calculate which row and column
-        row = y // 50  # Approximate row height
-        col = x // (self.frame_width // 10)
-        
-        if 0 <= row < len(self.keys) and 0 <= col < len(self.keys[row]):
-            return self.keys[row][col]
-        
-        return None
+        index = self._get_key_index(pos)
+        return self.key_rects[index][0] if index >= 0 else None
 
     def _process_key_click(self, key: str):
         """Process key press"""
@@ -259,36 +446,28 @@ class VirtualKeyboard:
 
     def draw_keyboard(self, frame: np.ndarray) -> np.ndarray:
         """Draw virtual keyboard on frame"""
+        shape = frame.shape[:2]
+        if shape != self._layout_shape:
+            self._build_layout(shape)
+        if self.input_text != self._rendered_text:
+            self._render_input_bar()
         
-        y_offset = frame.shape[0] - 200
+        # Composite the cached layer, then redraw only the hovered key
+        top, bottom = self._band
+        band = frame[top:bottom]
         
-        for row_idx, row in enumerate(self.keys):
-            y = y_offset + row_idx * 50
-            
-            for col_idx, key in enumerate(row):
-                x = col_idx * (self.frame_width // 10)
-                
-                # Highlight hovered key
-                if self.hover_key == key:
-                    color = (0, 255, 0)
-                    thickness = 2
-                else:
-                    color = (255, 255, 255)
-                    thickness = 1
-                
-                # Draw key box
-                cv2.rectangle(frame, (x, y), (x + self.frame_width // 10, y + 40),
-                            color, thickness)
-                
-                # Draw key label
-                cv2.putText(frame, key, (x + 10, y + 28),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-        
-        # Draw input area
-        cv2.rectangle(frame, (0, y_offset - 40), (self.frame_width, y_offset),
-                     (100, 100, 100), -1)
-        cv2.putText(frame, f"Input: {self.input_text}", (10, y_offset - 10),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        # The hovered key's idle label must not show under its highlight
+        hover_patch = None
+        if self.hover_index >= 0:
+            _, (x1, y1, x2, y2) = self.key_rects[self.hover_index]
+            inner = (slice(max(0, y1 + 1), max(0, y2)), slice(max(0, x1 + 1), max(0, x2)))
+            hover_patch = frame[inner].copy()
+        
+        cv2.copyTo(self._layer, self._copy_mask, band)
+        
+        if hover_patch is not None:
+            frame[inner] = hover_patch
+            self._draw_key(frame, self.hover_index, (0, 255, 0), 2)
         
         return frame
 
@@ -305,6 +484,18 @@ class GestureController:
         self.virtual_drawing = VirtualDrawing()
         self.virtual_keyboard = VirtualKeyboard()
 
+    @property
+    def mode(self) -> ControlMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: ControlMode):
+        """Set the mode and tell the detector which hand features it needs"""
+        self._mode = mode
+        require = getattr(self.detector, 'require_features', None)
+        if require is not None:
+            require(MODE_FEATURES[mode], consumer=self)
+
     def process(self, hand_data: Dict) -> Dict:
         """Process hand data with current control mode"""
         
@@ -333,10 +524,8 @@ class GestureController:
         """Draw control UI on frame"""
         
         if self.mode == ControlMode.DRAWING:
-            # Overlay drawing canvas
-            alpha = 0.7
-            frame = cv2.addWeighted(frame, alpha, 
-                                   self.virtual_drawing.canvas, 1 - alpha, 0)
+            # Overlay drawing canvas where it has ink
+            frame = self.virtual_drawing.overlay(frame, alpha=0.7)
         
         elif self.mode == ControlMode.KEYBOARD:
             frame = self.virtual_keyboard.draw_keyboard(frame)
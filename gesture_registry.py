@@ -0,0 +1,439 @@
+"""
+Gesture Registry
+Rule-based and callable gesture recognizers evaluated against shared per-hand features
+"""
+
+import operator
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from landmark_features import HandFeatures, THUMB_INDEX, THUMB_MIDDLE, INDEX_MIDDLE
+
+# Named feature extractors: HandFeatures -> (hands,) or (hands, k) array
+FEATURES: Dict[str, Callable[[HandFeatures], np.ndarray]] = {}
+
+OPS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+}
+
+# Condition on a feature column, e.g. ('curl_sum', '<', 1.5) or ('curls[1]', '>', 0.8)
+Condition = Tuple[str, str, float]
+
+_FEATURE_REF = re.compile(r'^(\w+)(?:\[(\d+)\])?$')
+
+# Curl weights summed as a matrix product, cheaper than a reduce over five
+# columns: every finger, and every finger but the thumb
+CURL_SUM = np.ones(5, dtype=np.float32)
+FINGER_CURL_SUM = np.array([0, 1, 1, 1, 1], dtype=np.float32)
+
+# Conditions x hands up to which classify walks the rules in Python, stopping
+# at the first match, instead of checking every condition in one array op
+# (around where the two cost the same when no rule matches)
+SCALAR_MATCH_LIMIT = 256
+
+
+def register_feature(name: str):
+    """Decorator adding a named feature extractor"""
+    def decorator(fn: Callable[[HandFeatures], np.ndarray]):
+        FEATURES[name] = fn
+        return fn
+    return decorator
+
+
+def get_feature(features: HandFeatures, name: str) -> np.ndarray:
+    """Feature array for every hand, computed once per HandFeatures and cached on it"""
+    value = features.cache.get(name)
+    if value is None:
+        if name not in FEATURES:
+            raise KeyError(f"Unknown gesture feature: {name}")
+        value = np.asarray(FEATURES[name](features))
+        features.cache[name] = value
+    return value
+
+
+@register_feature('curls')
+def _curls(f: HandFeatures) -> np.ndarray:
+    return f.curls
+
+
+@register_feature('curl_sum')
+def _curl_sum(f: HandFeatures) -> np.ndarray:
+    return f.curls @ CURL_SUM
+
+
+@register_feature('finger_curl_sum')
+def _finger_curl_sum(f: HandFeatures) -> np.ndarray:
+    """Curl sum without the thumb"""
+    return f.curls @ FINGER_CURL_SUM
+
+
+@register_feature('tip_distances')
+def _tip_distances(f: HandFeatures) -> np.ndarray:
+    return f.tip_distances
+
+
+@register_feature('thumb_index')
+def _thumb_index(f: HandFeatures) -> np.ndarray:
+    return f.tip_distances[:, THUMB_INDEX]
+
+
+@register_feature('thumb_middle')
+def _thumb_middle(f: HandFeatures) -> np.ndarray:
+    return f.tip_distances[:, THUMB_MIDDLE]
+
+
+@register_feature('index_middle')
+def _index_middle(f: HandFeatures) -> np.ndarray:
+    return f.tip_distances[:, INDEX_MIDDLE]
+
+
+@register_feature('thumb_up')
+def _thumb_up(f: HandFeatures) -> np.ndarray:
+    """1 when the thumb tip, IP and MCP rise in that order on screen"""
+    y = f.landmarks[:, :, 1]
+    return ((y[:, 4] < y[:, 3]) & (y[:, 3] < y[:, 2])).astype(np.float64)
+
+
+@register_feature('orientation')
+def _orientation(f: HandFeatures) -> np.ndarray:
+    """Wrist-to-middle-MCP angle in degrees (0 = fingers up, 90 = pointing right)"""
+    direction = f.landmarks[:, 9, :2].astype(np.float64) - f.landmarks[:, 0, :2]
+    return np.degrees(np.arctan2(direction[:, 0], -direction[:, 1]))
+
+
+@register_feature('landmarks')
+def _landmarks(f: HandFeatures) -> np.ndarray:
+    return f.landmarks
+
+
+class GestureRegistry:
+    """
+    Ordered gesture recognizers sharing one feature cache per frame
+
+    Rule conditions are compiled into inclusive (lo, hi) bounds on feature
+    columns. Small rule sets are walked in Python straight off the cached
+    feature arrays; larger ones gather every condition's column into one
+    array and check all bounds at once, so adding rules costs a wider array
+    op rather than another pass over the hands. The first matching gesture in registration
+    order wins, like an if/elif chain.
+    """
+
+    def __init__(self, default: Tuple[str, float] = ("Unknown", 0.0)):
+        """
+        Initialize registry
+
+        Args:
+            default: (name, confidence) when no recognizer matches
+        """
+        self.default = default
+        self._gestures: List[Dict] = []
+        self._compiled = None
+        
+        # Extractors private to this registry; they shadow global FEATURES and
+        # are cached under a per-registry key so registries never share values
+        self._features: Dict[str, Callable[[HandFeatures], np.ndarray]] = {}
+        self._cache_key = object()
+
+    def _insert(self, gesture: Dict, position: Optional[int]):
+        if position is None:
+            self._gestures.append(gesture)
+        else:
+            self._gestures.insert(position, gesture)
+        self._compiled = None
+
+    def add_rule(self, name: str, conditions: Sequence[Condition], confidence: float = 1.0,
+                 position: Optional[int] = None):
+        """
+        Register a gesture matching when every condition holds
+
+        Args:
+            name: Gesture name reported on a match
+            conditions: (feature, op, value) triples; index array features as 'curls[1]'
+            confidence: Confidence reported on a match
+            position: Match order slot (default: after every existing gesture)
+        """
+        refs = []
+        for ref, op, value in conditions:
+            match = _FEATURE_REF.match(ref)
+            if match is None or op not in OPS:
+                raise ValueError(f"Bad condition for {name}: {(ref, op, value)}")
+            index = int(match.group(2)) if match.group(2) is not None else None
+            refs.append((match.group(1), index, op, float(value)))
+        self._insert({'name': name, 'confidence': confidence, 'conditions': refs}, position)
+
+    def add_callable(self, name: str, fn: Callable[..., np.ndarray], features: Sequence[str],
+                     confidence: float = 1.0, position: Optional[int] = None):
+        """
+        Register a gesture computed by a function over batched features
+
+        Args:
+            name: Gesture name reported on a match
+            fn: Called with each declared feature as a keyword argument
+                ((hands, ...) arrays); returns a (hands,) boolean match mask,
+                or float confidences where 0 means no match
+            features: Feature names the function needs
+            confidence: Confidence reported on a boolean match
+            position: Match order slot (default: after every existing gesture)
+        """
+        self._insert({'name': name, 'confidence': confidence,
+                      'fn': fn, 'features': list(features)}, position)
+
+    def add_feature(self, name: str, fn: Callable[[HandFeatures], np.ndarray]):
+        """
+        Register a feature extractor visible only to this registry
+
+        Args:
+            name: Feature name used by rules and callables
+            fn: HandFeatures -> (hands,) or (hands, k) array
+        """
+        self._features[name] = fn
+        self._compiled = None
+
+    def _feature(self, features: HandFeatures, name: str) -> np.ndarray:
+        """Registry-local feature if one is registered, else the global one"""
+        fn = self._features.get(name)
+        if fn is None:
+            return get_feature(features, name)
+        key = (self._cache_key, name)
+        value = features.cache.get(key)
+        if value is None:
+            value = features.cache[key] = np.asarray(fn(features))
+        return value
+
+    def remove(self, name: str):
+        """Drop every recognizer registered under `name`"""
+        self._gestures = [g for g in self._gestures if g['name'] != name]
+        self._compiled = None
+
+    @property
+    def names(self) -> List[str]:
+        return [g['name'] for g in self._gestures]
+
+    @property
+    def required_features(self) -> List[str]:
+        """Every feature any recognizer reads"""
+        names = []
+        for g in self._gestures:
+            used = g['features'] if 'fn' in g else [c[0] for c in g.get('conditions', [])]
+            names.extend(n for n in used if n not in names)
+        return names
+
+    def _compile(self):
+        """Turn rule conditions into column bounds, ordered by rule"""
+        names: List[str] = []
+        order = []
+        refs, lo, hi, starts, rule_positions, always = [], [], [], [], [], []
+
+        for position, gesture in enumerate(self._gestures):
+            if 'fn' in gesture:
+                order.append((position, None))
+                continue
+            conds = [(name, index) + _bounds(op, value)
+                     for name, index, op, value in gesture['conditions']]
+            order.append((position, conds))
+            if not conds:
+                always.append(position)
+                continue
+
+            starts.append(len(refs))
+            rule_positions.append(position)
+            for name, index, low, high in conds:
+                if name not in names:
+                    names.append(name)
+                refs.append((names.index(name), index or 0))
+                lo.append(low)
+                hi.append(high)
+
+        self._compiled = {
+            'order': order,
+            'names': names,
+            'refs': refs,
+            'flat': {},
+            'n_conditions': len(refs),
+            'lo': np.array(lo, dtype=np.float64),
+            'hi': np.array(hi, dtype=np.float64),
+            'starts': np.array(starts, dtype=np.int64),
+            'rule_positions': rule_positions,
+            'always': always,
+            'callables': [(p, g) for p, g in enumerate(self._gestures) if 'fn' in g],
+        }
+
+    def evaluate(self, features: HandFeatures) -> np.ndarray:
+        """
+        Match every recognizer against every hand
+
+        Returns:
+            (hands, gestures) boolean matrix in registration order
+        """
+        return self._match(features)[0]
+
+    def _call(self, features: HandFeatures, gesture: Dict) -> np.ndarray:
+        kwargs = {name: self._feature(features, name) for name in gesture['features']}
+        return np.asarray(gesture['fn'](**kwargs))
+
+    def _rule_hits(self, features: HandFeatures) -> np.ndarray:
+        """(hands, rules) mask of rules whose every condition holds, for rules with conditions"""
+        compiled = self._compiled
+        hands = len(features)
+        blocks = [self._feature(features, name).reshape(hands, -1) for name in compiled['names']]
+        widths = tuple(block.shape[1] for block in blocks)
+
+        # Condition columns in the side-by-side feature blocks, per block layout
+        flat = compiled['flat'].get(widths)
+        if flat is None:
+            offsets = np.cumsum((0,) + widths)
+            flat = compiled['flat'][widths] = np.array(
+                [offsets[slot] + index for slot, index in compiled['refs']], dtype=np.int64)
+
+        block = blocks[0] if len(blocks) == 1 else np.concatenate(blocks, axis=1)
+        values = block.take(flat, axis=1)
+        satisfied = values >= compiled['lo']
+        satisfied &= values <= compiled['hi']
+        return np.logical_and.reduceat(satisfied, compiled['starts'], axis=1)
+
+    def _match(self, features: HandFeatures) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
+        """Match matrix plus per-hand confidences returned by callables"""
+        if self._compiled is None:
+            self._compile()
+        compiled = self._compiled
+        hands = len(features)
+        matched = np.zeros((hands, len(self._gestures)), dtype=bool)
+        scores = {}
+        if hands == 0:
+            return matched, scores
+
+        if compiled['n_conditions']:
+            matched[:, compiled['rule_positions']] = self._rule_hits(features)
+        matched[:, compiled['always']] = True
+
+        for position, gesture in compiled['callables']:
+            result = self._call(features, gesture)
+            if result.dtype != bool:
+                scores[position] = result
+            matched[:, position] = result > 0
+        return matched, scores
+
+    def _first_hits(self, features: HandFeatures) -> List[Tuple[Optional[int], float]]:
+        """(position, confidence) of the first matching recognizer per hand, batched"""
+        compiled = self._compiled
+        hands = len(features)
+        positions = compiled['rule_positions']
+        picks = [(None, 0.0)] * hands
+        if compiled['n_conditions']:
+            for i, row in enumerate(self._rule_hits(features).tolist()):
+                if True in row:
+                    picks[i] = (positions[row.index(True)], True)
+
+        # Rules without conditions and callables only win if registered earlier
+        if compiled['always']:
+            first = compiled['always'][0]
+            picks = [pick if pick[0] is not None and pick[0] < first else (first, True)
+                     for pick in picks]
+        for position, gesture in compiled['callables']:
+            if all(pick[0] is not None and pick[0] < position for pick in picks):
+                continue
+            result = self._call(features, gesture).tolist()
+            picks = [(position, score) if score > 0 and (pick[0] is None or position < pick[0])
+                     else pick for pick, score in zip(picks, result)]
+        return picks
+
+    def _first_matches(self, features: HandFeatures) -> List[Tuple[Optional[int], float]]:
+        """
+        (position, confidence) of the first matching recognizer per hand
+
+        Walks the rules in order on Python floats pulled from the cached
+        feature arrays, so a hand stops at its first match and features no
+        reached rule needs are never computed.
+        """
+        loaded: Dict[str, list] = {}
+        called: Dict[int, list] = {}
+        order = self._compiled['order']
+        picks = []
+        for i in range(len(features)):
+            pick = (None, 0.0)
+            for position, conds in order:
+                if conds is None:
+                    result = called.get(position)
+                    if result is None:
+                        result = called[position] = self._call(features, self._gestures[position]).tolist()
+                    if result[i] > 0:
+                        pick = (position, result[i])
+                        break
+                    continue
+                for name, index, low, high in conds:
+                    values = loaded.get(name)
+                    if values is None:
+                        values = loaded[name] = self._feature(features, name).tolist()
+                    value = values[i] if index is None else values[i][index]
+                    if not low <= value <= high:
+                        break
+                else:
+                    pick = (position, True)
+                    break
+            picks.append(pick)
+        return picks
+
+    def classify(self, features: HandFeatures) -> List[Dict]:
+        """
+        First matching gesture per hand
+
+        Returns:
+            One {'name', 'confidence', 'curls'} dict per hand
+        """
+        if self._compiled is None:
+            self._compile()
+        hands = len(features)
+        if self._compiled['n_conditions'] * hands <= SCALAR_MATCH_LIMIT:
+            picks = self._first_matches(features)
+        else:
+            picks = self._first_hits(features)
+        curls = features.curls.tolist()
+
+        results = []
+        for i, (position, score) in enumerate(picks):
+            if position is None:
+                name, confidence = self.default
+            else:
+                gesture = self._gestures[position]
+                name = gesture['name']
+                # Boolean matches report the gesture's own confidence
+                confidence = gesture['confidence'] if score is True else float(score)
+            results.append({'name': name, 'confidence': confidence, 'curls': curls[i]})
+        return results
+
+
+def _bounds(op: str, value: float) -> Tuple[float, float]:
+    """Inclusive (lo, hi) range equivalent to `x <op> value` for float64 x"""
+    if op == '<':
+        return -np.inf, float(np.nextafter(value, -np.inf))
+    if op == '<=':
+        return -np.inf, value
+    if op == '>':
+        return float(np.nextafter(value, np.inf)), np.inf
+    if op == '>=':
+        return value, np.inf
+    return value, value
+
+
+def default_gestures() -> GestureRegistry:
+    """The built-in gesture set, in the order of the original if/elif chain"""
+    registry = GestureRegistry(default=("Open Palm", 0.5))
+    registry.add_rule("Open Palm", [('curl_sum', '<', 1.5)], confidence=0.95)
+    registry.add_rule("Fist", [('curl_sum', '>', 4.0)], confidence=0.95)
+    registry.add_rule("Thumbs Up", [('curls[0]', '<', 0.5), ('finger_curl_sum', '>', 3.5),
+                                    ('thumb_up', '==', 1)], confidence=0.85)
+    # Thumb out but not pointing up: the chain stops here without a gesture
+    registry.add_rule("Unknown", [('curls[0]', '<', 0.5), ('finger_curl_sum', '>', 3.5)],
+                      confidence=0.0)
+    registry.add_rule("OK Sign", [('thumb_index', '<', 0.05), ('finger_curl_sum', '<', 2.0)],
+                      confidence=0.90)
+    registry.add_rule("Peace Sign", [('curls[1]', '<', 0.5), ('curls[2]', '<', 0.5),
+                                     ('curls[3]', '>', 0.8), ('curls[4]', '>', 0.8)],
+                      confidence=0.90)
+    return registry
@@ -5,16 +5,43 @@ Using MediaPipe Hands and OpenCV
 
 import cv2
 import numpy as np
-import mediapipe as mp
+import contextlib
+import sys
 from collections import deque
-from typing import Dict, List, Tuple, Optional
-import math
+from typing import AsyncIterator, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
 import time
 
+try:
+    import mediapipe as mp
+except ImportError:
+    mp = None
+
+from async_stream import FrameResult, stream_hands
+from capture import CaptureThread, FrameRing, detector_time
+from latency import NULL_TIMER, StageTimer
+from landmark_filter import OneEuroFilter
+from tracking import HandTracker
+from gesture_registry import default_gestures
+from hand_frame import HAND_DTYPE, HAND_FEATURES, HandFrame
+from pose_classifier import PoseClassifier
+from skin_segmentation import SkinSegmenter
+from temporal_gestures import TemporalGestureEngine
+from prediction import KeyframeScheduler
+from landmark_recording import HANDEDNESS, LandmarkRecorder, LandmarkRecording
+from streaming import STREAM_FORMATS, HandStreamWriter
+from landmark_features import (
+    HandFeatures, TIP_PAIR_NAMES, FINGERTIPS, FINGER_NAMES,
+    landmarks_to_array, hand_extents, hand_centers, bounding_boxes,
+    finger_curls, fingertip_distances, volume_levels,
+)
+
 class HandDetector:
     """MediaPipe-based hand detection with gesture recognition"""
     
-    def __init__(self, max_hands: int = 2, confidence: float = 0.5, model_complexity: int = 1):
+    def __init__(self, max_hands: int = 2, confidence: float = 0.5, model_complexity: int = 1,
+                 roi_tracking: bool = False, roi_refresh_interval: int = 15,
+                 roi_padding: float = 0.5, roi_min_confidence: float = 0.8,
+                 inference_size: Optional[Tuple[int, int]] = None, smoothing: bool = True):
         """
         Initialize hand detector
         
@@ -22,7 +49,17 @@ class HandDetector:
             max_hands: Maximum number of hands to detect
             confidence: Detection confidence threshold (0-1)
             model_complexity: 0=lite, 1=full
+            roi_tracking: Run inference on a crop around the previous hand boxes
+            roi_refresh_interval: Frames between forced full-frame detections
+            roi_padding: Crop padding as a fraction of the hand box size
+            roi_min_confidence: Fall back to full frame when any hand scores below this
+            inference_size: (width, height) the model sees; frames are downscaled
+                to fit it while landmarks stay in full-resolution coordinates
+            smoothing: Apply the One-Euro landmark filter before computing features
         """
+        if mp is None:
+            raise ImportError("mediapipe is not installed")
+        
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.hands = self.mp_hands.Hands(
@@ -32,7 +69,28 @@ class HandDetector:
             min_tracking_confidence=confidence,
             model_complexity=model_complexity
         )
-        
+        self._init_common(max_hands)
+        if smoothing:
+            self.landmark_filter = OneEuroFilter()
+        
+        # ROI tracking state
+        self.roi_tracking = roi_tracking
+        self.roi_refresh_interval = roi_refresh_interval
+        self.roi_padding = roi_padding
+        self.roi_min_confidence = roi_min_confidence
+        self.roi_min_size = 160
+        self._roi: Optional[Tuple[int, int, int, int]] = None
+        self._roi_hand_count = 0
+        self._frames_since_full = 0
+        self.roi_stats = {'full': 0, 'roi': 0}
+        
+        # Inference resolution and reusable input buffers
+        self.inference_size = inference_size
+        self._resize_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
+
+    def _init_common(self, max_hands: int = 2):
+        """Initialize state shared by every landmark-based detector"""
         self.landmark_names = [
             'Wrist', 'Thumb_CMC', 'Thumb_MCP', 'Thumb_IP', 'Thumb_Tip',
             'Index_MCP', 'Index_PIP', 'Index_DIP', 'Index_Tip',
@@ -41,191 +99,322 @@ class HandDetector:
             'Pinky_MCP', 'Pinky_PIP', 'Pinky_DIP', 'Pinky_Tip'
         ]
         
-        # Gesture history for smoothing
-        self.gesture_history = deque(maxlen=10)
-        self.hand_trails = {0: deque(maxlen=30), 1: deque(maxlen=30)}
+        # Per-track motion templates (swipes, circles) matched with streaming DTW
+        self.motion = TemporalGestureEngine()
+        
+        # Persistent track IDs; each track owns its trail and gesture history
+        self.tracker = HandTracker()
+        
+        # Registered gestures, evaluated once per frame for all hands
+        self.gestures = default_gestures()
         
         # Fingertip indices
-        self.fingertips = [4, 8, 12, 16, 20]
-        self.finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+        self.fingertips = FINGERTIPS.tolist()
+        self.finger_names = list(FINGER_NAMES)
+        
+        # Feature arrays from the most recent frame
+        self.last_features: Optional[HandFeatures] = None
+        
+        # Per-stage latency timer (GestureApp installs a StageTimer)
+        self.timer = NULL_TIMER
+        
+        # Landmark smoothing shared by every controller (None = raw landmarks)
+        self.landmark_filter: Optional[OneEuroFilter] = None
+        
+        # Per-hand features consumers declared they read (None = undeclared, all but motion)
+        self.required_features: Optional[Set[str]] = None
+        self._declared_features: Dict[Hashable, Set[str]] = {}
+        
+        # Result rows reused by every frame (grown if a frame has more hands)
+        self._hand_buffer = np.zeros(max_hands, dtype=HAND_DTYPE)
+
+    @property
+    def hand_trails(self) -> Dict[int, deque]:
+        """Center trail per track ID"""
+        return {track_id: track.trail for track_id, track in self.tracker.tracks.items()}
 
-    def detect_hands(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+    def require_features(self, features: Optional[Iterable[str]], consumer: Hashable = None):
+        """
+        Declare the per-hand features a consumer reads
+        
+        Declared features are computed for all hands when a frame is built;
+        undeclared ones stay lazy, and the per-track work behind them is
+        skipped: gesture history without 'gesture'. Reading an undeclared
+        feature still works, it is just computed on first access.
+        
+        Motion matching is stateful, so it cannot be lazy: hands only carry
+        'motion' (swipes, circles, palm velocity) while it is declared.
+        
+        Each consumer's declaration replaces only its own earlier one; the
+        detector computes the union of every consumer's features.
+        
+        Args:
+            features: Names from hand_frame.HAND_FEATURES, or None to drop
+                the consumer's declaration (with none left: everything
+                except 'motion')
+            consumer: Who is declaring, e.g. a GestureController
+                (default: one shared anonymous consumer)
+        """
+        if features is None:
+            self._declared_features.pop(consumer, None)
+        else:
+            features = set(features)
+            unknown = features.difference(HAND_FEATURES)
+            if unknown:
+                raise ValueError(f"Unknown hand features: {sorted(unknown)}")
+            self._declared_features[consumer] = features
+        
+        if self._declared_features:
+            self.required_features = set().union(*self._declared_features.values())
+        else:
+            self.required_features = None
+
+    def stream(self, source=0, **kwargs) -> AsyncIterator[FrameResult]:
+        """
+        Async detection results for a camera or video (see async_stream.stream_hands)
+
+        Usage:
+            async for result in detector.stream(0, flip=True):
+                handle(result.hands)
+        """
+        return stream_hands(self, source, **kwargs)
+
+    def detect_hands(self, frame: np.ndarray,
+                     timestamp: Optional[float] = None) -> Tuple[np.ndarray, List[Dict]]:
         """
         Detect hands in frame
         
         Args:
             frame: Input frame (BGR)
+            timestamp: Frame time in seconds for smoothing, tracking and motion
+                (default: now). Pass the media or capture time when frames are
+                decoded faster or slower than real time.
             
         Returns:
-            Processed frame, List of hand data dicts
+            Processed frame, HandFrame of the detected hands (reused by the
+            next call; copy() it to keep it longer)
         """
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         h, w, c = frame.shape
+        roi = self._roi if self._use_roi() else None
         
+        # Stages are timed by hand: with the default NULL_TIMER, three record
+        # calls cost less than three `with timer.stage()` blocks
+        start = time.perf_counter()
+        frame_rgb = self._prepare_input(frame, roi)
+        converted = time.perf_counter()
         results = self.hands.process(frame_rgb)
-        hands_data = []
+        inferred = time.perf_counter()
+        self.timer.record('convert', converted - start)
+        self.timer.record('inference', inferred - converted)
+        self.last_features = None
         
         if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_idx, (landmarks, handedness) in enumerate(
-                zip(results.multi_hand_landmarks, results.multi_handedness)
-            ):
-                hand_info = {
-                    'id': hand_idx,
-                    'handedness': handedness.classification[0].label,
-                    'confidence': handedness.classification[0].score,
-                    'landmarks': [],
-                    'landmarks_px': [],
-                }
-                
-                # Convert landmarks to pixel coordinates
-                for lm in landmarks.landmark:
-                    hand_info['landmarks'].append((lm.x, lm.y, lm.z))
-                    hand_info['landmarks_px'].append((int(lm.x * w), int(lm.y * h)))
-                
-                # Calculate hand features
-                hand_info['center'] = self._get_hand_center(hand_info['landmarks_px'])
-                hand_info['bbox'] = self._get_bounding_box(hand_info['landmarks_px'])
-                hand_info['gesture'] = self._recognize_gesture(hand_info['landmarks'])
-                hand_info['fingertip_distances'] = self._get_fingertip_distances(hand_info['landmarks'])
-                hand_info['volume_control'] = self._calculate_volume_level(hand_info['landmarks'])
-                
-                hands_data.append(hand_info)
-                
-                # Update trail
-                if hand_idx < 2:
-                    self.hand_trails[hand_idx].append(hand_info['center'])
+            # One (hands, 21, 3) array feeds every feature computation
+            landmarks = landmarks_to_array(results.multi_hand_landmarks)
+            if roi is not None:
+                landmarks = self._roi_to_frame(landmarks, roi, w, h)
+            labels, scores = [], []
+            for hand in results.multi_handedness:
+                classification = hand.classification[0]
+                labels.append(classification.label)
+                scores.append(classification.score)
+        else:
+            landmarks = np.zeros((0, 21, 3), dtype=np.float32)
+            labels, scores = [], []
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        hands_data = self._process_landmarks(landmarks, labels, scores, (w, h), timestamp)
+        self.timer.record('features', time.perf_counter() - inferred)
+        
+        if self.roi_tracking:
+            self._update_roi(hands_data, full_frame=roi is None, frame_size=(w, h))
         
         return frame, hands_data
 
+    def _prepare_input(self, frame: np.ndarray,
+                       roi: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        Crop, downscale and convert the model input in one pass
+        
+        The frame is only read once at full resolution by the resize;
+        the color conversion then runs on the small buffer. Landmarks are
+        normalized, so the scale never leaks into pixel coordinates.
+        """
+        h, w = frame.shape[:2]
+        region = frame if roi is None else frame[roi[1]:roi[3], roi[0]:roi[2]]
+        
+        scale = 1.0
+        if self.inference_size is not None:
+            scale = min(1.0, self.inference_size[0] / w, self.inference_size[1] / h)
+        if scale >= 1.0:
+            return cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+        
+        rh, rw = region.shape[:2]
+        size = (max(1, int(rw * scale)), max(1, int(rh * scale)))
+        shape = (size[1], size[0], 3)
+        if self._resize_buf is None or self._resize_buf.shape != shape:
+            self._resize_buf = np.empty(shape, dtype=np.uint8)
+            self._rgb_buf = np.empty(shape, dtype=np.uint8)
+        
+        cv2.resize(region, size, dst=self._resize_buf, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._resize_buf, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+
+    def _use_roi(self) -> bool:
+        """Whether the next inference can run on the tracked crop"""
+        return (self.roi_tracking and self._roi is not None
+                and self._frames_since_full < self.roi_refresh_interval)
+
+    @staticmethod
+    def _roi_to_frame(landmarks: np.ndarray, roi: Tuple[int, int, int, int],
+                      width: int, height: int) -> np.ndarray:
+        """Map landmarks normalized to a crop back to full-frame normalized coordinates"""
+        x1, y1, x2, y2 = roi
+        crop_w, crop_h = x2 - x1, y2 - y1
+        scale = np.array([crop_w / width, crop_h / height, crop_w / width], dtype=np.float32)
+        offset = np.array([x1 / width, y1 / height, 0.0], dtype=np.float32)
+        return landmarks * scale + offset
+
+    def _update_roi(self, hands_data: List[Dict], full_frame: bool, frame_size: Tuple[int, int]):
+        """Choose the crop for the next frame from this frame's hand boxes"""
+        if full_frame:
+            self.roi_stats['full'] += 1
+            self._frames_since_full = 0
+        else:
+            self.roi_stats['roi'] += 1
+            self._frames_since_full += 1
+        
+        # Lost a hand or confidence dropped: detect on the full frame next time
+        if (not hands_data
+                or (not full_frame and len(hands_data) < self._roi_hand_count)
+                or min(hand['confidence'] for hand in hands_data) < self.roi_min_confidence):
+            self._roi = None
+            self._roi_hand_count = 0
+            return
+        
+        if full_frame:
+            self._roi_hand_count = len(hands_data)
+        
+        w, h = frame_size
+        boxes = np.array([hand['bbox'] for hand in hands_data])
+        bx1, by1 = boxes[:, :2].min(axis=0)
+        bx2, by2 = boxes[:, 2:].max(axis=0)
+        
+        pad = int(self.roi_padding * max(bx2 - bx1, by2 - by1))
+        
+        # Keep the previous crop while the hands stay well inside it so the
+        # tracker sees a stable image; otherwise re-center with padding
+        if self._roi is not None:
+            rx1, ry1, rx2, ry2 = self._roi
+            inset = pad // 2
+            if (bx1 >= rx1 + inset and by1 >= ry1 + inset
+                    and bx2 <= rx2 - inset and by2 <= ry2 - inset):
+                return
+        
+        half = max(self.roi_min_size, max(bx2 - bx1, by2 - by1) + 2 * pad) // 2
+        cx, cy = (bx1 + bx2) // 2, (by1 + by2) // 2
+        self._roi = (
+            int(max(0, cx - half)), int(max(0, cy - half)),
+            int(min(w, cx + half)), int(min(h, cy + half)),
+        )
+
+    def _process_landmarks(self, landmarks: np.ndarray, handedness: List[str], scores: List[float],
+                           frame_size: Tuple[int, int], timestamp: float) -> HandFrame:
+        """Track, filter and featurize one frame's (hands, 21, 3) landmarks"""
+        w, h = frame_size
+        
+        # Associate raw detections with persistent tracks
+        centers, sizes = hand_extents(landmarks, w, h)
+        track_ids = self.tracker.update(centers, sizes, handedness, timestamp)
+        if len(landmarks) == 0:
+            if self.landmark_filter is not None:
+                self.landmark_filter.retain(self.tracker.active_ids())
+            return HandFrame()
+        
+        if self.landmark_filter is not None:
+            landmarks = self.landmark_filter(landmarks, timestamp, track_ids)
+            # Only state beyond this frame's hands can belong to a dropped track
+            if len(self.landmark_filter) > len(track_ids):
+                self.landmark_filter.retain(self.tracker.active_ids())
+        
+        features = HandFeatures(landmarks, (w, h))
+        self.last_features = features
+        return self._build_hands(features, handedness, scores, track_ids, timestamp, centers)
+
+    def _build_hands(self, features: HandFeatures, handedness: List[str],
+                     scores: List[float], track_ids: Optional[List[int]] = None,
+                     timestamp: Optional[float] = None,
+                     centers: Optional[Sequence[Tuple[float, float]]] = None) -> HandFrame:
+        """
+        Wrap the batched features in a HandFrame, computing only declared features
+
+        Args:
+            centers: Pixel trail point per hand, e.g. the tracker's centers
+                (default: features.centers)
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        count = len(features)
+        ids = track_ids if track_ids is not None else range(count)
+        if count > len(self._hand_buffer):
+            self._hand_buffer = np.zeros(count, dtype=HAND_DTYPE)
+        hands = HandFrame.from_features(features, handedness, scores, ids, self.gestures,
+                                        self._hand_buffer)
+        required = self.required_features
+        if required is not None:
+            hands.fill(required)
+        if track_ids is None:
+            return hands
+        
+        # Update per-track trail, gesture history and motion matching
+        history = required is None or 'gesture' in required
+        motion = required is not None and 'motion' in required
+        points = features.centers.tolist() if centers is None else centers
+        gestures = hands.gestures if history else None
+        tracks = self.tracker.tracks
+        for hand_idx, track_id in enumerate(track_ids):
+            track = tracks.get(track_id)
+            if track is None:
+                continue
+            x, y = points[hand_idx]
+            track.trail.append((int(x), int(y)))
+            if history:
+                track.gestures.append(gestures[hand_idx])
+            if motion:
+                hands.motion[hand_idx] = self.motion.update(
+                    track.state, features.landmarks[hand_idx], timestamp)
+        
+        return hands
+
     def _get_hand_center(self, landmarks_px: List[Tuple[int, int]]) -> Tuple[int, int]:
         """Calculate hand center point"""
         if not landmarks_px:
             return (0, 0)
-        x_coords = [p[0] for p in landmarks_px]
-        y_coords = [p[1] for p in landmarks_px]
-        return (int(np.mean(x_coords)), int(np.mean(y_coords)))
+        return tuple(hand_centers(np.asarray(landmarks_px)[None])[0].tolist())
 
     def _get_bounding_box(self, landmarks_px: List[Tuple[int, int]]) -> Tuple[int, int, int, int]:
         """Calculate hand bounding box (x1, y1, x2, y2)"""
         if not landmarks_px:
             return (0, 0, 0, 0)
-        x_coords = [p[0] for p in landmarks_px]
-        y_coords = [p[1] for p in landmarks_px]
-        margin = 20
-        return (
-            max(0, min(x_coords) - margin),
-            max(0, min(y_coords) - margin),
-            max(x_coords) + margin,
-            max(y_coords) + margin
-        )
+        return tuple(bounding_boxes(np.asarray(landmarks_px)[None])[0].tolist())
 
     def _recognize_gesture(self, landmarks: List[Tuple[float, float, float]]) -> Dict[str, any]:
         """Recognize hand gesture from landmarks"""
-        
-        # Get fingertip positions
-        fingertips = [landmarks[i] for i in self.fingertips]
-        
-        # Calculate finger curl (0 = open, 1 = closed)
-        curls = self._calculate_finger_curl(landmarks)
-        
-        # Calculate distances between key points
-        thumb_index_dist = self._distance(landmarks[4], landmarks[8])
-        thumb_middle_dist = self._distance(landmarks[4], landmarks[12])
-        index_middle_dist = self._distance(landmarks[8], landmarks[12])
-        
-        # Gesture recognition logic
-        gesture_name = "Unknown"
-        confidence = 0.0
-        
-        # All fingers open - Open Palm
-        if sum(curls) < 1.5:
-            gesture_name = "Open Palm"
-            confidence = 0.95
-        
-        # All fingers closed - Fist
-        elif sum(curls) > 4.0:
-            gesture_name = "Fist"
-            confidence = 0.95
-        
-        # Thumb up - Thumbs Up
-        elif curls[0] < 0.5 and sum(curls[1:]) > 3.5:
-            # Check if thumb points upward
-            if landmarks[4][1] < landmarks[3][1] < landmarks[2][1]:
-                gesture_name = "Thumbs Up"
-                confidence = 0.85
-        
-        # OK sign - Circle with thumb and index
-        elif thumb_index_dist < 0.05 and sum(curls[1:]) < 2.0:
-            gesture_name = "OK Sign"
-            confidence = 0.90
-        
-        # Peace sign - Index and middle up, others closed
-        elif curls[1] < 0.5 and curls[2] < 0.5 and curls[3] > 0.8 and curls[4] > 0.8:
-            gesture_name = "Peace Sign"
-            confidence = 0.90
-        
-        # Default to Open Palm if uncertain
-        else:
-            gesture_name = "Open Palm"
-            confidence = 0.5
-        
-        return {
-            'name': gesture_name,
-            'confidence': confidence,
-            'curls': curls
-        }
+        batch = np.asarray(landmarks, dtype=np.float32)[None]
+        return self.gestures.classify(HandFeatures(batch, (1, 1)))[0]
 
     def _calculate_finger_curl(self, landmarks: List[Tuple[float, float, float]]) -> List[float]:
         """Calculate curl amount for each finger (0-1, where 1 = fully curled)"""
-        curls = []
-        
-        # Finger structure: [MCP, PIP, DIP, Tip]
-        finger_indices = [
-            [2, 3, 4],      # Thumb
-            [5, 6, 7, 8],   # Index
-            [9, 10, 11, 12], # Middle
-            [13, 14, 15, 16], # Ring
-            [17, 18, 19, 20]  # Pinky
-        ]
-        
-        for finger in finger_indices:
-            # Distance from joint to tip
-            tip_pos = landmarks[finger[-1]]
-            
-            # Calculate how much finger is curled
-            distances = []
-            for i in range(len(finger) - 1):
-                d = self._distance(landmarks[finger[i]], tip_pos)
-                distances.append(d)
-            
-            # Curl is based on tip proximity to earlier joints
-            curl = 1.0 if min(distances) < 0.1 else 0.0
-            curls.append(curl)
-        
-        return curls
+        return finger_curls(np.asarray(landmarks, dtype=np.float32)[None])[0].tolist()
 
     def _get_fingertip_distances(self, landmarks: List[Tuple[float, float, float]]) -> Dict[str, float]:
         """Get distances between fingertips"""
-        distances = {}
-        for i, name1 in enumerate(self.finger_names):
-            for j, name2 in enumerate(self.finger_names):
-                if i < j:
-                    dist = self._distance(landmarks[self.fingertips[i]], landmarks[self.fingertips[j]])
-                    distances[f"{name1}-{name2}"] = dist
-        return distances
+        distances = fingertip_distances(np.asarray(landmarks, dtype=np.float32)[None])[0]
+        return dict(zip(TIP_PAIR_NAMES, distances.tolist()))
 
     def _calculate_volume_level(self, landmarks: List[Tuple[float, float, float]]) -> float:
         """Calculate volume level based on thumb-index distance (0-100)"""
-        thumb_index_dist = self._distance(landmarks[4], landmarks[8])
-        # Scale distance (0-0.3) to volume (0-100)
-        volume = max(0, min(100, thumb_index_dist * 333))
-        return volume
-
-    @staticmethod
-    def _distance(p1: Tuple[float, float, float], 
-                  p2: Tuple[float, float, float]) -> float:
-        """Calculate Euclidean distance between two 3D points"""
-        return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2)
+        distances = fingertip_distances(np.asarray(landmarks, dtype=np.float32)[None])
+        return float(volume_levels(distances)[0])
 
     def draw_hands(self, frame: np.ndarray, hands_data: List[Dict]) -> np.ndarray:
         """Draw hand landmarks and information on frame"""
@@ -267,7 +456,7 @@ class HandDetector:
             cv2.circle(frame, (cx, cy), 10, (0, 255, 255), 2)
             
             # Draw trail
-            trail = self.hand_trails[hand['id']]
+            trail = self.hand_trails.get(hand['id'], ())
             for i in range(1, len(trail)):
                 cv2.line(frame, trail[i-1], trail[i], (255, 100, 100), 1)
             
@@ -308,34 +497,33 @@ class HandDetector:
 class FallbackHandDetector:
     """Fallback hand detection using skin detection and contours"""
     
-    def __init__(self):
-        """Initialize fallback detector"""
-        # HSV range for skin color
-        self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
-        self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
+    def __init__(self, scale: float = 0.25, max_hands: int = 2, learn_skin: bool = True):
+        """
+        Initialize fallback detector
         
-        self.hand_trails = {0: deque(maxlen=30), 1: deque(maxlen=30)}
-
-    def detect_hands(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
-        """Detect hands using skin detection"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, self.lower_skin, self.upper_skin)
+        Args:
+            scale: Size of the image searched for skin relative to the frame;
+                candidate regions are refined at full resolution
+            max_hands: Maximum number of hands to detect
+            learn_skin: Learn a per-session skin histogram from detected hands
+        """
+        self.segmenter = SkinSegmenter(scale=scale, max_regions=max_hands,
+                                       learning_rate=0.05 if learn_skin else 0.0)
         
-        # Morphological operations
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        self.hand_trails = {i: deque(maxlen=30) for i in range(max_hands)}
         
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Per-stage latency timer (GestureApp installs a StageTimer)
+        self.timer = NULL_TIMER
+
+    def detect_hands(self, frame: np.ndarray,
+                     timestamp: Optional[float] = None) -> Tuple[np.ndarray, List[Dict]]:
+        """Detect hands using skin detection (untracked, so the timestamp is unused)"""
+        with self.timer.stage('inference'):
+            contours = self.segmenter.segment(frame)
         
         hands_data = []
         
-        for idx, contour in enumerate(sorted(contours, key=cv2.contourArea, reverse=True)[:2]):
-            area = cv2.contourArea(contour)
-            if area < 500:
-                continue
-            
+        for idx, contour in enumerate(contours):
             # Get bounding box
             x, y, w, h = cv2.boundingRect(contour)
             
@@ -367,9 +555,7 @@ class FallbackHandDetector:
             }
             
             hands_data.append(hand_info)
-            
-            if idx < 2:
-                self.hand_trails[idx].append((cx, cy))
+            self.hand_trails[idx].append((cx, cy))
         
         return frame, hands_data
 
@@ -390,7 +576,7 @@ class FallbackHandDetector:
             cv2.circle(frame, hand['center'], 8, (0, 255, 255), -1)
             
             # Draw trail
-            trail = self.hand_trails[hand['id']]
+            trail = self.hand_trails.get(hand['id'], ())
             for i in range(1, len(trail)):
                 cv2.line(frame, trail[i-1], trail[i], (255, 100, 100), 1)
             
@@ -402,11 +588,79 @@ class FallbackHandDetector:
         return frame
 
 
+class ReplayDetector(HandDetector):
+    """Replays a binary landmark recording through the HandDetector interface"""
+    
+    def __init__(self, path: str, loop: bool = False):
+        """
+        Initialize replay detector
+        
+        Args:
+            path: Recording written by LandmarkRecorder
+            loop: Restart from the first frame when the recording ends
+        """
+        self.mp_hands = None
+        self.mp_drawing = None
+        self.hands = None
+        self._init_common()
+        
+        self.recording = LandmarkRecording(path)
+        self.loop = loop
+        self.position = 0
+        self.finished = len(self.recording) == 0
+        self.last_timestamp: Optional[float] = None
+
+    def detect_hands(self, frame: Optional[np.ndarray] = None,
+                     timestamp: Optional[float] = None) -> Tuple[Optional[np.ndarray], List[Dict]]:
+        """
+        Return the next recorded frame's hands
+        
+        Args:
+            frame: Optional frame; its size is used for pixel coordinates,
+                otherwise the recorded frame size is used
+            timestamp: Ignored; the recorded frame time is used
+            
+        Returns:
+            The frame passed in, List of hand data dicts
+        """
+        self.last_features = None
+        if self.position >= len(self.recording):
+            if not self.loop or len(self.recording) == 0:
+                self.finished = True
+                return frame, HandFrame()
+            self.position = 0
+        
+        timestamp, hands = self.recording.frame(self.position)
+        self.position += 1
+        self.last_timestamp = timestamp
+        
+        if frame is not None:
+            h, w = frame.shape[:2]
+        else:
+            w, h = self.recording.frame_size
+        
+        # Landmarks are a read-only view straight into the mapped file
+        hands_data = self._process_landmarks(
+            hands['landmarks'],
+            [HANDEDNESS[i] for i in hands['handedness'].tolist()],
+            hands['confidence'].tolist(),
+            (w, h),
+            timestamp,
+        )
+        return frame, hands_data
+
+
 class GestureApp:
     """Main application for hand detection and gesture recognition"""
     
     def __init__(self, use_fallback: bool = False, camera_id: int = 0, 
-                 fps_limit: int = 30, resolution: Tuple[int, int] = (1280, 720)):
+                 fps_limit: int = 30, resolution: Tuple[int, int] = (1280, 720),
+                 threaded_capture: bool = True, roi_tracking: bool = False,
+                 inference_size: Optional[Tuple[int, int]] = None,
+                 record_path: Optional[str] = None, latency_log_interval: float = 0.0,
+                 latency_json: Optional[str] = None, headless: bool = False,
+                 stream_path: Optional[str] = None, stream_format: str = 'ndjson',
+                 keyframe_max_interval: int = 1, pose_model: Optional[str] = None):
         """
         Initialize gesture recognition app
         
@@ -415,137 +669,190 @@ class GestureApp:
             camera_id: Webcam ID
             fps_limit: Target FPS
             resolution: (width, height)
+            threaded_capture: Read the camera on a background thread and
+                always process the newest frame
+            roi_tracking: Run inference on a crop around the previous hand boxes
+            inference_size: (width, height) used for detection; drawing stays
+                at the capture resolution
+            record_path: Write detected landmarks to this binary recording
+            latency_log_interval: Seconds between p50/p95/p99 console logs (0 = off)
+            latency_json: Write per-stage latency histograms here on exit
+            headless: Skip all drawing and window work
+            stream_path: Stream per-frame hand records here ('-' = stdout)
+            stream_format: 'ndjson' or 'binary'
+            keyframe_max_interval: Run inference at most this many frames apart and
+                extrapolate landmarks in between (1 = every frame)
+            pose_model: Trained PoseClassifier (.npz) matched ahead of the rule gestures
         """
         self.camera_id = camera_id
         self.fps_limit = fps_limit
         self.resolution = resolution
         self.use_fallback = use_fallback
+        self.threaded_capture = threaded_capture
+        self.inference_size = inference_size
+        self.record_path = record_path
+        self.headless = headless
+        self.stream_path = stream_path
+        self.stream_format = stream_format
         
         # Initialize detector
         try:
             if use_fallback:
                 raise ImportError("Using fallback detector")
-            self.detector = HandDetector(max_hands=2, confidence=0.5)
+            self.detector = HandDetector(max_hands=2, confidence=0.5, roi_tracking=roi_tracking,
+                                         inference_size=inference_size)
             self.detector_type = "MediaPipe"
         except:
-            print("MediaPipe not available, using fallback detector")
+            print("MediaPipe not available, using fallback detector", file=sys.stderr)
             self.detector = FallbackHandDetector()
             self.detector_type = "Fallback (Skin Detection)"
         
         # Performance tracking
         self.frame_times = deque(maxlen=30)
         self.gesture_counts = {}
+        self.latency_log_interval = latency_log_interval
+        self.latency_json = latency_json
+        self.timer = StageTimer(['capture', 'flip', 'convert', 'inference', 'features',
+                                 'draw_hands', 'overlay', 'imshow', 'sleep'])
+        self.detector.timer = self.timer
+        
+        # Learned poses take precedence over the built-in rules
+        if pose_model and isinstance(self.detector, HandDetector):
+            PoseClassifier.load(pose_model).attach(self.detector.gestures)
+        
+        # Predict between keyframes (landmark detectors only)
+        if keyframe_max_interval > 1 and isinstance(self.detector, HandDetector):
+            self.detector = KeyframeScheduler(self.detector, max_interval=keyframe_max_interval)
 
     def run(self):
         """Main application loop"""
+        stream = None
+        if self.stream_path:
+            stream = HandStreamWriter(self.stream_path, self.stream_format, self.resolution)
+        
+        if stream is not None and self.stream_path == '-':
+            # Keep stdout clean for the hand stream
+            with contextlib.redirect_stdout(sys.stderr):
+                self._run(stream)
+        else:
+            self._run(stream)
+
+    def _run(self, stream: Optional[HandStreamWriter]):
+        """Capture, detect and (unless headless) render until quit or end of input"""
         cap = cv2.VideoCapture(self.camera_id)
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
         cap.set(cv2.CAP_PROP_FPS, 30)
         
+        # Background capture keeps only the newest frame
+        capture_thread = None
+        if self.threaded_capture:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            capture_thread = CaptureThread(cap, FrameRing(capacity=2))
+            capture_thread.start()
+        
+        recorder = None
+        if self.record_path:
+            frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                          int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            recorder = LandmarkRecorder(self.record_path, frame_size)
+        
         print(f"\n{'='*60}")
         print(f"Hand Detection & Gesture Recognition System")
         print(f"Detector: {self.detector_type}")
         print(f"Resolution: {self.resolution}")
+        if self.inference_size:
+            print(f"Inference size: {self.inference_size}")
+        if self.headless:
+            print(f"Headless: streaming {self.stream_format} to {self.stream_path or 'nowhere'}")
         print(f"{'='*60}")
-        print("\nControls:")
-        print("  'q'     - Quit")
-        print("  'f'     - Toggle fullscreen")
-        print("  's'     - Save screenshot")
-        print("  'r'     - Reset gesture counter")
-        print("  'm'     - Toggle mouse control visualization")
-        print("\n")
-        
-        fullscreen = False
-        show_mouse = True
+        if self.headless:
+            print("\nPress Ctrl+C to stop\n")
+        else:
+            print("\nControls:")
+            print("  'q'     - Quit")
+            print("  'f'     - Toggle fullscreen")
+            print("  's'     - Save screenshot")
+            print("  'r'     - Reset gesture counter")
+            print("  'm'     - Toggle mouse control visualization")
+            print("  'l'     - Toggle latency panel")
+            print("\n")
+        
+        ui = {'fullscreen': False, 'show_mouse': True, 'show_latency': False}
         frame_count = 0
         start_time = time.time()
+        last_latency_log = start_time
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_start = time.time()
-            
-            # Flip for mirror view
-            frame = cv2.flip(frame, 1)
-            
-            # Detect hands
-            frame, hands_data = self.detector.detect_hands(frame)
-            
-            # Draw hands
-            frame = self.detector.draw_hands(frame, hands_data)
-            
-            # Update gesture counter
-            for hand in hands_data:
-                gesture_name = hand['gesture']['name']
-                self.gesture_counts[gesture_name] = self.gesture_counts.get(gesture_name, 0) + 1
-            
-            # Draw mouse position if enabled
-            if show_mouse:
-                mouse_pos = self.detector.get_mouse_position(hands_data)
-                if mouse_pos:
-                    cv2.circle(frame, mouse_pos, 15, (100, 200, 255), 2)
-                    cv2.putText(frame, "MOUSE", (mouse_pos[0] - 30, mouse_pos[1] - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 200, 255), 2)
-            
-            # Draw FPS
-            frame_time = time.time() - frame_start
-            self.frame_times.append(frame_time)
-            fps = 1 / (sum(self.frame_times) / len(self.frame_times)) if self.frame_times else 0
-            
-            cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Draw hand count
-            cv2.putText(frame, f"Hands Detected: {len(hands_data)}", (10, 70),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # Draw gesture statistics
-            stats_y = 110
-            for gesture, count in sorted(self.gesture_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
-                cv2.putText(frame, f"{gesture}: {count}", (10, stats_y),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-                stats_y += 30
-            
-            # Display frame
-            if fullscreen:
-                cv2.namedWindow('Hand Detection', cv2.WND_PROP_FULLSCREEN)
-                cv2.setWindowProperty('Hand Detection', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-            else:
-                cv2.namedWindow('Hand Detection', cv2.WINDOW_NORMAL)
-                cv2.resizeWindow('Hand Detection', self.resolution[0], self.resolution[1])
-            
-            cv2.imshow('Hand Detection', frame)
-            
-            # Handle keyboard input
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('f'):
-                fullscreen = not fullscreen
-            elif key == ord('s'):
-                filename = f"screenshot_{int(time.time())}.png"
-                cv2.imwrite(filename, frame)
-                print(f"Screenshot saved: {filename}")
-            elif key == ord('r'):
-                self.gesture_counts.clear()
-                print("Gesture counter reset")
-            elif key == ord('m'):
-                show_mouse = not show_mouse
-                print(f"Mouse visualization: {'ON' if show_mouse else 'OFF'}")
-            
-            # FPS limiting
-            elapsed = time.time() - frame_start
-            sleep_time = max(0, 1/self.fps_limit - elapsed)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            
-            frame_count += 1
-        
+        try:
+            while True:
+                capture_start = time.perf_counter()
+                if capture_thread is not None:
+                    item = capture_thread.ring.get_latest(timeout=1.0)
+                    if item is None:
+                        if capture_thread.ring.closed:
+                            break
+                        continue
+                    frame, capture_time = item[0], item[1]
+                    clock = capture_time
+                else:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    capture_time = time.time()
+                    clock = detector_time(cap, isinstance(self.camera_id, int), capture_time)
+                self.timer.record('capture', time.perf_counter() - capture_start)
+                
+                frame_start = time.time()
+                
+                # Flip for mirror view
+                with self.timer.stage('flip'):
+                    frame = cv2.flip(frame, 1)
+                
+                # Detect hands
+                frame, hands_data = self.detector.detect_hands(frame, clock)
+                if recorder is not None:
+                    recorder.record(hands_data, capture_time)
+                if stream is not None:
+                    stream.write(frame_count, hands_data, capture_time)
+                
+                # Update gesture counter
+                for hand in hands_data:
+                    gesture_name = hand['gesture']['name']
+                    self.gesture_counts[gesture_name] = self.gesture_counts.get(gesture_name, 0) + 1
+                
+                if not self.headless:
+                    if not self._render(frame, hands_data, frame_start, ui):
+                        break
+                
+                # FPS limiting
+                elapsed = time.time() - frame_start
+                sleep_time = max(0, 1/self.fps_limit - elapsed)
+                with self.timer.stage('sleep'):
+                    if sleep_time > 0:
+                        time.sleep(sleep_time)
+                
+                frame_count += 1
+                
+                # Periodic latency log
+                if self.latency_log_interval > 0 and time.time() - last_latency_log >= self.latency_log_interval:
+                    last_latency_log = time.time()
+                    print(f"Latency after {frame_count} frames:")
+                    print("\n".join(self.timer.log_lines()))
+        except KeyboardInterrupt:
+            print("\n\nApplication interrupted by user")
+        except BrokenPipeError:
+            print("\n\nStream consumer closed the pipe")
+            stream = None
+        
+        if capture_thread is not None:
+            capture_thread.stop()
         cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        if recorder is not None:
+            recorder.close()
+        if stream is not None:
+            stream.close()
         
         # Print summary
         print(f"\n{'='*60}")
@@ -553,10 +860,98 @@ class GestureApp:
         print(f"Total frames: {frame_count}")
         print(f"Duration: {time.time() - start_time:.1f}s")
         print(f"Average FPS: {frame_count / (time.time() - start_time):.1f}")
+        if isinstance(self.detector, KeyframeScheduler):
+            print(f"Observed frames: {self.detector.stats['observed']}")
+            print(f"Predicted frames: {self.detector.stats['predicted']}")
+        if capture_thread is not None:
+            stats = capture_thread.ring.stats()
+            print(f"Captured frames: {stats['captured']}")
+            print(f"Processed frames: {stats['processed']}")
+            print(f"Dropped frames: {stats['dropped']}")
+        print(f"\nStage Latency:")
+        print("\n".join(self.timer.log_lines()))
         print(f"\nGesture Statistics:")
         for gesture, count in sorted(self.gesture_counts.items(), key=lambda x: x[1], reverse=True):
             print(f"  {gesture}: {count} detections")
         print(f"{'='*60}\n")
+        
+        if self.latency_json:
+            self.timer.dump_json(self.latency_json)
+            print(f"Latency histograms saved: {self.latency_json}")
+
+    def _render(self, frame: np.ndarray, hands_data: List[Dict],
+                frame_start: float, ui: Dict[str, bool]) -> bool:
+        """Draw overlays, show the frame and handle keys; returns False to quit"""
+        # Draw hands
+        with self.timer.stage('draw_hands'):
+            frame = self.detector.draw_hands(frame, hands_data)
+        
+        overlay_start = time.perf_counter()
+        
+        # Draw mouse position if enabled
+        if ui['show_mouse']:
+            mouse_pos = self.detector.get_mouse_position(hands_data)
+            if mouse_pos:
+                cv2.circle(frame, mouse_pos, 15, (100, 200, 255), 2)
+                cv2.putText(frame, "MOUSE", (mouse_pos[0] - 30, mouse_pos[1] - 20),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 200, 255), 2)
+        
+        # Draw FPS
+        frame_time = time.time() - frame_start
+        self.frame_times.append(frame_time)
+        fps = 1 / (sum(self.frame_times) / len(self.frame_times)) if self.frame_times else 0
+        
+        cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        
+        # Draw hand count
+        cv2.putText(frame, f"Hands Detected: {len(hands_data)}", (10, 70),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        
+        # Draw gesture statistics
+        stats_y = 110
+        for gesture, count in sorted(self.gesture_counts.items(), key=lambda x: x[1], reverse=True)[:5]:
+            cv2.putText(frame, f"{gesture}: {count}", (10, stats_y),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            stats_y += 30
+        
+        # Draw latency panel
+        if ui['show_latency']:
+            self.timer.draw_panel(frame, x=frame.shape[1] - 340, y=10)
+        self.timer.record('overlay', time.perf_counter() - overlay_start)
+        
+        # Display frame
+        with self.timer.stage('imshow'):
+            if ui['fullscreen']:
+                cv2.namedWindow('Hand Detection', cv2.WND_PROP_FULLSCREEN)
+                cv2.setWindowProperty('Hand Detection', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            else:
+                cv2.namedWindow('Hand Detection', cv2.WINDOW_NORMAL)
+                cv2.resizeWindow('Hand Detection', self.resolution[0], self.resolution[1])
+            
+            cv2.imshow('Hand Detection', frame)
+            
+            # Handle keyboard input
+            key = cv2.waitKey(1) & 0xFF
+        
+        if key == ord('q'):
+            return False
+        elif key == ord('f'):
+            ui['fullscreen'] = not ui['fullscreen']
+        elif key == ord('s'):
+            filename = f"screenshot_{int(time.time())}.png"
+            cv2.imwrite(filename, frame)
+            print(f"Screenshot saved: {filename}")
+        elif key == ord('r'):
+            self.gesture_counts.clear()
+            print("Gesture counter reset")
+        elif key == ord('m'):
+            ui['show_mouse'] = not ui['show_mouse']
+            print(f"Mouse visualization: {'ON' if ui['show_mouse'] else 'OFF'}")
+        elif key == ord('l'):
+            ui['show_latency'] = not ui['show_latency']
+        
+        return True
 
 
 if __name__ == "__main__":
@@ -568,6 +963,30 @@ if __name__ == "__main__":
     parser.add_argument("--width", type=int, default=1280, help="Frame width")
     parser.add_argument("--height", type=int, default=720, help="Frame height")
     parser.add_argument("--fallback", action="store_true", help="Use fallback detector")
+    parser.add_argument("--no-threaded-capture", action="store_true",
+                        help="Read the camera in the main loop instead of a capture thread")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="Run inference on a crop around the previous hand boxes")
+    parser.add_argument("--record", type=str, default=None,
+                        help="Record detected landmarks to a binary file")
+    parser.add_argument("--latency-log", type=float, default=0.0,
+                        help="Seconds between per-stage latency logs (0 = off)")
+    parser.add_argument("--latency-json", type=str, default=None,
+                        help="Write per-stage latency histograms to this file on exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="Skip drawing and windows; use with --stream")
+    parser.add_argument("--stream", type=str, default=None,
+                        help="Stream per-frame hand records to a file or '-' for stdout")
+    parser.add_argument("--stream-format", choices=STREAM_FORMATS, default="ndjson",
+                        help="Stream record format")
+    parser.add_argument("--keyframe-max", type=int, default=1,
+                        help="Max frames between inference runs; landmarks are predicted in between")
+    parser.add_argument("--inference-width", type=int, default=0,
+                        help="Detection width (0 = same as frame)")
+    parser.add_argument("--inference-height", type=int, default=0,
+                        help="Detection height (0 = same as frame)")
+    parser.add_argument("--pose-model", type=str, default=None,
+                        help="Trained pose classifier (.npz) from pose_classifier.py")
     
     args = parser.parse_args()
     
@@ -575,7 +994,19 @@ if __name__ == "__main__":
         use_fallback=args.fallback,
         camera_id=args.camera,
         fps_limit=args.fps,
-        resolution=(args.width, args.height)
+        resolution=(args.width, args.height),
+        threaded_capture=not args.no_threaded_capture,
+        roi_tracking=args.roi_tracking,
+        inference_size=((args.inference_width, args.inference_height)
+                        if args.inference_width and args.inference_height else None),
+        record_path=args.record,
+        latency_log_interval=args.latency_log,
+        latency_json=args.latency_json,
+        headless=args.headless,
+        stream_path=args.stream,
+        stream_format=args.stream_format,
+        keyframe_max_interval=args.keyframe_max,
+        pose_model=args.pose_model
     )
     
     try:
@@ -0,0 +1,388 @@
+"""
+Hand Frame Results
+Per-frame hand results backed by one structured NumPy buffer, with dict-style access
+"""
+
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from landmark_features import HandFeatures, NUM_LANDMARKS, TIP_PAIR_NAMES
+from landmark_recording import HANDEDNESS
+
+HAND_DTYPE = np.dtype([
+    ('id', '<i4'),
+    ('handedness', 'u1'),                      # Index into HANDEDNESS
+    ('confidence', '<f8'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),  # Normalized (x, y, z)
+    ('landmarks_px', '<i4', (NUM_LANDMARKS, 2)),
+    ('center', '<i4', (2,)),
+    ('bbox', '<i4', (4,)),                     # x1, y1, x2, y2
+    ('curls', '<f4', (5,)),
+    ('tip_distances', '<f4', (len(TIP_PAIR_NAMES),)),
+    ('volume', '<f4'),
+    ('gesture_confidence', '<f8'),
+])
+
+# Columns written when a legacy key (or a declared feature) is first needed
+KEY_COLUMNS = {
+    'landmarks_px': ('landmarks_px',),
+    'center': ('center',),
+    'bbox': ('bbox',),
+    'gesture': ('curls', 'gesture_confidence'),
+    'fingertip_distances': ('tip_distances',),
+    'volume_control': ('volume',),
+}
+COLUMN_KEYS = {column: key for key, columns in KEY_COLUMNS.items() for column in columns}
+COLUMN_KEYS['curls'] = 'curls'
+
+# Features a consumer can declare up front (HandDetector.require_features)
+HAND_FEATURES = tuple(KEY_COLUMNS) + ('motion',)
+
+# Keys of the legacy per-hand dict
+FIELDS = ('id', 'handedness', 'confidence', 'landmarks', 'landmarks_px', 'center',
+          'bbox', 'gesture', 'fingertip_distances', 'volume_control')
+FIELD_SET = frozenset(FIELDS)
+
+
+class Hand:
+    """
+    One hand of a HandFrame: typed accessors over its buffer row
+
+    Also behaves like the legacy per-hand dict (hand['landmarks_px'][8],
+    hand.get('motion'), 'landmarks' in hand, ...); those values are built on
+    first access and then reused. All state lives in the frame, so any two
+    Hands for the same row see the same values.
+    """
+
+    __slots__ = ('_frame', '_index')
+
+    def __init__(self, frame: 'HandFrame', index: int):
+        self._frame = frame
+        self._index = index
+
+    # Typed accessors
+
+    @property
+    def id(self) -> int:
+        return int(self._frame.data['id'][self._index])
+
+    @property
+    def handedness(self) -> str:
+        return HANDEDNESS[self._frame.data['handedness'][self._index]]
+
+    @property
+    def confidence(self) -> float:
+        return float(self._frame.data['confidence'][self._index])
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(21, 3) float32 view of the normalized landmarks"""
+        return self._frame.data['landmarks'][self._index]
+
+    @property
+    def landmarks_px(self) -> np.ndarray:
+        """(21, 2) int32 view of the pixel landmarks"""
+        return self._frame.column('landmarks_px')[self._index]
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return tuple(self._frame.column('center')[self._index].tolist())
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return tuple(self._frame.column('bbox')[self._index].tolist())
+
+    @property
+    def curls(self) -> np.ndarray:
+        return self._frame.column('curls')[self._index]
+
+    @property
+    def tip_distances(self) -> np.ndarray:
+        """(10,) fingertip distances in TIP_PAIR_NAMES order"""
+        return self._frame.column('tip_distances')[self._index]
+
+    @property
+    def volume(self) -> float:
+        return float(self._frame.column('volume')[self._index])
+
+    @property
+    def gesture(self) -> str:
+        return self._frame.gestures[self._index]
+
+    @property
+    def gesture_confidence(self) -> float:
+        return float(self._frame.column('gesture_confidence')[self._index])
+
+    @property
+    def motion(self) -> Optional[Dict]:
+        return self._frame.motion[self._index]
+
+    # Dict compatibility
+
+    def _build(self, key: str) -> Any:
+        frame, i = self._frame, self._index
+        if key == 'id':
+            return self.id
+        if key == 'handedness':
+            return self.handedness
+        if key == 'confidence':
+            return self.confidence
+        if key == 'landmarks':
+            return list(map(tuple, frame.data['landmarks'][i].tolist()))
+        if key == 'landmarks_px':
+            return list(map(tuple, frame.column('landmarks_px')[i].tolist()))
+        if key == 'center':
+            return self.center
+        if key == 'bbox':
+            return self.bbox
+        if key == 'gesture':
+            return {'name': self.gesture, 'confidence': self.gesture_confidence,
+                    'curls': frame.column('curls')[i].tolist()}
+        if key == 'fingertip_distances':
+            return dict(zip(TIP_PAIR_NAMES, frame.column('tip_distances')[i].tolist()))
+        if key == 'volume_control':
+            return self.volume
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        # Legacy keys never land in motion or extras (see __setitem__)
+        if key in FIELD_SET:
+            legacy = self._frame._legacy[self._index]
+            if legacy is not None and key in legacy:
+                return legacy[key]
+            # Read on every frame: the frame already keeps the registry's dicts
+            if key == 'gesture':
+                results = self._frame._classify()
+                if results:
+                    return results[self._index]
+            if legacy is None:
+                legacy = self._frame._legacy[self._index] = {}
+            value = legacy[key] = self._build(key)
+            return value
+        if key == 'motion' and self._frame.motion[self._index] is not None:
+            return self._frame.motion[self._index]
+        extras = self._frame.extras[self._index]
+        if extras is not None and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == 'motion':
+            self._frame.motion[self._index] = value
+            return
+        if key in FIELD_SET:
+            # Overrides shadow the buffer for dict-style reads; typed accessors
+            # and frame.data keep the detected values
+            if self._frame._legacy[self._index] is None:
+                self._frame._legacy[self._index] = {}
+            self._frame._legacy[self._index][key] = value
+            return
+        if self._frame.extras[self._index] is None:
+            self._frame.extras[self._index] = {}
+        self._frame.extras[self._index][key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        keys = list(HandFrame.FIELDS)
+        if self._frame.motion[self._index] is not None:
+            keys.append('motion')
+        extras = self._frame.extras[self._index]
+        if extras:
+            keys.extend(extras)
+        return keys
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Independent legacy dict for this hand"""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Hand(id={self.id}, {self.handedness}, {self.gesture}, center={self.center})"
+
+
+class HandFrame:
+    """
+    All hands detected in one frame
+
+    Numeric fields live in one (hands,) HAND_DTYPE array, usually a view into
+    the detector's preallocated buffer, so the next detect_hands call reuses
+    it: call copy() to keep a frame past that. Track IDs, handedness,
+    confidence and landmarks are copied in up front; every other column is
+    computed from the frame's HandFeatures the first time any hand reads it,
+    and the gesture registry only runs when a gesture is read. Hand objects are thin views created on access; the
+    frame does not keep them, so it never sits in a reference cycle and is
+    freed as soon as the caller drops it.
+    Iterates and indexes like the legacy list of hand dicts.
+    """
+
+    __slots__ = ('data', 'motion', 'extras', '_features', '_registry', '_filled',
+                 '_gestures', '_results', '_legacy')
+
+    FIELDS = FIELDS
+
+    def __init__(self, count: int = 0, data: Optional[np.ndarray] = None):
+        """
+        Empty frame of `count` hands
+
+        Args:
+            count: Number of hands
+            data: HAND_DTYPE array with at least `count` rows to store them in
+                (default: a new zeroed array)
+        """
+        self.data = np.zeros(count, dtype=HAND_DTYPE) if data is None else data[:count]
+        self.motion: List[Optional[Dict]] = [None] * count
+        self.extras: List[Optional[Dict]] = [None] * count
+        self._features: Optional[HandFeatures] = None
+        self._registry = None
+        self._filled: Set[str] = set()
+        self._gestures: List[str] = [''] * count
+        self._results: Optional[List[Dict]] = None
+        self._legacy: List[Optional[Dict[str, Any]]] = [None] * count
+
+    @classmethod
+    def from_features(cls, features: HandFeatures, handedness: Sequence[str],
+                      scores: Sequence[float], ids: Sequence[int], registry,
+                      buffer: Optional[np.ndarray] = None) -> 'HandFrame':
+        """
+        Wrap one frame of batched features
+
+        Args:
+            features: Batched features of every hand
+            handedness: 'Left'/'Right' per hand
+            scores: Detection confidence per hand
+            ids: Track ID per hand
+            registry: GestureRegistry classifying the hands when a gesture is read
+            buffer: Reused HAND_DTYPE array with a row per hand; the frame's
+                data becomes a view into it
+        """
+        frame = cls(len(features), buffer)
+        frame._features = features
+        frame._registry = registry
+        data = frame.data
+        if len(data):
+            data['id'] = ids
+            data['handedness'] = list(map(HANDEDNESS.index, handedness))
+            data['confidence'] = scores
+            data['landmarks'] = features.landmarks
+        return frame
+
+    def column(self, name: str) -> np.ndarray:
+        """(hands, ...) column of the buffer, computed on first use"""
+        key = COLUMN_KEYS.get(name)
+        if key is not None and key not in self._filled:
+            self._fill(key)
+        return self.data[name]
+
+    def fill(self, keys: Optional[Sequence[str]] = None):
+        """
+        Compute columns now instead of on first access
+
+        Args:
+            keys: Legacy keys such as 'bbox' or 'gesture' (default: all)
+        """
+        for key in KEY_COLUMNS if keys is None else keys:
+            if key in KEY_COLUMNS and key not in self._filled:
+                self._fill(key)
+
+    def _fill(self, key: str):
+        self._filled.add(key)
+        features = self._features
+        if features is None or len(self.data) == 0:
+            return
+        data = self.data
+        if key == 'landmarks_px':
+            data['landmarks_px'] = features.landmarks_px
+        elif key == 'center':
+            data['center'] = features.centers
+        elif key == 'bbox':
+            data['bbox'] = features.bboxes
+        elif key == 'curls':
+            data['curls'] = features.curls
+        elif key == 'gesture':
+            data['curls'] = features.curls
+            data['gesture_confidence'] = [g['confidence'] for g in self._classify()]
+            self._filled.add('curls')
+        elif key == 'fingertip_distances':
+            data['tip_distances'] = features.tip_distances
+        elif key == 'volume_control':
+            data['volume'] = features.volume
+
+    def _classify(self) -> List[Dict]:
+        """Registry result per hand, computed once; empty without features"""
+        if self._results is None:
+            self._results = []
+            if self._features is not None and len(self.data):
+                self._results = self._registry.classify(self._features)
+                self._gestures = [g['name'] for g in self._results]
+        return self._results
+
+    @property
+    def gestures(self) -> List[str]:
+        """Gesture name per hand (classifies the frame on first use)"""
+        self._classify()
+        return self._gestures
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Hand, List[Hand]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        count = len(self.data)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("hand index out of range")
+        return Hand(self, index)
+
+    def __iter__(self) -> Iterator[Hand]:
+        return map(Hand, repeat(self), range(len(self.data)))
+
+    @property
+    def ids(self) -> List[int]:
+        return self.data['id'].tolist()
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(hands, 21, 3) landmarks of every hand"""
+        return self.data['landmarks']
+
+    @property
+    def handedness(self) -> List[str]:
+        return [HANDEDNESS[i] for i in self.data['handedness'].tolist()]
+
+    def copy(self) -> 'HandFrame':
+        """Frame with its own buffer, safe to keep after the detector's next call"""
+        frame = HandFrame(len(self), self.data.copy())
+        frame.motion = list(self.motion)
+        frame.extras = [None if extras is None else dict(extras) for extras in self.extras]
+        frame._features = self._features
+        frame._registry = self._registry
+        frame._filled = set(self._filled)
+        frame._gestures = list(self._gestures)
+        frame._results = self._results
+        frame._legacy = [None if legacy is None else dict(legacy) for legacy in self._legacy]
+        return frame
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Legacy list of independent hand dicts"""
+        self.fill()
+        return [hand.to_dict() for hand in self]
+
+    def __repr__(self) -> str:
+        return f"HandFrame({list(self)})"
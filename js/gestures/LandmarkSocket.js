@@ -0,0 +1,153 @@
+// 📡 Landmark Socket - Hands from a shared Python detector
+// Decodes landmark_broadcast.py packets into MediaPipe-style results
+
+class LandmarkSocket {
+  constructor(url, options = {}) {
+    this.url = url;
+    this.onResults = options.onResults || (() => {});
+    this.reconnectDelay = options.reconnectDelay || 1000;
+
+    // Code tables (replaced by the server's hello message)
+    this.scale = 8192;
+    this.handedness = ['Left', 'Right'];
+    this.gestures = ['Unknown', 'Open Palm', 'Fist', 'Thumbs Up', 'OK Sign', 'Peace Sign'];
+    this.motions = ['', 'Swipe Left', 'Swipe Right', 'Swipe Up', 'Swipe Down', 'Circle CW', 'Circle CCW'];
+
+    // Quantized landmarks of the previous frame per track ID (delta base)
+    this.previous = new Map();
+    this.lastFrame = null;
+
+    this.socket = null;
+    this.closed = false;
+    this.stats = { packets: 0, bytes: 0, skippedHands: 0 };
+  }
+
+  // Open the connection; reconnects until close() is called
+  connect() {
+    this.closed = false;
+    this.socket = new WebSocket(this.url);
+    this.socket.binaryType = 'arraybuffer';
+
+    this.socket.onmessage = event => {
+      if (typeof event.data === 'string') {
+        this.handleHello(JSON.parse(event.data));
+        return;
+      }
+      this.stats.packets++;
+      this.stats.bytes += event.data.byteLength;
+      this.onResults(this.decode(event.data));
+    };
+
+    this.socket.onclose = () => {
+      // A new connection starts from a keyframe
+      this.previous.clear();
+      this.lastFrame = null;
+      if (!this.closed) {
+        setTimeout(() => this.connect(), this.reconnectDelay);
+      }
+    };
+
+    return this;
+  }
+
+  close() {
+    this.closed = true;
+    if (this.socket) {
+      this.socket.close();
+    }
+  }
+
+  handleHello(hello) {
+    if (hello.type !== 'hello') return;
+    this.scale = hello.scale;
+    this.handedness = hello.handedness;
+    this.gestures = hello.gestures;
+    this.motions = hello.motions;
+  }
+
+  // Packet layout (little-endian):
+  //   header: 'HB', version u8, flags u8, frame u32, millis u32, hand count u8
+  //   hand:   track id u16, handedness u8, gesture u8, motion u8, confidence u8,
+  //           encoding u8, then 63 values (int16 absolute, int8 or int16 deltas)
+  decode(buffer) {
+    const view = new DataView(buffer);
+    const frame = view.getUint32(4, true);
+    const millis = view.getUint32(8, true);
+    const count = view.getUint8(12);
+    const consecutive = this.lastFrame !== null && frame === ((this.lastFrame + 1) >>> 0);
+
+    const results = {
+      multiHandLandmarks: [],
+      multiHandedness: [],
+      hands: [],
+      frame,
+      timestamp: millis / 1000,
+      keyframe: (view.getUint8(3) & 1) === 1
+    };
+    const current = new Map();
+    let offset = 13;
+
+    for (let h = 0; h < count; h++) {
+      const id = view.getUint16(offset, true);
+      const handedness = view.getUint8(offset + 2);
+      const gesture = view.getUint8(offset + 3);
+      const motion = view.getUint8(offset + 4);
+      const confidence = view.getUint8(offset + 5) / 255;
+      const encoding = view.getUint8(offset + 6);
+      offset += 7;
+
+      const base = this.previous.get(id);
+      const values = new Int16Array(63);
+      if (encoding === 0) {
+        for (let i = 0; i < 63; i++) values[i] = view.getInt16(offset + i * 2, true);
+        offset += 126;
+      } else if (encoding === 1) {
+        if (consecutive && base) {
+          for (let i = 0; i < 63; i++) values[i] = base[i] + view.getInt8(offset + i);
+        }
+        offset += 63;
+      } else {
+        if (consecutive && base) {
+          for (let i = 0; i < 63; i++) values[i] = base[i] + view.getInt16(offset + i * 2, true);
+        }
+        offset += 126;
+      }
+
+      // Delta without its base frame: wait for the next keyframe
+      if (encoding !== 0 && !(consecutive && base)) {
+        this.stats.skippedHands++;
+        continue;
+      }
+      current.set(id, values);
+
+      const landmarks = [];
+      for (let i = 0; i < 63; i += 3) {
+        landmarks.push({
+          x: values[i] / this.scale,
+          y: values[i + 1] / this.scale,
+          z: values[i + 2] / this.scale
+        });
+      }
+
+      const label = this.handedness[handedness];
+      results.multiHandLandmarks.push(landmarks);
+      results.multiHandedness.push({ index: results.multiHandedness.length, score: confidence, label });
+      results.hands.push({
+        id,
+        handedness: label,
+        gesture: this.gestures[gesture] || 'Other',
+        motion: this.motions[motion] || null,
+        confidence
+      });
+    }
+
+    this.previous = current;
+    this.lastFrame = frame;
+    return results;
+  }
+}
+
+// Export
+if (typeof module !== 'undefined' && module.exports) {
+  module.exports = LandmarkSocket;
+}
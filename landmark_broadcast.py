@@ -0,0 +1,424 @@
+"""
+Landmark Broadcast
+Pushes quantized, delta-encoded hand packets to WebSocket and UDP clients
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import sys
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from async_stream import FrameResult, LatestQueue
+from hand_frame import Hand
+from landmark_recording import HANDEDNESS
+
+MAGIC = b'HB'
+VERSION = 1
+
+# Landmarks are stored as round(value * SCALE) in int16: normalized image
+# coordinates in [-4, 4) at ~0.25 px resolution on a 1080p frame
+SCALE = 8192
+
+# magic, version, flags, frame index, milliseconds since the first frame, hand count
+HEADER = struct.Struct('<2sBBIIB')
+# track id, handedness, gesture code, motion code, confidence * 255, landmark encoding
+HAND_HEADER = struct.Struct('<HBBBBB')
+
+FLAG_KEYFRAME = 1
+
+# Landmark encodings: absolute int16, or int8/int16 deltas against the same
+# track in the previous frame
+ABSOLUTE = 0
+DELTA8 = 1
+DELTA16 = 2
+
+# Largest client frame accepted; clients only send pings and close frames
+MAX_CLIENT_FRAME = 64 * 1024
+
+GESTURE_CODES = ['Unknown', 'Open Palm', 'Fist', 'Thumbs Up', 'OK Sign', 'Peace Sign']
+MOTION_CODES = ['', 'Swipe Left', 'Swipe Right', 'Swipe Up', 'Swipe Down', 'Circle CW', 'Circle CCW']
+OTHER_CODE = 255  # Gesture name missing from the table
+
+LANDMARK_VALUES = 21 * 3
+
+
+def quantize(landmarks) -> np.ndarray:
+    """(21, 3) normalized landmarks -> (21, 3) int16"""
+    scaled = np.rint(np.asarray(landmarks, dtype=np.float32) * SCALE)
+    return np.clip(scaled, -32768, 32767).astype(np.int16)
+
+
+class PacketEncoder:
+    """
+    Encodes one frame of hand dicts per call
+
+    Every call returns a delta packet (hands seen in the previous frame send
+    landmark differences) and a keyframe packet (all absolute). Both leave the
+    encoder in the same state, so a sender can pick either per client.
+    """
+
+    def __init__(self, gestures: Sequence[str] = GESTURE_CODES, motions: Sequence[str] = MOTION_CODES):
+        """
+        Initialize encoder
+
+        Args:
+            gestures: Gesture names by code (announced to WebSocket clients)
+            motions: Motion gesture names by code (0 = none)
+        """
+        self.gestures = list(gestures)
+        self.motions = list(motions)
+        self._gesture_codes = {name: code for code, name in enumerate(self.gestures)}
+        self._motion_codes = {name: code for code, name in enumerate(self.motions)}
+        self._previous: Dict[int, np.ndarray] = {}
+        self._last_frame: Optional[int] = None
+        self._start: Optional[float] = None
+
+    def _hand_fields(self, hand: Dict) -> Tuple[int, int, int, int, int]:
+        motion = (hand.get('motion') or {}).get('gesture') or ''
+        return (
+            int(hand['id']) & 0xFFFF,
+            HANDEDNESS.index(hand['handedness']) if hand['handedness'] in HANDEDNESS else 0,
+            self._gesture_codes.get(hand['gesture']['name'], OTHER_CODE),
+            self._motion_codes.get(motion, OTHER_CODE),
+            int(round(min(max(float(hand['confidence']), 0.0), 1.0) * 255)),
+        )
+
+    def encode(self, hands: List[Dict], frame_index: int, timestamp: float) -> Tuple[bytes, bytes]:
+        """
+        Args:
+            hands: Hand dicts from detect_hands (hands without landmarks are skipped)
+            frame_index: Consecutive frame counter; a gap disables deltas
+            timestamp: Capture time in seconds
+
+        Returns:
+            (delta packet, keyframe packet)
+        """
+        if self._start is None:
+            self._start = timestamp
+        hands = [hand for hand in hands if 'landmarks' in hand][:255]
+        consecutive = self._last_frame is not None and frame_index == self._last_frame + 1
+        millis = int(max(timestamp - self._start, 0.0) * 1000) & 0xFFFFFFFF
+
+        delta = [HEADER.pack(MAGIC, VERSION, 0, frame_index & 0xFFFFFFFF, millis, len(hands))]
+        key = [HEADER.pack(MAGIC, VERSION, FLAG_KEYFRAME, frame_index & 0xFFFFFFFF, millis, len(hands))]
+        current = {}
+        for hand in hands:
+            fields = self._hand_fields(hand)
+            landmarks = hand.landmarks if isinstance(hand, Hand) else hand['landmarks']
+            values = quantize(landmarks).reshape(-1)
+            absolute = values.tobytes()
+            key += [HAND_HEADER.pack(*fields, ABSOLUTE), absolute]
+
+            previous = self._previous.get(fields[0]) if consecutive else None
+            if previous is None:
+                delta += [HAND_HEADER.pack(*fields, ABSOLUTE), absolute]
+            else:
+                diff = values.astype(np.int32) - previous
+                largest = int(np.abs(diff).max())
+                if largest <= 127:
+                    delta += [HAND_HEADER.pack(*fields, DELTA8), diff.astype(np.int8).tobytes()]
+                elif largest <= 32767:
+                    delta += [HAND_HEADER.pack(*fields, DELTA16), diff.astype(np.int16).tobytes()]
+                else:
+                    delta += [HAND_HEADER.pack(*fields, ABSOLUTE), absolute]
+            current[fields[0]] = values
+
+        self._previous = current
+        self._last_frame = frame_index
+        return b''.join(delta), b''.join(key)
+
+    def hello(self) -> Dict:
+        """Code tables sent to WebSocket clients on connect"""
+        return {'type': 'hello', 'version': VERSION, 'scale': SCALE,
+                'handedness': HANDEDNESS, 'gestures': self.gestures, 'motions': self.motions}
+
+
+class PacketDecoder:
+    """Reverses PacketEncoder; hands whose delta base was lost are skipped until a keyframe"""
+
+    def __init__(self, gestures: Sequence[str] = GESTURE_CODES, motions: Sequence[str] = MOTION_CODES):
+        self.gestures = list(gestures)
+        self.motions = list(motions)
+        self._previous: Dict[int, np.ndarray] = {}
+        self._last_frame: Optional[int] = None
+
+    def decode(self, packet: bytes) -> Dict:
+        """
+        Returns:
+            {'frame', 'millis', 'keyframe', 'hands': [{'id', 'handedness',
+             'gesture', 'motion', 'confidence', 'landmarks' (21, 3) float32}]}
+        """
+        magic, version, flags, frame, millis, count = HEADER.unpack_from(packet, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a landmark broadcast packet")
+        consecutive = self._last_frame is not None and frame == (self._last_frame + 1) & 0xFFFFFFFF
+        offset = HEADER.size
+        hands = []
+        current = {}
+        for _ in range(count):
+            track_id, handedness, gesture, motion, confidence, encoding = \
+                HAND_HEADER.unpack_from(packet, offset)
+            offset += HAND_HEADER.size
+            dtype = np.int8 if encoding == DELTA8 else np.int16
+            raw = np.frombuffer(packet, dtype=dtype, count=LANDMARK_VALUES, offset=offset)
+            offset += raw.nbytes
+
+            if encoding == ABSOLUTE:
+                values = raw.astype(np.int16)
+            elif consecutive and track_id in self._previous:
+                values = (self._previous[track_id] + raw).astype(np.int16)
+            else:
+                continue
+            current[track_id] = values
+            hands.append({
+                'id': track_id,
+                'handedness': HANDEDNESS[handedness],
+                'gesture': self.gestures[gesture] if gesture < len(self.gestures) else 'Other',
+                'motion': self.motions[motion] if motion < len(self.motions) else 'Other',
+                'confidence': confidence / 255,
+                'landmarks': values.reshape(21, 3).astype(np.float32) / SCALE,
+            })
+
+        self._previous = current
+        self._last_frame = frame
+        return {'frame': frame, 'millis': millis, 'keyframe': bool(flags & FLAG_KEYFRAME), 'hands': hands}
+
+
+def _ws_frame(payload: bytes, opcode: int) -> bytes:
+    """Unmasked server-to-client WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class LandmarkBroadcaster:
+    """
+    Serves encoded hand packets over WebSocket and/or UDP
+
+    WebSocket clients each get a latest-only queue: a slow client skips
+    frames and then receives a keyframe, so it never stalls the detector or
+    other clients. UDP datagrams are deltas with a keyframe every
+    keyframe_interval frames to recover from loss.
+    """
+
+    WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    def __init__(self, host: str = '127.0.0.1', ws_port: Optional[int] = 8765,
+                 udp_targets: Sequence[Tuple[str, int]] = (), keyframe_interval: int = 30,
+                 encoder: Optional[PacketEncoder] = None):
+        """
+        Initialize broadcaster
+
+        Args:
+            host: WebSocket bind address ('0.0.0.0' for the whole network)
+            ws_port: WebSocket port (None = no WebSocket server)
+            udp_targets: (host, port) datagram destinations; broadcast addresses work
+            keyframe_interval: UDP frames between keyframes
+            encoder: Packet encoder (e.g. with a custom gesture table)
+        """
+        self.host = host
+        self.ws_port = ws_port
+        self.udp_targets = list(udp_targets)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.encoder = encoder or PacketEncoder()
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.StreamWriter, LatestQueue] = {}
+        self._handlers: Set[asyncio.Task] = set()
+        self._udp: Optional[socket.socket] = None
+        self.stats = {'frames': 0, 'bytes_delta': 0, 'bytes_key': 0}
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    async def start(self):
+        """Open the UDP socket and start accepting WebSocket clients"""
+        if self.udp_targets:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._udp.setblocking(False)
+        if self.ws_port is not None:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.ws_port)
+            if self.ws_port == 0:
+                self.ws_port = self._server.sockets[0].getsockname()[1]
+
+    def publish(self, hands: List[Dict], frame_index: int, timestamp: float):
+        """Encode one frame and queue it for every client"""
+        delta, key = self.encoder.encode(hands, frame_index, timestamp)
+        self.stats['frames'] += 1
+        self.stats['bytes_delta'] += len(delta)
+        self.stats['bytes_key'] += len(key)
+
+        if self._udp is not None:
+            packet = key if frame_index % self.keyframe_interval == 0 else delta
+            for target in self.udp_targets:
+                try:
+                    self._udp.sendto(packet, target)
+                except (BlockingIOError, OSError):
+                    pass
+        for queue in self._clients.values():
+            queue.put_nowait((frame_index, delta, key))
+
+    async def run(self, results: AsyncIterator[FrameResult]):
+        """Publish every result of a detection stream, e.g. detector.stream(0)"""
+        await self.start()
+        try:
+            async for result in results:
+                self.publish(result.hands, result.index, result.timestamp)
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop the server and disconnect every client"""
+        for queue in self._clients.values():
+            queue.close()
+        if self._server is not None:
+            self._server.close()
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+
+    async def _handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Answer the HTTP upgrade request; False if it is not a WebSocket request"""
+        request = await reader.readuntil(b'\r\n\r\n')
+        headers = {}
+        for line in request.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if key is None:
+            writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            return False
+        accept = base64.b64encode(hashlib.sha1(key.encode() + self.WS_GUID).digest()).decode()
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\n'
+                      'Upgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+        return True
+
+    async def _read_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Consume client frames: answer pings, stop on close"""
+        while True:
+            head = await reader.readexactly(2)
+            opcode, length = head[0] & 0x0F, head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await reader.readexactly(8))[0]
+            if length > MAX_CLIENT_FRAME:
+                writer.write(_ws_frame(struct.pack('!H', 1009), 0x8))  # Message too big
+                return
+            mask = await reader.readexactly(4) if head[1] & 0x80 else None
+            data = await reader.readexactly(length)
+            if mask is not None and length:
+                key = np.tile(np.frombuffer(mask, dtype=np.uint8), -(-length // 4))[:length]
+                data = (np.frombuffer(data, dtype=np.uint8) ^ key).tobytes()
+            if opcode == 0x8:
+                writer.write(_ws_frame(data[:2], 0x8))
+                return
+            if opcode == 0x9:
+                writer.write(_ws_frame(data, 0xA))
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queue = LatestQueue(1)
+        listener = None
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            if not await self._handshake(reader, writer):
+                return
+            writer.write(_ws_frame(json.dumps(self.encoder.hello()).encode(), 0x1))
+            self._clients[writer] = queue
+            listener = asyncio.ensure_future(self._read_client(reader, writer))
+            listener.add_done_callback(lambda _: queue.close())
+
+            last_sent = None
+            async for frame_index, delta, key in queue:
+                # Deltas only follow the frame they were encoded against
+                packet = delta if last_sent is not None and frame_index == last_sent + 1 else key
+                writer.write(_ws_frame(packet, 0x2))
+                await writer.drain()
+                last_sent = frame_index
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except asyncio.CancelledError:
+            # close() cancels handlers; finish normally so asyncio's stream
+            # callback does not report the cancellation as an error
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            if listener is not None:
+                listener.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            self._handlers.discard(handler)
+
+
+def parse_target(target: str) -> Tuple[str, int]:
+    """'host:port' -> (host, port)"""
+    host, _, port = target.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from hand_detection import HandDetector
+
+    parser = argparse.ArgumentParser(description="Broadcast hand landmarks to WebSocket/UDP clients")
+    parser.add_argument("--source", type=str, default="0", help="Camera ID or video file")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="WebSocket bind address (0.0.0.0 = all interfaces)")
+    parser.add_argument("--ws-port", type=int, default=8765, help="WebSocket port (0 = disabled)")
+    parser.add_argument("--udp", type=str, action="append", default=[], metavar="HOST:PORT",
+                        help="Also send UDP datagrams here (repeatable)")
+    parser.add_argument("--keyframe-interval", type=int, default=30,
+                        help="UDP frames between keyframes")
+    parser.add_argument("--flip", action="store_true", help="Mirror frames before detection")
+    parser.add_argument("--max-hands", type=int, default=2, help="Maximum hands per frame")
+
+    args = parser.parse_args()
+    source = int(args.source) if args.source.isdigit() else args.source
+
+    detector = HandDetector(max_hands=args.max_hands)
+    broadcaster = LandmarkBroadcaster(
+        host=args.host,
+        ws_port=args.ws_port or None,
+        udp_targets=[parse_target(t) for t in args.udp],
+        keyframe_interval=args.keyframe_interval,
+        encoder=PacketEncoder(gestures=GESTURE_CODES + [n for n in detector.gestures.names
+                                                         if n not in GESTURE_CODES]),
+    )
+    print(f"Broadcasting on ws://{args.host}:{args.ws_port}" if args.ws_port else "WebSocket disabled",
+          file=sys.stderr)
+
+    try:
+        asyncio.run(broadcaster.run(detector.stream(source, flip=args.flip)))
+    except KeyboardInterrupt:
+        pass
+
+    frames = max(broadcaster.stats['frames'], 1)
+    print(f"\n{broadcaster.stats['frames']} frames, "
+          f"{broadcaster.stats['bytes_delta'] / frames:.0f} B/frame delta, "
+          f"{broadcaster.stats['bytes_key'] / frames:.0f} B/frame keyframe", file=sys.stderr)
@@ -0,0 +1,278 @@
+"""
+Vectorized Landmark Feature Engine
+Computes per-hand features for every detected hand in a few NumPy operations
+"""
+
+import math
+import numpy as np
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+NUM_LANDMARKS = 21
+
+# Fingertip indices
+FINGERTIPS = np.array([4, 8, 12, 16, 20])
+FINGER_NAMES = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+
+# Joints compared against each fingertip when measuring curl.
+# The thumb only has two (MCP, IP); its last entry is repeated so every
+# finger has the same width, which leaves the minimum unchanged.
+CURL_JOINTS = np.array([
+    [2, 3, 3],       # Thumb
+    [5, 6, 7],       # Index
+    [9, 10, 11],     # Middle
+    [13, 14, 15],    # Ring
+    [17, 18, 19],    # Pinky
+])
+CURL_THRESHOLD = 0.1
+
+# The squared default threshold as a float32 0-d array, which NumPy compares
+# faster than a Python float and with the same float32 result
+_CURL_LIMIT = np.array(CURL_THRESHOLD * CURL_THRESHOLD, dtype=np.float32)
+
+# Fingertip pairs (i < j) in the same order as the legacy distance dict
+TIP_PAIRS = np.array([(i, j) for i in range(5) for j in range(5) if i < j])
+TIP_PAIR_NAMES = [f"{FINGER_NAMES[i]}-{FINGER_NAMES[j]}" for i, j in TIP_PAIRS]
+
+# Every landmark pair a frame measures, as one gather: tip-to-joint pairs for
+# curls grouped by joint (columns j*5:(j+1)*5 hold joint j of each finger),
+# then the fingertip pairs
+PAIR_FROM = np.concatenate([np.tile(FINGERTIPS, 3), FINGERTIPS[TIP_PAIRS[:, 0]]])
+PAIR_TO = np.concatenate([CURL_JOINTS.T.ravel(), FINGERTIPS[TIP_PAIRS[:, 1]]])
+CURL_PAIRS = 15
+
+# +1 at each pair's PAIR_FROM landmark and -1 at its PAIR_TO one: a matrix
+# product with the landmarks gives every pair's difference in one op
+PAIR_DIFF = np.zeros((len(PAIR_FROM), NUM_LANDMARKS), dtype=np.float32)
+PAIR_DIFF[np.arange(len(PAIR_FROM)), PAIR_FROM] = 1
+PAIR_DIFF[np.arange(len(PAIR_TO)), PAIR_TO] = -1
+
+# Pair -> the finger it curls (fingertip pairs map to none): a boolean matrix
+# product with this tells whether any of a finger's joints is near its tip
+CURL_FINGERS = np.concatenate([np.tile(np.eye(5, dtype=bool), (3, 1)),
+                               np.zeros((len(PAIR_FROM) - CURL_PAIRS, 5), dtype=bool)])
+
+# Sums x, y and z as a matrix product, which costs less than a reduce over
+# such a short axis
+XYZ_SUM = np.ones(3, dtype=np.float32)
+
+_landmark_xyz = attrgetter('x', 'y', 'z')
+
+# Columns of the pairwise distance matrix used for pinch metrics
+THUMB_INDEX = TIP_PAIR_NAMES.index('Thumb-Index')
+THUMB_MIDDLE = TIP_PAIR_NAMES.index('Thumb-Middle')
+INDEX_MIDDLE = TIP_PAIR_NAMES.index('Index-Middle')
+
+BBOX_MARGIN = 20
+VOLUME_SCALE = 333
+
+
+def landmarks_to_array(multi_hand_landmarks: Sequence) -> np.ndarray:
+    """
+    Pack MediaPipe landmark lists into a single array
+
+    Args:
+        multi_hand_landmarks: MediaPipe `multi_hand_landmarks` result
+
+    Returns:
+        (hands, 21, 3) float32 array of normalized x, y, z
+    """
+    coords = []
+    for hand in multi_hand_landmarks:
+        coords += chain.from_iterable(map(_landmark_xyz, hand.landmark))
+    return np.array(coords, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+
+
+def to_pixels(landmarks: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Convert normalized landmarks (..., 21, 3) to integer pixel coordinates (..., 21, 2)"""
+    # float64 keeps truncation identical to `int(lm.x * w)` on the raw floats
+    scale = np.array([width, height], dtype=np.float64)
+    return (landmarks[..., :2] * scale).astype(np.int32)
+
+
+def hand_centers(landmarks_px: np.ndarray) -> np.ndarray:
+    """Mean landmark position per hand, (hands, 2) int32"""
+    total = np.add.reduce(landmarks_px, axis=1, dtype=np.float64)
+    total /= NUM_LANDMARKS
+    return total.astype(np.int32)
+
+
+def bounding_boxes(landmarks_px: np.ndarray, margin: int = BBOX_MARGIN) -> np.ndarray:
+    """Hand bounding boxes (x1, y1, x2, y2) with margin, (hands, 4) int32"""
+    lo = np.maximum(landmarks_px.min(axis=1) - margin, 0)
+    hi = landmarks_px.max(axis=1) + margin
+    return np.concatenate([lo, hi], axis=1).astype(np.int32)
+
+
+def hand_extents(landmarks: np.ndarray, width: int, height: int,
+                 margin: int = BBOX_MARGIN) -> Tuple[List[Tuple[float, float]], List[float]]:
+    """
+    Float pixel centers and box diagonals straight from normalized landmarks
+
+    A cheaper stand-in for hand_centers/bounding_boxes when only the hand's
+    position and size are needed (tracking), without integer pixel arrays.
+    A frame has a handful of hands, so this runs on Python floats: the
+    tracker consumes them as such, and it costs less than the array ops.
+
+    Returns:
+        (x, y) center and diagonal of the margin-padded box per hand
+    """
+    centers, sizes = [], []
+    for xs, ys, _ in landmarks.transpose(0, 2, 1).tolist():
+        centers.append((sum(xs) * width / NUM_LANDMARKS, sum(ys) * height / NUM_LANDMARKS))
+        sizes.append(math.hypot((max(xs) - min(xs)) * width + 2 * margin,
+                                (max(ys) - min(ys)) * height + 2 * margin))
+    return centers, sizes
+
+
+def pair_distances(landmarks: np.ndarray, squared: bool = False) -> np.ndarray:
+    """
+    Distances of every PAIR_FROM/PAIR_TO landmark pair
+
+    Args:
+        squared: Return squared distances, skipping the square root
+
+    Returns:
+        (hands, 25) float32 array: 15 curl pairs, then TIP_PAIR_NAMES order
+    """
+    diff = PAIR_DIFF @ landmarks
+    diff *= diff
+    total = diff @ XYZ_SUM
+    return total if squared else np.sqrt(total, out=total)
+
+
+def finger_curls(landmarks: np.ndarray, threshold: float = CURL_THRESHOLD,
+                 squared_distances: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Curl amount for each finger (0 = open, 1 = closed)
+
+    A finger counts as curled when its tip comes within `threshold`
+    of one of its own lower joints.
+
+    Args:
+        squared_distances: pair_distances(landmarks, squared=True), if already computed
+
+    Returns:
+        (hands, 5) float32 array
+    """
+    if squared_distances is None:
+        squared_distances = pair_distances(landmarks, squared=True)
+    # Compared in full, which costs less than slicing out the curl pairs first
+    limit = _CURL_LIMIT if threshold == CURL_THRESHOLD else threshold * threshold
+    near = squared_distances < limit
+    return (near @ CURL_FINGERS).astype(np.float32)
+
+
+def fingertip_distances(landmarks: np.ndarray) -> np.ndarray:
+    """Pairwise fingertip distances in TIP_PAIR_NAMES order, (hands, 10) float32"""
+    return pair_distances(landmarks)[:, CURL_PAIRS:]
+
+
+def volume_levels(tip_distances: np.ndarray) -> np.ndarray:
+    """Volume level (0-100) from thumb-index distance, (hands,) float32"""
+    return np.clip(tip_distances[:, THUMB_INDEX] * VOLUME_SCALE, 0, 100)
+
+
+class memoized:
+    """
+    Lock-free functools.cached_property
+
+    Features are computed once per frame on the detection thread; before
+    Python 3.12 cached_property takes a lock on every first access, which
+    is most of the cost of a cheap feature.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.fn(instance)
+        return value
+
+
+class HandFeatures:
+    """
+    Feature arrays for every hand detected in one frame
+
+    Each array is computed for all hands on first access and memoized, so a
+    frame only pays for the features its consumers actually read.
+    """
+
+    def __init__(self, landmarks: np.ndarray, frame_size: Tuple[int, int]):
+        """
+        Wrap a batch of hands
+
+        Args:
+            landmarks: (hands, 21, 3) normalized landmarks
+            frame_size: (width, height) used for pixel coordinates
+        """
+        self.landmarks = landmarks
+        self.frame_size = frame_size
+        
+        # Derived features computed on demand (see gesture_registry.get_feature)
+        self.cache: Dict[object, np.ndarray] = {}
+
+    @memoized
+    def landmarks_px(self) -> np.ndarray:
+        """(hands, 21, 2) int32 pixel landmarks"""
+        return to_pixels(self.landmarks, *self.frame_size)
+
+    @memoized
+    def centers(self) -> np.ndarray:
+        return hand_centers(self.landmarks_px)
+
+    @memoized
+    def bboxes(self) -> np.ndarray:
+        return bounding_boxes(self.landmarks_px)
+
+    @memoized
+    def squared_distances(self) -> np.ndarray:
+        """(hands, 25) squared pair distances shared by curls and tip_distances"""
+        return pair_distances(self.landmarks, squared=True)
+
+    @memoized
+    def curls(self) -> np.ndarray:
+        return finger_curls(self.landmarks, squared_distances=self.squared_distances)
+
+    @memoized
+    def tip_distances(self) -> np.ndarray:
+        return np.sqrt(self.squared_distances[:, CURL_PAIRS:])
+
+    @memoized
+    def volume(self) -> np.ndarray:
+        return volume_levels(self.tip_distances)
+
+    def __len__(self) -> int:
+        return len(self.landmarks)
+
+    @property
+    def thumb_index(self) -> np.ndarray:
+        """Thumb-index pinch distance per hand"""
+        return self.tip_distances[:, THUMB_INDEX]
+
+    @property
+    def thumb_middle(self) -> np.ndarray:
+        """Thumb-middle pinch distance per hand"""
+        return self.tip_distances[:, THUMB_MIDDLE]
+
+    @property
+    def index_middle(self) -> np.ndarray:
+        """Index-middle fingertip distance per hand"""
+        return self.tip_distances[:, INDEX_MIDDLE]
+
+    def landmarks_list(self, i: int) -> List[Tuple[float, float, float]]:
+        """Landmarks of hand `i` as a list of (x, y, z) tuples"""
+        return list(map(tuple, self.landmarks[i].tolist()))
+
+    def landmarks_px_list(self, i: int) -> List[Tuple[int, int]]:
+        """Pixel landmarks of hand `i` as a list of (x, y) tuples"""
+        return list(map(tuple, self.landmarks_px[i].tolist()))
+
+    def distance_dict(self, i: int) -> Dict[str, float]:
+        """Fingertip distances of hand `i` keyed like 'Thumb-Index'"""
+        return dict(zip(TIP_PAIR_NAMES, self.tip_distances[i].tolist()))
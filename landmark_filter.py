@@ -0,0 +1,187 @@
+"""
+Vectorized One-Euro Landmark Filter
+Smooths all 21x3 landmarks of every tracked hand in one NumPy step per frame
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Sums each landmark's squared x, y, z into all three of its columns: the
+# matrix product costs the same as a single column, and the (..., 21, 3)
+# result divides the landmarks without broadcasting. Scaled by the squared
+# cutoff speed term, it also applies that term inside the square root
+XYZ_SUMS = np.ones((3, 3), dtype=np.float32)
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter over (hands, 21, 3) landmark arrays
+
+    The cutoff frequency rises with each landmark's speed: slow, jittery
+    motion is smoothed heavily while fast motion passes with little lag.
+    State is kept per hand key so hands can come and go between frames.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 10.0, d_cutoff: float = 1.0,
+                 capacity: int = 4):
+        """
+        Initialize filter
+
+        Args:
+            min_cutoff: Cutoff frequency (Hz) for a still hand
+            beta: Cutoff increase per unit of speed (normalized units/s)
+            d_cutoff: Cutoff frequency (Hz) for the speed estimate
+            capacity: Hands with state before the arrays grow
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+        # Per-hand state lives in preallocated rows: last filtered value, last
+        # filtered derivative and last time; keys map to their row
+        self._slots: Dict[Hashable, int] = {}
+        self._x = np.zeros((capacity, 21, 3), dtype=np.float32)
+        self._dx = np.zeros((capacity, 21, 3), dtype=np.float32)
+        self._t = [0.0] * capacity
+
+        # Keys and rows of the previous frame, reused while the same hands stay;
+        # consecutive rows also keep their state views
+        self._keys: List[Hashable] = []
+        self._slot_list: List[int] = []
+        self._rows = slice(0, 0)
+        self._views: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        # Coefficients of a frame whose hands share one time step, written to
+        # float32 0-d arrays: NumPy applies those faster than Python floats.
+        # A steady frame rate repeats the step, so they are kept per step
+        self._coef = np.zeros(3, dtype=np.float32)
+        self._coef_views = [self._coef[i, ...] for i in range(3)]
+        self._sums = XYZ_SUMS.copy()
+        self._coef_key: Optional[Tuple[float, float, float, float]] = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor for a cutoff frequency and time step"""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _coefficients(self, dt):
+        """Derivative keep and gain, squared speed term and cutoff base for a time step"""
+        a_d = self._alpha(self.d_cutoff, dt)
+        speed = self.beta * 2 * math.pi * dt
+        return 1 - a_d, a_d / dt, speed * speed, self.min_cutoff * 2 * math.pi * dt + 1
+
+    def _slot(self, key: Hashable) -> int:
+        """Row for a new key, growing the state arrays when full"""
+        used = set(self._slots.values())
+        free = next((i for i in range(len(self._t)) if i not in used), None)
+        if free is None:
+            free = len(self._t)
+            self._x = np.concatenate([self._x, np.zeros_like(self._x)])
+            self._dx = np.concatenate([self._dx, np.zeros_like(self._dx)])
+            self._t += [0.0] * len(self._t)
+        self._slots[key] = free
+        return free
+
+    def __call__(self, landmarks: np.ndarray, timestamp: float,
+                 keys: List[Hashable]) -> np.ndarray:
+        """
+        Filter one frame
+
+        Args:
+            landmarks: (hands, 21, 3) raw landmarks
+            timestamp: Frame time in seconds
+            keys: Stable key per hand (track ID); unknown keys start fresh
+
+        Returns:
+            (hands, 21, 3) float32 filtered landmarks
+        """
+        if len(landmarks) == 0:
+            return landmarks
+
+        fresh = landmarks.astype(np.float32, copy=False)
+        new = []
+        slots = self._slot_list
+        if keys != self._keys:
+            slots = [self._slots.get(k) for k in keys]
+            new = [i for i, slot in enumerate(slots) if slot is None]
+            for i in new:
+                slots[i] = self._slot(keys[i])
+
+            # Consecutive rows are filtered in place; anything else is gathered
+            first = slots[0]
+            if slots == list(range(first, first + len(slots))):
+                self._rows = slice(first, first + len(slots))
+                self._views = (self._x[self._rows], self._dx[self._rows])
+            else:
+                self._rows = np.array(slots)
+                self._views = None
+            self._keys = list(keys)
+            self._slot_list = slots
+        rows, views = self._rows, self._views
+        x, dx = views if views is not None else (self._x[rows], self._dx[rows])
+
+        times = self._t
+        dts = []
+        for slot in slots:
+            dts.append(max(timestamp - times[slot], 1e-3))
+            times[slot] = timestamp
+        for i in new:
+            dts[i] = 1.0
+        if dts.count(dts[0]) == len(dts):
+            key = (dts[0], self.min_cutoff, self.beta, self.d_cutoff)
+            if key != self._coef_key:
+                keep, gain, speed, base = self._coefficients(dts[0])
+                self._coef[:] = (keep, gain, base)
+                self._sums.fill(speed)
+                self._coef_key = key
+            keep, gain, base = self._coef_views
+            sums = self._sums
+        else:
+            keep, gain, speed, base = self._coefficients(
+                np.array(dts, dtype=np.float32)[:, None, None])
+            sums = XYZ_SUMS * speed
+
+        # Derivative, smoothed at the fixed derivative cutoff
+        diff = fresh - x
+        dx *= keep
+        dx += diff * gain
+
+        # Speed-dependent cutoff: a = 1 / (1 + 1 / (2 pi cutoff dt)), applied as
+        # x + a (fresh - x) = fresh - (fresh - x) / (1 + 2 pi cutoff dt)
+        rate = (dx * dx) @ sums
+        np.sqrt(rate, out=rate)
+        rate += base
+        diff /= rate
+        np.subtract(fresh, diff, out=x)
+
+        # New hands pass through unchanged and start with zero speed
+        if new:
+            x[new] = fresh[new]
+            dx[new] = 0
+
+        if views is None:
+            self._x[rows] = x
+            self._dx[rows] = dx
+        return x.copy()
+
+    def __len__(self) -> int:
+        """Number of hands with state"""
+        return len(self._slots)
+
+    def forget(self, key: Hashable):
+        """Drop the state of a hand that is gone"""
+        self._slots.pop(key, None)
+        self._keys = []
+
+    def retain(self, keys: List[Hashable]):
+        """Drop state for every key not in `keys`"""
+        for key in [k for k in self._slots if k not in keys]:
+            self.forget(key)
+
+    def reset(self):
+        """Drop all state"""
+        self._slots.clear()
+        self._keys = []
@@ -0,0 +1,207 @@
+"""
+Binary Landmark Recording
+Compact, chunked, memory-mappable storage for HandDetector output
+
+File layout (little endian):
+    header   16 bytes   magic 'HLMK', version u2, reserved u2, width u4, height u4
+    chunk*   16 bytes   magic 'CHNK', frame count u4, hand count u4, reserved u4
+             FRAME_DTYPE records, one per frame
+             HAND_DTYPE records, one per hand
+
+Chunks are append-only, so a recording can be written to a pipe or stdout.
+"""
+
+import struct
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MAGIC = b'HLMK'
+CHUNK_MAGIC = b'CHNK'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+CHUNK_HEADER = struct.Struct('<4sIII')
+
+HANDEDNESS = ['Left', 'Right']
+
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('first_hand', '<u4'),
+    ('hand_count', '<u2'),
+    ('reserved', '<u2'),
+])
+
+HAND_DTYPE = np.dtype([
+    ('handedness', 'u1'),
+    ('reserved', 'u1', (3,)),
+    ('confidence', '<f4'),
+    ('landmarks', '<f4', (21, 3)),
+])
+
+
+class LandmarkRecorder:
+    """Append-only writer for the binary landmark format"""
+
+    def __init__(self, target: Union[str, BinaryIO], frame_size: Tuple[int, int],
+                 chunk_frames: int = 256):
+        """
+        Initialize recorder
+
+        Args:
+            target: File path or binary stream
+            frame_size: (width, height) of the recorded frames
+            chunk_frames: Frames buffered per chunk
+        """
+        self._owns_file = isinstance(target, str)
+        self.file = open(target, 'wb') if self._owns_file else target
+        self.frame_size = frame_size
+        self.chunk_frames = chunk_frames
+
+        self._frames: List[Tuple[float, int]] = []
+        self._hands: List[np.ndarray] = []
+        self._hand_count = 0
+        self.frames_written = 0
+
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, frame_size[0], frame_size[1]))
+
+    def write_frame(self, landmarks: np.ndarray, handedness: Sequence[str],
+                    confidences: Sequence[float], timestamp: Optional[float] = None):
+        """
+        Buffer one frame
+
+        Args:
+            landmarks: (hands, 21, 3) normalized landmarks
+            handedness: 'Left'/'Right' per hand
+            confidences: Handedness score per hand
+            timestamp: Capture time (default: now)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        count = len(handedness)
+        if count:
+            hands = np.zeros(count, dtype=HAND_DTYPE)
+            hands['handedness'] = [HANDEDNESS.index(label) for label in handedness]
+            hands['confidence'] = confidences
+            hands['landmarks'] = landmarks
+            self._hands.append(hands)
+        self._frames.append((timestamp, count))
+        self._hand_count += count
+
+        if len(self._frames) >= self.chunk_frames:
+            self.flush()
+
+    def record(self, hands_data: List[Dict], timestamp: Optional[float] = None):
+        """Buffer the hand dicts returned by `detect_hands`"""
+        if isinstance(getattr(hands_data, 'landmarks', None), np.ndarray):
+            # HandFrame: landmarks are already one (hands, 21, 3) array
+            self.write_frame(hands_data.landmarks, hands_data.handedness,
+                             hands_data.data['confidence'].tolist(), timestamp)
+            return
+        hands = [hand for hand in hands_data if 'landmarks' in hand]
+        landmarks = np.asarray([hand['landmarks'] for hand in hands], dtype=np.float32)
+        self.write_frame(
+            landmarks.reshape(-1, 21, 3),
+            [hand['handedness'] for hand in hands],
+            [hand['confidence'] for hand in hands],
+            timestamp,
+        )
+
+    def flush(self):
+        """Write buffered frames as one chunk"""
+        if not self._frames:
+            return
+        frames = np.zeros(len(self._frames), dtype=FRAME_DTYPE)
+        counts = np.array([count for _, count in self._frames], dtype=np.int64)
+        frames['timestamp'] = [ts for ts, _ in self._frames]
+        frames['hand_count'] = counts
+        frames['first_hand'] = np.cumsum(counts) - counts
+
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(frames), self._hand_count, 0))
+        self.file.write(frames.tobytes())
+        for hands in self._hands:
+            self.file.write(hands.tobytes())
+        self.file.flush()
+
+        self.frames_written += len(frames)
+        self._frames.clear()
+        self._hands.clear()
+        self._hand_count = 0
+
+    def close(self):
+        """Flush and close the recording"""
+        self.flush()
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped reader; frames and hands are views into the file"""
+
+    def __init__(self, path: str):
+        """
+        Open recording
+
+        Args:
+            path: Recording file written by LandmarkRecorder
+        """
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, _, width, height = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a landmark recording: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}: {path}")
+        self.frame_size = (width, height)
+
+        # Chunk index: (frames view, hands view, first global frame)
+        self.chunks: List[Tuple[np.ndarray, np.ndarray, int]] = []
+        self._chunk_starts: List[int] = []
+        offset = HEADER.size
+        total = 0
+        while offset + CHUNK_HEADER.size <= len(self.data):
+            magic, n_frames, n_hands, _ = CHUNK_HEADER.unpack_from(self.data, offset)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt chunk at byte {offset}: {path}")
+            offset += CHUNK_HEADER.size
+            frames_end = offset + n_frames * FRAME_DTYPE.itemsize
+            hands_end = frames_end + n_hands * HAND_DTYPE.itemsize
+            if hands_end > len(self.data):
+                break  # Truncated final chunk (recording still being written)
+            frames = self.data[offset:frames_end].view(FRAME_DTYPE)
+            hands = self.data[frames_end:hands_end].view(HAND_DTYPE)
+            self.chunks.append((frames, hands, total))
+            self._chunk_starts.append(total)
+            total += n_frames
+            offset = hands_end
+        self.frame_count = total
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def frame(self, index: int) -> Tuple[float, np.ndarray]:
+        """
+        Get one recorded frame
+
+        Returns:
+            (timestamp, HAND_DTYPE view of that frame's hands)
+        """
+        if not 0 <= index < self.frame_count:
+            raise IndexError(index)
+        chunk = int(np.searchsorted(self._chunk_starts, index, side='right')) - 1
+        frames, hands, start = self.chunks[chunk]
+        record = frames[index - start]
+        first = int(record['first_hand'])
+        return float(record['timestamp']), hands[first:first + int(record['hand_count'])]
+
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray]]:
+        for frames, hands, _ in self.chunks:
+            for record in frames:
+                first = int(record['first_hand'])
+                yield float(record['timestamp']), hands[first:first + int(record['hand_count'])]
@@ -0,0 +1,207 @@
+"""
+Per-Stage Latency Instrumentation
+Fixed-memory log-bucket histograms, on-screen panel and JSON export
+"""
+
+import json
+import math
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+class LatencyHistogram:
+    """Log-spaced histogram of durations with constant memory"""
+
+    def __init__(self, min_seconds: float = 1e-6, max_seconds: float = 10.0,
+                 buckets_per_decade: int = 20):
+        """
+        Initialize histogram
+
+        Args:
+            min_seconds: Lower edge of the first bucket
+            max_seconds: Upper edge of the last bucket
+            buckets_per_decade: Resolution (20 = ~12% bucket width)
+        """
+        self.log_min = math.log10(min_seconds)
+        self.scale = buckets_per_decade
+        decades = math.log10(max_seconds) - self.log_min
+        self.num_buckets = int(math.ceil(decades * buckets_per_decade)) + 1
+        self.counts = np.zeros(self.num_buckets, dtype=np.int64)
+        self.edges = 10 ** (self.log_min + np.arange(1, self.num_buckets + 1) / self.scale)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """Add one sample"""
+        if seconds > 0:
+            index = int((math.log10(seconds) - self.log_min) * self.scale)
+            index = min(max(index, 0), self.num_buckets - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Approximate percentile in seconds (upper edge of the containing bucket)"""
+        if self.count == 0:
+            return 0.0
+        target = p / 100.0 * self.count
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        return float(min(self.edges[min(index, self.num_buckets - 1)], self.max))
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        """Clear all samples"""
+        self.counts.fill(0)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class _Stage:
+    """Reusable context manager that times one stage"""
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    """No-op stage used when instrumentation is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTimer:
+    """Timer with the StageTimer interface that records nothing"""
+
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+    def record(self, name: str, seconds: float):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class StageTimer:
+    """Named per-stage latency histograms"""
+
+    def __init__(self, stages: Optional[List[str]] = None):
+        """
+        Initialize stage timer
+
+        Args:
+            stages: Stage names in display order (others are added on first use)
+        """
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._stages: Dict[str, _Stage] = {}
+        for name in stages or []:
+            self._add(name)
+
+    def _add(self, name: str) -> _Stage:
+        histogram = LatencyHistogram()
+        self.histograms[name] = histogram
+        self._stages[name] = _Stage(histogram)
+        return self._stages[name]
+
+    def stage(self, name: str) -> _Stage:
+        """Context manager timing `name`"""
+        stage = self._stages.get(name)
+        return stage if stage is not None else self._add(name)
+
+    def record(self, name: str, seconds: float):
+        """Record a duration measured elsewhere"""
+        self.stage(name).histogram.record(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, mean, p50/p95/p99 and max in milliseconds"""
+        return {
+            name: {
+                'count': hist.count,
+                'mean_ms': hist.mean * 1000,
+                'p50_ms': hist.percentile(50) * 1000,
+                'p95_ms': hist.percentile(95) * 1000,
+                'p99_ms': hist.percentile(99) * 1000,
+                'max_ms': hist.max * 1000,
+            }
+            for name, hist in self.histograms.items() if hist.count
+        }
+
+    def log_lines(self) -> List[str]:
+        """One line per stage for periodic console logs"""
+        return [
+            f"  {name:<12} p50 {s['p50_ms']:7.2f}ms  p95 {s['p95_ms']:7.2f}ms  "
+            f"p99 {s['p99_ms']:7.2f}ms  (n={s['count']})"
+            for name, s in self.summary().items()
+        ]
+
+    def draw_panel(self, frame: np.ndarray, x: int = 10, y: int = 30) -> np.ndarray:
+        """Draw a p50/p95/p99 table on the frame"""
+        summary = self.summary()
+        if not summary:
+            return frame
+        width, line_height = 330, 20
+        height = line_height * (len(summary) + 1) + 10
+        x = max(0, min(x, frame.shape[1] - width))
+
+        # Darken the panel area for readability
+        panel = frame[y:y + height, x:x + width]
+        panel //= 3
+
+        cv2.putText(frame, "stage        p50    p95    p99 ms", (x + 5, y + 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+        for row, (name, s) in enumerate(summary.items(), start=1):
+            text = f"{name:<10} {s['p50_ms']:6.1f} {s['p95_ms']:6.1f} {s['p99_ms']:6.1f}"
+            cv2.putText(frame, text, (x + 5, y + 15 + row * line_height),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+        return frame
+
+    def dump_json(self, path: str):
+        """Write the summary and raw bucket counts to a JSON file"""
+        data = {
+            'stages': self.summary(),
+            'histograms': {
+                name: {
+                    'bucket_upper_edges_s': hist.edges[hist.counts > 0].tolist(),
+                    'counts': hist.counts[hist.counts > 0].tolist(),
+                }
+                for name, hist in self.histograms.items() if hist.count
+            },
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def reset(self):
+        """Clear every histogram"""
+        for hist in self.histograms.values():
+            hist.reset()
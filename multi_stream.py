@@ -0,0 +1,356 @@
+"""
+Multi-Stream Hand Detection
+Runs one detector worker process per camera or video and merges their hand records
+"""
+
+import heapq
+import os
+import queue
+import sys
+import time
+import multiprocessing as mproc
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import cv2
+
+from capture import detector_time
+from shared_frames import SharedFrameRing, start_capture_process
+from streaming import HandStreamWriter, frame_record
+
+Source = Union[int, str]
+
+# Seconds between checks for workers that died without reporting
+SUPERVISE_INTERVAL = 0.25
+
+
+def parse_source(source: str) -> Source:
+    """Camera index for numeric strings, otherwise a file path or URL"""
+    return int(source) if source.isdigit() else source
+
+
+def _capture_frames(source: Source, options: Dict, stop) -> Iterator[Tuple]:
+    """(frame, wall time, detector clock) read straight from a camera or video"""
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"Cannot open source: {source}")
+        if isinstance(source, int) and options.get('resolution'):
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, options['resolution'][0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, options['resolution'][1])
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                return
+            timestamp = time.time()
+            yield frame, timestamp, detector_time(cap, isinstance(source, int), timestamp)
+    finally:
+        cap.release()
+
+
+def _ring_frames(ring: SharedFrameRing, stop) -> Iterator[Tuple]:
+    """(frame, wall time, detector clock) for the newest frame of a shared capture ring"""
+    reader = ring.reader(0)
+    try:
+        while not stop.is_set():
+            item = reader.get_latest(timeout=0.5)
+            if item is None:
+                if ring.closed:
+                    raise IOError("Shared capture stopped")
+                continue
+            # Live source: the capture time is the detector clock
+            yield item[0], item[1], item[1]
+    finally:
+        reader.release()
+
+
+def _stream_worker(stream_id: int, source: Source, options: Dict, records, stop,
+                   ring: Optional[SharedFrameRing] = None):
+    """Worker: read one source, detect hands and push frame records to the queue"""
+    from hand_detection import HandDetector
+
+    # One process per stream already fills the cores; avoid oversubscription
+    cv2.setNumThreads(1)
+
+    error = None
+    frames = 0
+    reader = _capture_frames(source, options, stop) if ring is None else _ring_frames(ring, stop)
+    try:
+        detector = HandDetector(**options.get('detector_kwargs', {}))
+
+        for frame, timestamp, clock in reader:
+            if options.get('flip'):
+                frame = cv2.flip(frame, 1)
+            _, hands = detector.detect_hands(frame, clock)
+            frame = None  # Drop the ring view before the next one is taken
+
+            record = frame_record(frames, hands, timestamp, stream=stream_id)
+            frames += 1
+            # Block only briefly so a stalled consumer cannot wedge shutdown
+            while not stop.is_set():
+                try:
+                    records.put(('frame', stream_id, os.getpid(), record), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        reader.close()
+        if ring is not None:
+            ring.close()
+        records.put(('done', stream_id, os.getpid(), {'frames': frames, 'error': error}))
+
+
+class MultiStreamRunner:
+    """Supervises one detector process per source and merges their records by timestamp"""
+
+    # Process target: (stream_id, source, options, records, stop, ring)
+    worker = staticmethod(_stream_worker)
+
+    def __init__(self, sources: List[Source], output: str = '-',
+                 detector_kwargs: Optional[Dict] = None, flip: bool = False,
+                 resolution: Optional[tuple] = None, max_restarts: int = 3,
+                 merge_window: float = 0.25, queue_size: int = 256,
+                 shared_capture: bool = False):
+        """
+        Initialize multi-stream runner
+
+        Args:
+            sources: Camera indices and/or video paths, one worker each
+            output: ndjson destination ('-' = stdout)
+            detector_kwargs: Extra HandDetector arguments for every worker
+            flip: Mirror frames like the live app does
+            resolution: (width, height) requested from cameras
+            max_restarts: Restarts allowed per camera after a crash or error
+            merge_window: Longest wait (seconds) for a lagging stream before
+                newer records from the others are written
+            queue_size: Records buffered between workers and the merger
+            shared_capture: Decode each camera in its own capture process that
+                feeds a shared-memory frame ring; the detector worker takes the
+                newest frame from it, and a restarted worker reattaches instead
+                of reopening the camera
+        """
+        self.sources = list(sources)
+        self.output = output
+        self.options = {
+            'detector_kwargs': detector_kwargs or {},
+            'flip': flip,
+            'resolution': resolution,
+        }
+        self.max_restarts = max_restarts
+        self.merge_window = merge_window
+        self.shared_capture = shared_capture
+
+        # MediaPipe graphs are not fork-safe, so workers are spawned fresh
+        self._context = mproc.get_context("spawn")
+        self._records = self._context.Queue(maxsize=queue_size)
+        self._stop = self._context.Event()
+        self._workers: Dict[int, mproc.Process] = {}
+        self._pending: List = []  # Heap of (timestamp, stream_id, frame, record)
+        self._latest: Dict[int, float] = {}  # Newest timestamp seen per stream
+        self._captures: Dict[int, Tuple] = {}  # Camera stream -> (ring, process, stop)
+
+        self.stats = {
+            stream_id: {'source': source, 'frames': 0, 'restarts': 0, 'error': None, 'done': False}
+            for stream_id, source in enumerate(self.sources)
+        }
+
+    def _capture_ring(self, stream_id: int) -> Optional[SharedFrameRing]:
+        """Shared frame ring of a camera stream, (re)starting its capture process if needed"""
+        source = self.sources[stream_id]
+        if not self.shared_capture or not isinstance(source, int):
+            return None
+        capture = self._captures.get(stream_id)
+        if capture is not None and capture[1].is_alive() and not capture[0].closed:
+            return capture[0]
+        if capture is not None:
+            self._stop_capture(stream_id)
+
+        width, height = self.options['resolution'] or (640, 480)
+        self._captures[stream_id] = start_capture_process(source, (height, width, 3))
+        return self._captures[stream_id][0]
+
+    def _stop_capture(self, stream_id: int, timeout: float = 2.0):
+        ring, process, stop = self._captures.pop(stream_id)
+        stop.set()
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        ring.close()
+
+    def _start_worker(self, stream_id: int):
+        self._latest[stream_id] = float('-inf')
+        process = self._context.Process(
+            target=self.worker,
+            args=(stream_id, self.sources[stream_id], self.options, self._records, self._stop,
+                  self._capture_ring(stream_id)),
+            name=f"HandStream-{stream_id}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[stream_id] = process
+
+    def _finish_worker(self, stream_id: int, error: Optional[str]):
+        """Handle a worker that exited; cameras are restarted after failures"""
+        stats = self.stats[stream_id]
+        stats['error'] = error
+        self._workers.pop(stream_id, None)
+
+        # Video files end normally; a live camera stopping is always a failure
+        is_camera = isinstance(self.sources[stream_id], int)
+        if is_camera and not self._stop.is_set() and stats['restarts'] < self.max_restarts:
+            stats['restarts'] += 1
+            print(f"Stream {stream_id} stopped ({error or 'end of input'}), restarting",
+                  file=sys.stderr)
+            self._start_worker(stream_id)
+        else:
+            stats['done'] = True
+            if error:
+                print(f"Stream {stream_id} failed: {error}", file=sys.stderr)
+
+    def _supervise(self):
+        """Catch workers that died without reporting (segfault, kill)"""
+        for stream_id, process in list(self._workers.items()):
+            if not process.is_alive() and process.exitcode not in (None, 0):
+                process.join()
+                self._finish_worker(stream_id, f"exit code {process.exitcode}")
+
+    def _current(self, stream_id: int, pid: int) -> Optional[mproc.Process]:
+        """The stream's worker if it sent this message, else None (a replaced or reaped process)"""
+        process = self._workers.get(stream_id)
+        return process if process is not None and process.pid == pid else None
+
+    def _hold(self, stream_id: int, record: Dict):
+        """Queue a worker's record for ordered output"""
+        self.stats[stream_id]['frames'] += 1
+        self._latest[stream_id] = record['timestamp']
+        heapq.heappush(self._pending, (record['timestamp'], stream_id, record['frame'], record))
+
+    def _emit(self, writer: HandStreamWriter, flush_all: bool = False):
+        """Write held records no live stream can still precede, oldest first"""
+        # Every live stream has reported past the watermark; a stalled stream
+        # holds the others back for at most merge_window seconds
+        horizon = time.time() - self.merge_window
+        live = [self._latest[stream_id] for stream_id in self._workers]
+        if live:
+            horizon = max(horizon, min(live))
+        else:
+            flush_all = True
+        while self._pending and (flush_all or self._pending[0][0] <= horizon):
+            record = heapq.heappop(self._pending)[-1]
+            writer.write_record(record)
+
+    def run(self, duration: Optional[float] = None) -> Dict[int, Dict]:
+        """
+        Run until every stream ends, duration elapses or Ctrl+C
+
+        Returns:
+            Per-stream stats (source, frames, restarts, error)
+        """
+        writer = HandStreamWriter(self.output, 'ndjson')
+        start_time = time.time()
+        for stream_id in range(len(self.sources)):
+            self._start_worker(stream_id)
+        next_check = start_time + SUPERVISE_INTERVAL
+
+        try:
+            while self._workers:
+                now = time.time()
+                if duration is not None and now - start_time >= duration:
+                    break
+                # On a clock, so busy streams cannot hide a crashed one
+                if now >= next_check:
+                    self._supervise()
+                    next_check = now + SUPERVISE_INTERVAL
+                try:
+                    kind, stream_id, pid, payload = self._records.get(timeout=0.1)
+                except queue.Empty:
+                    self._emit(writer)
+                    continue
+
+                process = self._current(stream_id, pid)
+                if process is None:
+                    continue
+                if kind == 'frame':
+                    self._hold(stream_id, payload)
+                else:
+                    process.join()
+                    self._finish_worker(stream_id, payload['error'])
+                self._emit(writer)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        finally:
+            self._shutdown()
+            try:
+                self._emit(writer, flush_all=True)
+                writer.close()
+            except BrokenPipeError:
+                pass
+
+        return self.stats
+
+    def _shutdown(self, timeout: float = 2.0):
+        """Stop workers, keeping the records they flush on the way out"""
+        self._stop.set()
+        deadline = time.time() + timeout
+        while self._workers and time.time() < deadline:
+            try:
+                kind, stream_id, pid, payload = self._records.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if self._current(stream_id, pid) is None:
+                continue
+            if kind == 'frame':
+                self._hold(stream_id, payload)
+            else:
+                self._workers.pop(stream_id).join()
+                self.stats[stream_id]['done'] = True
+                self.stats[stream_id]['error'] = payload['error']
+
+        for process in self._workers.values():
+            process.terminate()
+            process.join()
+        self._workers.clear()
+        for stream_id in list(self._captures):
+            self._stop_capture(stream_id)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hand detection on several cameras/videos at once")
+    parser.add_argument("sources", nargs="+", help="Camera IDs and/or video files")
+    parser.add_argument("--output", type=str, default="-",
+                        help="ndjson output file ('-' = stdout)")
+    parser.add_argument("--flip", action="store_true", help="Mirror frames before detection")
+    parser.add_argument("--width", type=int, default=1280, help="Camera frame width")
+    parser.add_argument("--height", type=int, default=720, help="Camera frame height")
+    parser.add_argument("--max-hands", type=int, default=2, help="Maximum hands per frame")
+    parser.add_argument("--max-restarts", type=int, default=3,
+                        help="Restarts per camera after a failure")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="Stop after this many seconds (0 = until sources end)")
+    parser.add_argument("--shared-capture", action="store_true",
+                        help="Decode cameras in separate processes sharing frames through memory")
+
+    args = parser.parse_args()
+
+    runner = MultiStreamRunner(
+        [parse_source(s) for s in args.sources],
+        output=args.output,
+        detector_kwargs={'max_hands': args.max_hands},
+        flip=args.flip,
+        resolution=(args.width, args.height),
+        max_restarts=args.max_restarts,
+        shared_capture=args.shared_capture,
+    )
+    stats = runner.run(duration=args.duration or None)
+
+    print(f"\n{'='*60}", file=sys.stderr)
+    print("Multi-Stream Summary:", file=sys.stderr)
+    for stream_id, s in stats.items():
+        status = f"error: {s['error']}" if s['error'] else "ok"
+        print(f"[{stream_id}] {s['source']}: {s['frames']} frames, "
+              f"{s['restarts']} restarts, {status}", file=sys.stderr)
+    print(f"{'='*60}\n", file=sys.stderr)
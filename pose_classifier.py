@@ -0,0 +1,276 @@
+"""
+Trainable Pose Classifier
+Small NumPy MLP over normalized landmarks, trained from labelled recordings
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gesture_registry import GestureRegistry
+from landmark_recording import LandmarkRecording
+
+# Wrist -> middle finger MCP defines each hand's up direction and scale
+WRIST = 0
+MIDDLE_MCP = 9
+
+
+def normalize_landmarks(landmarks: np.ndarray) -> np.ndarray:
+    """
+    Remove wrist position, in-plane rotation and hand size
+
+    Args:
+        landmarks: (hands, 21, 3) landmarks
+
+    Returns:
+        (hands, 60) float32 vectors: the 20 non-wrist points with the wrist at
+        the origin, wrist->middle MCP pointing up and of unit length
+    """
+    centered = landmarks.astype(np.float32) - landmarks[:, WRIST:WRIST + 1, :]
+    axis = centered[:, MIDDLE_MCP, :2]
+    length = np.maximum(np.linalg.norm(axis, axis=1), 1e-6)
+
+    # Rotate by the axis angle from "up" (0, -1)
+    cos = (-axis[:, 1] / length)[:, None]
+    sin = (axis[:, 0] / length)[:, None]
+    x, y = centered[:, :, 0], centered[:, :, 1]
+    rotated = np.stack([cos * x + sin * y, cos * y - sin * x, centered[:, :, 2]], axis=-1)
+    rotated /= length[:, None, None]
+    return rotated[:, 1:].reshape(len(landmarks), -1)
+
+
+def load_labelled_recordings(sources: Dict[str, Sequence[str]]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Gather every recorded hand as a training sample
+
+    Args:
+        sources: Label -> landmark recordings (.hlmk) showing only that pose
+
+    Returns:
+        (samples, 21, 3) landmarks and one label per sample
+    """
+    landmarks = []
+    labels = []
+    for label, paths in sources.items():
+        for path in paths:
+            recording = LandmarkRecording(path)
+            for _, hands, _ in recording.chunks:
+                landmarks.append(np.array(hands['landmarks']))
+                labels.extend([label] * len(hands))
+    if not landmarks:
+        return np.zeros((0, 21, 3), dtype=np.float32), []
+    return np.concatenate(landmarks), labels
+
+
+class PoseClassifier:
+    """Softmax (hidden=0) or one-hidden-layer MLP over normalized landmarks"""
+
+    def __init__(self, labels: Sequence[str], hidden: int = 32):
+        """
+        Initialize classifier
+
+        Args:
+            labels: Pose names, one per output class
+            hidden: Hidden ReLU units (0 = linear softmax)
+        """
+        self.labels = list(labels)
+        self.hidden = hidden
+        self.mean: Optional[np.ndarray] = None
+        self.std: Optional[np.ndarray] = None
+        self.weights: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+
+    def _forward(self, x: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Logits, plus hidden activations when the model has a hidden layer"""
+        if self.hidden:
+            h = np.maximum(x @ self.weights[0] + self.biases[0], 0)
+            return h @ self.weights[1] + self.biases[1], h
+        return x @ self.weights[0] + self.biases[0], None
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        z = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return z / z.sum(axis=1, keepdims=True)
+
+    def fit(self, landmarks: np.ndarray, labels: Sequence[str], epochs: int = 200,
+            learning_rate: float = 0.01, weight_decay: float = 1e-4, batch_size: int = 256,
+            mirror: bool = True, seed: int = 0) -> Dict[str, float]:
+        """
+        Train with Adam on cross-entropy
+
+        Args:
+            landmarks: (samples, 21, 3) landmarks
+            labels: Pose name per sample (must be in self.labels)
+            epochs: Passes over the data
+            learning_rate: Adam step size
+            weight_decay: L2 penalty on weights
+            batch_size: Samples per update
+            mirror: Also train on x-mirrored copies so one recording covers both hands
+            seed: Initialization and shuffling seed
+
+        Returns:
+            Final training loss and accuracy
+        """
+        x = normalize_landmarks(landmarks)
+        y = np.array([self.labels.index(label) for label in labels], dtype=np.int64)
+        if mirror:
+            flipped = x.reshape(len(x), -1, 3).copy()
+            flipped[:, :, 0] *= -1
+            x = np.concatenate([x, flipped.reshape(len(x), -1)])
+            y = np.concatenate([y, y])
+
+        self.mean = x.mean(axis=0)
+        self.std = x.std(axis=0) + 1e-6
+        x = (x - self.mean) / self.std
+
+        rng = np.random.default_rng(seed)
+        sizes = [x.shape[1]] + ([self.hidden] if self.hidden else []) + [len(self.labels)]
+        self.weights = [(rng.standard_normal((a, b)) * np.sqrt(2.0 / a)).astype(np.float32)
+                        for a, b in zip(sizes[:-1], sizes[1:])]
+        self.biases = [np.zeros(b, dtype=np.float32) for b in sizes[1:]]
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, step = 0.9, 0.999, 0
+
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                xb, yb = x[batch], y[batch]
+
+                logits, h = self._forward(xb)
+                grad = self._softmax(logits)
+                grad[np.arange(len(yb)), yb] -= 1
+                grad /= len(yb)
+
+                # Backprop through the (optional) hidden layer
+                if self.hidden:
+                    grads_w = [None, h.T @ grad]
+                    grads_b = [None, grad.sum(axis=0)]
+                    dh = (grad @ self.weights[1].T) * (h > 0)
+                    grads_w[0] = xb.T @ dh
+                    grads_b[0] = dh.sum(axis=0)
+                else:
+                    grads_w = [xb.T @ grad]
+                    grads_b = [grad.sum(axis=0)]
+                grads = [g + weight_decay * w for g, w in zip(grads_w, self.weights)] + grads_b
+
+                step += 1
+                for p, g, m_i, v_i in zip(params, grads, m, v):
+                    m_i *= beta1
+                    m_i += (1 - beta1) * g
+                    v_i *= beta2
+                    v_i += (1 - beta2) * g * g
+                    m_hat = m_i / (1 - beta1 ** step)
+                    v_hat = v_i / (1 - beta2 ** step)
+                    p -= (learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(p.dtype)
+
+        probs = self._softmax(self._forward(x)[0])
+        return {
+            'loss': float(-np.log(probs[np.arange(len(y)), y] + 1e-12).mean()),
+            'accuracy': float((probs.argmax(axis=1) == y).mean()),
+        }
+
+    def predict_proba(self, landmarks: np.ndarray) -> np.ndarray:
+        """Class probabilities for every hand, (hands, classes)"""
+        if len(landmarks) == 0:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        x = (normalize_landmarks(landmarks) - self.mean) / self.std
+        return self._softmax(self._forward(x.astype(np.float32))[0])
+
+    def predict(self, landmarks: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """Most likely pose and its probability for every hand"""
+        probs = self.predict_proba(landmarks)
+        best = probs.argmax(axis=1)
+        return [self.labels[i] for i in best], probs[np.arange(len(best)), best]
+
+    def attach(self, registry: GestureRegistry, min_confidence: float = 0.7,
+               position: Optional[int] = 0, feature_name: str = 'pose_probs'):
+        """
+        Register one gesture per pose on a gesture registry
+
+        The model runs once per frame for all hands (as a cached feature);
+        each pose gesture matches when it is the top class with at least
+        min_confidence and reports the probability as its confidence.
+
+        Args:
+            registry: Registry to extend, e.g. HandDetector.gestures
+            min_confidence: Lowest probability accepted as a match
+            position: Match order slot of the first pose (0 = before the rules,
+                None = after them)
+            feature_name: Name of the probability feature on this registry
+        """
+        registry.add_feature(feature_name, lambda f: self.predict_proba(f.landmarks))
+
+        for k, label in enumerate(self.labels):
+            def match(k=k, **features):
+                probs = features[feature_name]
+                hit = (probs.argmax(axis=1) == k) & (probs[:, k] >= min_confidence)
+                return np.where(hit, probs[:, k], 0.0)
+            slot = None if position is None else position + k
+            registry.add_callable(label, match, features=[feature_name], position=slot)
+
+    def save(self, path: str):
+        """Write labels, normalization and weights to an .npz file"""
+        arrays = {f'w{i}': w for i, w in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        np.savez(path, labels=np.array(self.labels), hidden=self.hidden,
+                 mean=self.mean, std=self.std, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'PoseClassifier':
+        """Read a model written by save()"""
+        with np.load(path) as data:
+            model = cls(data['labels'].tolist(), hidden=int(data['hidden']))
+            model.mean = data['mean']
+            model.std = data['std']
+            layers = 2 if model.hidden else 1
+            model.weights = [data[f'w{i}'] for i in range(layers)]
+            model.biases = [data[f'b{i}'] for i in range(layers)]
+        return model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train a pose classifier from landmark recordings")
+    parser.add_argument("data", nargs="+", metavar="LABEL=PATH",
+                        help="Recording (.hlmk) showing one pose, e.g. Fist=fist.hlmk")
+    parser.add_argument("--output", type=str, default="poses.npz", help="Model file to write")
+    parser.add_argument("--hidden", type=int, default=32, help="Hidden units (0 = linear softmax)")
+    parser.add_argument("--epochs", type=int, default=200, help="Training epochs")
+    parser.add_argument("--val-split", type=float, default=0.2,
+                        help="Fraction of samples held out for validation")
+
+    args = parser.parse_args()
+
+    sources: Dict[str, List[str]] = {}
+    for item in args.data:
+        label, _, path = item.partition('=')
+        if not path:
+            parser.error(f"Expected LABEL=PATH, got {item}")
+        sources.setdefault(label, []).append(path)
+
+    landmarks, labels = load_labelled_recordings(sources)
+    if len(landmarks) == 0:
+        parser.error("No hands found in the recordings")
+
+    order = np.random.default_rng(0).permutation(len(landmarks))
+    n_val = int(len(order) * args.val_split)
+    val, train = order[:n_val], order[n_val:]
+
+    model = PoseClassifier(sorted(sources), hidden=args.hidden)
+    stats = model.fit(landmarks[train], [labels[i] for i in train], epochs=args.epochs)
+    model.save(args.output)
+
+    print(f"\n{'='*60}")
+    print("Pose Classifier Training:")
+    print(f"Samples: {len(train)} train, {n_val} validation, {len(sources)} poses")
+    print(f"Train loss: {stats['loss']:.4f}, accuracy: {stats['accuracy']:.1%}")
+    if n_val:
+        predicted, _ = model.predict(landmarks[val])
+        accuracy = np.mean([p == labels[i] for p, i in zip(predicted, val)])
+        print(f"Validation accuracy: {accuracy:.1%}")
+    print(f"Saved: {args.output}")
+    print(f"{'='*60}\n")
@@ -0,0 +1,146 @@
+"""
+Keyframe Detection with Motion Prediction
+Runs real inference only on keyframes and extrapolates landmarks in between
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from landmark_features import HandFeatures
+
+
+class KeyframeScheduler:
+    """Wraps a HandDetector and skips inference while hands move predictably"""
+
+    def __init__(self, detector, max_interval: int = 4, error_threshold: float = 0.02,
+                 slow_speed: float = 0.002, fast_speed: float = 0.02):
+        """
+        Initialize keyframe scheduler
+
+        Args:
+            detector: HandDetector (or compatible) used on keyframes
+            max_interval: Longest run of frames between keyframes
+            error_threshold: Expected landmark error (normalized units) that
+                forces a keyframe
+            slow_speed: Hand speed (normalized units/frame) at or below which
+                the full max_interval is used
+            fast_speed: Hand speed at or above which every frame is a keyframe
+        """
+        self.detector = detector
+        self.max_interval = max(1, max_interval)
+        self.error_threshold = error_threshold
+        self.slow_speed = slow_speed
+        self.fast_speed = fast_speed
+
+        self.interval = 1
+        self._landmarks: Optional[np.ndarray] = None
+        self._velocity: Optional[np.ndarray] = None
+        self._handedness: List[str] = []
+        self._track_ids: List[int] = []
+        self._scores: List[float] = []
+        self._since_keyframe = 0
+        self._has_velocity = False
+        self._error_rate = 0.0  # Mean prediction error per predicted frame
+
+        self.stats = {'observed': 0, 'predicted': 0}
+
+    def __getattr__(self, name):
+        # Everything else (draw_hands, hand_trails, timer, ...) is the detector's
+        if name == 'detector':
+            raise AttributeError(name)
+        return getattr(self.detector, name)
+
+    def detect_hands(self, frame: np.ndarray,
+                     timestamp: Optional[float] = None) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Detect or predict hands for this frame
+
+        Args:
+            frame: Input frame (BGR)
+            timestamp: Frame time in seconds (default: now)
+
+        Returns:
+            Frame, List of hand data dicts with 'predicted' set to True or False
+        """
+        if self._should_predict():
+            return frame, self._predict(frame, timestamp)
+        return self._observe(frame, timestamp)
+
+    def _should_predict(self) -> bool:
+        """Whether this frame can be extrapolated instead of detected"""
+        if self._landmarks is None or len(self._landmarks) == 0:
+            return False
+        steps = self._since_keyframe + 1
+        if steps >= self.interval:
+            return False
+        if self._error_rate * steps > self.error_threshold:
+            return False
+        # Hands about to leave the frame need a real detection
+        centers = (self._landmarks + self._velocity * steps)[:, :, :2].mean(axis=1)
+        return bool(((centers > 0.0) & (centers < 1.0)).all())
+
+    def _observe(self, frame: np.ndarray, timestamp: Optional[float]) -> Tuple[np.ndarray, List[Dict]]:
+        """Run real inference and update the motion model"""
+        frame, hands_data = self.detector.detect_hands(frame, timestamp)
+        features = self.detector.last_features
+        landmarks = features.landmarks if features is not None else np.zeros((0, 21, 3), np.float32)
+        track_ids = [hand['id'] for hand in hands_data]
+        steps = self._since_keyframe + 1
+
+        if (self._landmarks is not None and len(landmarks)
+                and track_ids == self._track_ids):
+            # Error of the prediction we would have made for this frame
+            if self._since_keyframe > 0:
+                predicted = self._landmarks + self._velocity * steps
+                error = float(np.abs(landmarks - predicted).mean())
+                self._error_rate = 0.7 * self._error_rate + 0.3 * error / steps
+            self._velocity = (landmarks - self._landmarks) / steps
+            self._has_velocity = True
+        else:
+            # New or lost tracks: no motion estimate until the next keyframe
+            self._velocity = np.zeros_like(landmarks)
+            self._has_velocity = False
+            self._error_rate = 0.0
+
+        self._landmarks = landmarks.copy()
+        self._handedness = [hand['handedness'] for hand in hands_data]
+        self._track_ids = track_ids
+        self._scores = [hand['confidence'] for hand in hands_data]
+        self._since_keyframe = 0
+        self._adapt_interval()
+        self.stats['observed'] += 1
+
+        for hand in hands_data:
+            hand['predicted'] = False
+        return frame, hands_data
+
+    def _predict(self, frame: np.ndarray, timestamp: Optional[float]) -> List[Dict]:
+        """Extrapolate the last observation with constant velocity"""
+        self._since_keyframe += 1
+        landmarks = self._landmarks + self._velocity * self._since_keyframe
+        h, w = frame.shape[:2]
+
+        features = HandFeatures(landmarks.astype(np.float32), (w, h))
+        self.detector.last_features = features
+        hands_data = self.detector._build_hands(features, self._handedness, self._scores,
+                                                self._track_ids, timestamp)
+        for hand in hands_data:
+            hand['predicted'] = True
+        self.stats['predicted'] += 1
+        return hands_data
+
+    def _adapt_interval(self):
+        """Pick the keyframe interval from the fastest hand's speed"""
+        if not self._has_velocity or len(self._velocity) == 0:
+            self.interval = 1
+            return
+        speed = float(np.linalg.norm(self._velocity[:, :, :2].mean(axis=1), axis=-1).max())
+        if speed >= self.fast_speed:
+            self.interval = 1
+        elif speed <= self.slow_speed:
+            self.interval = self.max_interval
+        else:
+            # Linear between the two speeds
+            t = (self.fast_speed - speed) / (self.fast_speed - self.slow_speed)
+            self.interval = max(1, int(round(1 + t * (self.max_interval - 1))))
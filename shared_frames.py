@@ -0,0 +1,315 @@
+"""
+Shared-Memory Frame Ring
+Zero-copy frame transport between capture, detection and rendering processes
+"""
+
+import multiprocessing as mproc
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+MAGIC = b'SFRM'
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('slots', '<u4'),
+    ('max_readers', '<u4'),
+    ('shape', '<u4', (3,)),
+    ('closed', '<u4'),
+    ('head', '<u8'),      # Sequence number of the newest committed frame
+    ('dropped', '<u8'),   # Frames overwritten before any reader took them
+])
+
+SLOT_DTYPE = np.dtype([
+    ('seq', '<u8'),        # 0 while being written
+    ('timestamp', '<f8'),
+])
+
+READER_DTYPE = np.dtype([
+    ('hold', '<u8'),       # Sequence number currently held (0 = none)
+    ('taken', '<u8'),      # Newest sequence number this reader has taken
+])
+
+ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _layout(slots: int, max_readers: int, shape: Tuple[int, int, int]) -> Tuple[int, int, int, int]:
+    """Byte offsets of the slot table, reader table and frames, plus total size"""
+    slot_offset = _align(HEADER_DTYPE.itemsize)
+    reader_offset = _align(slot_offset + SLOT_DTYPE.itemsize * slots)
+    frame_offset = _align(reader_offset + READER_DTYPE.itemsize * max_readers)
+    size = frame_offset + slots * int(np.prod(shape))
+    return slot_offset, reader_offset, frame_offset, size
+
+
+class SharedFrameRing:
+    """
+    Fixed ring of preallocated uint8 frame slots in shared memory
+
+    One writer fills slots in turn and publishes each with a sequence number.
+    Readers take the newest frame as a view into the slot and mark it held;
+    the writer never reuses a held slot, so a view stays intact until the
+    reader releases it. With slots >= readers + 2 the writer never waits.
+
+    Claiming a slot, publishing it and taking a hold happen under one
+    process-shared lock, so a writer and a reader can never both decide they
+    own a slot. Frame data is copied outside the lock. Other processes get
+    the ring (and its lock) as a Process argument, which attaches on arrival.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool, lock):
+        self.shm = shm
+        self.owner = owner
+        self.lock = lock
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        if bytes(self.header['magic']) != MAGIC:
+            raise ValueError(f"Not a shared frame ring: {shm.name}")
+
+        self.slots = int(self.header['slots'])
+        self.max_readers = int(self.header['max_readers'])
+        self.shape = tuple(int(v) for v in self.header['shape'])
+        slot_offset, reader_offset, frame_offset, _ = _layout(self.slots, self.max_readers, self.shape)
+
+        self.slot_table = np.ndarray((self.slots,), SLOT_DTYPE, buffer=shm.buf, offset=slot_offset)
+        self.reader_table = np.ndarray((self.max_readers,), READER_DTYPE, buffer=shm.buf,
+                                       offset=reader_offset)
+        self.frames = np.ndarray((self.slots,) + self.shape, np.uint8, buffer=shm.buf, offset=frame_offset)
+        self._next_slot = 0
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], slots: int = 4, max_readers: int = 2,
+               name: Optional[str] = None, lock=None) -> 'SharedFrameRing':
+        """
+        Allocate a new ring (the creating process unlinks it on close)
+
+        Args:
+            shape: Frame shape, (height, width) or (height, width, channels)
+            slots: Frame slots; at least max_readers + 2
+            max_readers: Reader indices that can hold a frame at once
+            name: Shared memory name (random if omitted)
+            lock: multiprocessing Lock guarding slot ownership (default: a new one)
+        """
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+        if slots < max_readers + 2:
+            raise ValueError(f"Need at least {max_readers + 2} slots for {max_readers} readers")
+
+        size = _layout(slots, max_readers, shape)[-1]
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header[()] = (MAGIC, slots, max_readers, shape, 0, 0, 0)
+        if lock is None:
+            lock = mproc.get_context("spawn").Lock()
+        ring = cls(shm, owner=True, lock=lock)
+        ring.slot_table[:] = (0, 0.0)
+        ring.reader_table[:] = (0, 0)
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, lock) -> 'SharedFrameRing':
+        """
+        Open a ring created by another process
+
+        Args:
+            name: Shared memory name of the ring
+            lock: The lock the ring was created with
+        """
+        if sys.version_info >= (3, 13):
+            # Only the creator should unlink the block
+            return cls(shared_memory.SharedMemory(name=name, track=False), owner=False, lock=lock)
+        return cls(shared_memory.SharedMemory(name=name), owner=False, lock=lock)
+
+    def __reduce__(self):
+        # Sent to a child process: attach there with the same lock
+        return SharedFrameRing.attach, (self.name, self.lock)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.header['closed'])
+
+    @property
+    def head(self) -> int:
+        return int(self.header['head'])
+
+    # Writer side (one process)
+
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """
+        Claim a free slot for the next frame
+
+        Returns:
+            (slot index, writable frame view), e.g. for cap.read(view)
+        """
+        with self.lock:
+            for _ in range(self.slots):
+                slot = self._next_slot
+                self._next_slot = (self._next_slot + 1) % self.slots
+                old_seq = int(self.slot_table['seq'][slot])
+                if old_seq and old_seq in self.reader_table['hold']:
+                    continue
+
+                # Unpublish the slot so no reader can take it while it is written
+                self.slot_table['seq'][slot] = 0
+                if old_seq > self.reader_table['taken'].max():
+                    self.header['dropped'] += 1
+                return slot, self.frames[slot]
+        raise RuntimeError("Every slot is held by a reader")
+
+    def commit(self, slot: int, timestamp: Optional[float] = None) -> int:
+        """Publish a slot filled after begin_write; returns its sequence number"""
+        with self.lock:
+            seq = self.head + 1
+            self.slot_table['timestamp'][slot] = time.time() if timestamp is None else timestamp
+            self.slot_table['seq'][slot] = seq
+            self.header['head'] = seq
+        return seq
+
+    def put(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy a frame into the next free slot and publish it"""
+        slot, view = self.begin_write()
+        view[...] = frame.reshape(self.shape)
+        return self.commit(slot, timestamp)
+
+    def close(self):
+        """
+        Release this process's mapping; the owner also marks the ring closed
+        and unlinks it. Frame views handed out by readers must be dropped first.
+        """
+        if self.owner:
+            self.header['closed'] = 1
+        self.header = self.slot_table = self.reader_table = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def mark_closed(self):
+        """Tell readers no more frames will arrive"""
+        self.header['closed'] = 1
+
+    def reader(self, index: int) -> 'FrameReader':
+        """Reader bound to one of the max_readers hold entries"""
+        if not 0 <= index < self.max_readers:
+            raise ValueError(f"Reader index must be in [0, {self.max_readers})")
+        return FrameReader(self, index)
+
+    def stats(self) -> dict:
+        return {'captured': self.head, 'dropped': int(self.header['dropped'])}
+
+
+class FrameReader:
+    """Takes the newest frame from a SharedFrameRing without copying it"""
+
+    def __init__(self, ring: SharedFrameRing, index: int):
+        self.ring = ring
+        self.index = index
+        self.last_seq = 0
+        self.processed = 0
+
+    def get_latest(self, timeout: Optional[float] = None,
+                   poll_interval: float = 0.001) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Hold the newest unseen frame (releasing the previous one)
+
+        Args:
+            timeout: Seconds to wait for a new frame (None = wait forever)
+            poll_interval: Sleep between checks of the head sequence
+
+        Returns:
+            (read-only frame view, capture timestamp, sequence number), or None
+            on timeout or when the ring is closed
+        """
+        ring = self.ring
+        deadline = None if timeout is None else time.time() + timeout
+        self.release()
+
+        while True:
+            if ring.head > self.last_seq:
+                # The newest slot, unless the writer already reclaimed it
+                with ring.lock:
+                    seq = ring.head
+                    found = np.flatnonzero(ring.slot_table['seq'] == seq)
+                    if len(found):
+                        slot = int(found[0])
+                        ring.reader_table['hold'][self.index] = seq
+                        ring.reader_table['taken'][self.index] = seq
+                        timestamp = float(ring.slot_table['timestamp'][slot])
+                if len(found):
+                    self.last_seq = seq
+                    self.processed += 1
+                    view = ring.frames[slot].view()
+                    view.flags.writeable = False
+                    if view.shape[2] == 1:
+                        view = view[:, :, 0]
+                    return view, timestamp, seq
+                continue
+            if ring.closed or (deadline is not None and time.time() >= deadline):
+                return None
+            time.sleep(poll_interval)
+
+    def release(self):
+        """Let the writer reuse the held slot"""
+        if self.ring.reader_table is not None:
+            self.ring.reader_table['hold'][self.index] = 0
+
+
+def _capture_worker(ring: SharedFrameRing, source: Union[int, str],
+                    resolution: Optional[Tuple[int, int]], stop):
+    """Capture process: decode frames straight into shared slots"""
+    cap = cv2.VideoCapture(source)
+    if resolution is not None:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+    try:
+        while not stop.is_set():
+            slot, view = ring.begin_write()
+            ret, frame = cap.read(view)
+            if not ret:
+                break
+            if frame is not view and not np.shares_memory(frame, view):
+                # Backend returned its own buffer, e.g. the camera ignored the
+                # requested resolution: copy or resize it into the slot
+                if frame.shape == view.shape:
+                    view[...] = frame
+                else:
+                    cv2.resize(frame, (view.shape[1], view.shape[0]), dst=view)
+            ring.commit(slot)
+    finally:
+        cap.release()
+        ring.mark_closed()
+        ring.close()
+
+
+def start_capture_process(source: Union[int, str], frame_shape: Tuple[int, int, int],
+                          slots: int = 4, max_readers: int = 2):
+    """
+    Start a capture process feeding a new shared ring
+
+    Args:
+        source: Camera index or video path
+        frame_shape: (height, width, channels) of the decoded frames
+        slots: Frame slots in the ring
+        max_readers: Reader indices available to consumers
+
+    Returns:
+        (ring, process, stop event); set the event, join, then ring.close()
+    """
+    ring = SharedFrameRing.create(frame_shape, slots=slots, max_readers=max_readers)
+    context = mproc.get_context("spawn")
+    stop = context.Event()
+    resolution = (frame_shape[1], frame_shape[0]) if isinstance(source, int) else None
+    process = context.Process(target=_capture_worker, args=(ring, source, resolution, stop),
+                              name="SharedCapture", daemon=True)
+    process.start()
+    return ring, process, stop
@@ -0,0 +1,212 @@
+"""
+Skin Segmentation Engine
+Finds hand-sized skin regions on a downscaled frame and refines them at full resolution
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Fixed HSV skin range used until a session histogram is learned
+SKIN_LOWER = (0, 20, 70)
+SKIN_UPPER = (20, 255, 255)
+
+# Hue/saturation histogram bins and ranges for back-projection
+HIST_BINS = [30, 32]
+HIST_RANGES = [0, 180, 0, 256]
+
+
+def top_k_contours(contours: Sequence[np.ndarray], k: int,
+                   min_area: float = 0.0) -> List[Tuple[np.ndarray, float]]:
+    """
+    The k largest contours without sorting all of them
+
+    Areas are computed once and partitioned in linear time; only the k
+    survivors are sorted.
+
+    Args:
+        contours: Contours from cv2.findContours
+        k: Number of contours to keep
+        min_area: Drop contours smaller than this
+
+    Returns:
+        (contour, area) pairs, largest first
+    """
+    if not contours or k <= 0:
+        return []
+    areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+    keep = np.flatnonzero(areas >= min_area)
+    if len(keep) > k:
+        keep = keep[np.argpartition(-areas[keep], k - 1)[:k]]
+    keep = keep[np.argsort(-areas[keep], kind='stable')]
+    return [(contours[i], float(areas[i])) for i in keep]
+
+
+class SkinSegmenter:
+    """
+    Two-scale skin segmentation with a per-session color model
+
+    Each frame is shrunk once (bilinear, one pyramid level of `scale`) and
+    the whole-frame work, meaning color conversion, masking, morphology and
+    contour search, runs on that small image. Only the few surviving
+    candidates are re-segmented at full resolution, inside their own padded
+    boxes. Until it has seen enough skin
+    the mask comes from a fixed HSV range; after that a hue/saturation
+    histogram learned from the detected hands is back-projected instead, so
+    the model adapts to the user's skin and lighting.
+    """
+
+    def __init__(self, scale: float = 0.25, max_regions: int = 2, min_area: float = 500,
+                 lower: Tuple[int, int, int] = SKIN_LOWER, upper: Tuple[int, int, int] = SKIN_UPPER,
+                 learning_rate: float = 0.05, warmup_frames: int = 10,
+                 backproject_threshold: int = 40, refine_padding: float = 0.1):
+        """
+        Initialize segmenter
+
+        Args:
+            scale: Size of the search image relative to the frame
+            max_regions: Regions returned per frame
+            min_area: Minimum region area in full-resolution pixels
+            lower: Lower HSV bound of the fixed skin range
+            upper: Upper HSV bound of the fixed skin range
+            learning_rate: Weight of each frame in the running skin histogram (0 = never learn)
+            warmup_frames: Frames with skin needed before the histogram is used
+            backproject_threshold: Back-projection level (0-255) counted as skin
+            refine_padding: Refinement box padding as a fraction of the region size
+        """
+        self.scale = min(1.0, max(scale, 0.05))
+        self.max_regions = max_regions
+        self.min_area = min_area
+        self.lower = np.array(lower, dtype=np.uint8)
+        self.upper = np.array(upper, dtype=np.uint8)
+        self.learning_rate = learning_rate
+        self.warmup_frames = warmup_frames
+        self.backproject_threshold = backproject_threshold
+        self.refine_padding = refine_padding
+
+        self._small_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._small_buf: Optional[np.ndarray] = None
+        self._hsv_buf: Optional[np.ndarray] = None
+        self.reset()
+
+    def reset(self):
+        """Forget the learned skin histogram"""
+        self._hist: Optional[np.ndarray] = None
+        self._lut: Optional[np.ndarray] = None
+        self.frames_learned = 0
+
+    @property
+    def calibrated(self) -> bool:
+        """Whether masks come from the learned histogram"""
+        return self._lut is not None and self.frames_learned >= self.warmup_frames
+
+    def _skin_mask(self, hsv: np.ndarray) -> np.ndarray:
+        """Binary skin mask of an HSV image"""
+        if not self.calibrated:
+            return cv2.inRange(hsv, self.lower, self.upper)
+        prob = cv2.calcBackProject([hsv], [0, 1], self._lut, HIST_RANGES, 1)
+        return cv2.threshold(prob, self.backproject_threshold - 1, 255, cv2.THRESH_BINARY)[1]
+
+    def _learn(self, hsv: np.ndarray, mask: np.ndarray, force: bool = False):
+        """Blend this mask's hue/saturation histogram into the session model"""
+        if self.learning_rate <= 0 and not force:
+            return
+        hist = cv2.calcHist([hsv], [0, 1], mask, HIST_BINS, HIST_RANGES)
+        total = float(hist.sum())
+        if total <= 0:
+            return
+        hist /= total
+        if self._hist is None or force:
+            self._hist = hist
+        else:
+            self._hist = (1.0 - self.learning_rate) * self._hist + self.learning_rate * hist
+        self._lut = cv2.normalize(self._hist, None, 0, 255, cv2.NORM_MINMAX)
+        self.frames_learned = max(self.frames_learned + 1, self.warmup_frames if force else 0)
+
+    def calibrate(self, frame: np.ndarray, region: Tuple[int, int, int, int]):
+        """
+        Learn the skin histogram from a region known to be skin, e.g. a palm held in a box
+
+        Args:
+            frame: BGR frame
+            region: (x1, y1, x2, y2) in frame pixels
+        """
+        x1, y1, x2, y2 = region
+        hsv = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+        self._learn(hsv, None, force=True)
+
+    def _shrink(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled HSV copy of the frame in reused buffers"""
+        h, w = frame.shape[:2]
+        size = (max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+        shape = (size[1], size[0], 3)
+        if self._small_buf is None or self._small_buf.shape != shape:
+            self._small_buf = np.empty(shape, dtype=np.uint8)
+            self._hsv_buf = np.empty(shape, dtype=np.uint8)
+        cv2.resize(frame, size, dst=self._small_buf, interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(self._small_buf, cv2.COLOR_BGR2HSV, dst=self._hsv_buf)
+
+    def _refine(self, frame: np.ndarray, contour: np.ndarray) -> np.ndarray:
+        """Full-resolution contour for a region found on the small image"""
+        h, w = frame.shape[:2]
+        x, y, bw, bh = cv2.boundingRect(contour)
+        pad_x = int(bw * self.refine_padding) + 1
+        pad_y = int(bh * self.refine_padding) + 1
+        x1 = max(0, int((x - pad_x) / self.scale))
+        y1 = max(0, int((y - pad_y) / self.scale))
+        x2 = min(w, int((x + bw + pad_x) / self.scale))
+        y2 = min(h, int((y + bh + pad_y) / self.scale))
+
+        scaled = (contour.astype(np.float32) / self.scale).astype(np.int32)
+        if x2 <= x1 or y2 <= y1:
+            return scaled
+
+        hsv = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+        mask = self._skin_mask(hsv)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(x1, y1))
+        if not contours:
+            return scaled
+
+        # Neighbouring hands can share a box: keep the contour around this
+        # region's center, or else the largest one
+        M = cv2.moments(scaled)
+        if M["m00"] > 0:
+            center = (M["m10"] / M["m00"], M["m01"] / M["m00"])
+            inside = [c for c in contours if cv2.pointPolygonTest(c, center, False) >= 0]
+            if inside:
+                contours = inside
+        best = top_k_contours(contours, 1)[0]
+        return best[0] if best[1] >= self.min_area else scaled
+
+    def segment(self, frame: np.ndarray) -> List[np.ndarray]:
+        """
+        Hand-sized skin regions in a frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            Full-resolution contours, largest first (at most max_regions)
+        """
+        hsv = self._shrink(frame)
+        mask = self._skin_mask(hsv)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._small_kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._small_kernel)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        candidates = top_k_contours(contours, self.max_regions, self.min_area * self.scale ** 2)
+
+        if candidates and self.learning_rate > 0:
+            # Learn only from the chosen regions and within the fixed range,
+            # so the model cannot drift onto the background
+            regions = np.zeros_like(mask)
+            cv2.drawContours(regions, [c for c, _ in candidates], -1, 255, cv2.FILLED)
+            cv2.bitwise_and(regions, cv2.inRange(hsv, self.lower, self.upper), dst=regions)
+            self._learn(hsv, regions)
+
+        return [self._refine(frame, contour) for contour, _ in candidates]
@@ -0,0 +1,96 @@
+"""
+Hand Record Streaming
+Serializes per-frame hand data as newline-delimited JSON or binary landmark chunks
+"""
+
+import json
+import sys
+import time
+from typing import BinaryIO, Dict, List, Optional, TextIO, Tuple, Union
+
+from landmark_recording import LandmarkRecorder
+
+STREAM_FORMATS = ('ndjson', 'binary')
+
+
+def hand_record(hand: Dict, precision: int = 4) -> Dict:
+    """JSON-serializable summary of one hand dict"""
+    record = {
+        'id': hand['id'],
+        'handedness': hand['handedness'],
+        'confidence': round(float(hand['confidence']), 3),
+        'center': list(hand['center']),
+        'bbox': list(hand['bbox']),
+        'gesture': hand['gesture']['name'],
+        'gesture_confidence': hand['gesture']['confidence'],
+    }
+    if hand.get('motion'):
+        record['motion'] = hand['motion']['gesture']
+    if 'landmarks' in hand:
+        record['landmarks'] = [[round(v, precision) for v in point] for point in hand['landmarks']]
+    return record
+
+
+def frame_record(frame_index: int, hands_data: List[Dict],
+                 timestamp: Optional[float] = None, **extra) -> Dict:
+    """JSON-serializable record of one frame"""
+    record = {
+        'frame': frame_index,
+        'timestamp': time.time() if timestamp is None else timestamp,
+        'hands': [hand_record(hand) for hand in hands_data],
+    }
+    record.update(extra)
+    return record
+
+
+class HandStreamWriter:
+    """Writes one record per processed frame to a file or stdout"""
+
+    def __init__(self, target: str = '-', fmt: str = 'ndjson',
+                 frame_size: Tuple[int, int] = (1280, 720), chunk_frames: int = 1):
+        """
+        Initialize stream writer
+
+        Args:
+            target: File path, or '-' for stdout
+            fmt: 'ndjson' or 'binary' (landmark recording chunks)
+            frame_size: (width, height) stored in the binary header
+            chunk_frames: Frames per binary chunk (1 = flush every frame)
+        """
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format: {fmt}")
+        self.fmt = fmt
+        self.frames_written = 0
+        self._owns_file = target != '-'
+
+        if fmt == 'ndjson':
+            self.file: Union[TextIO, BinaryIO] = open(target, 'w') if self._owns_file else sys.stdout
+            self.recorder = None
+        else:
+            self.file = open(target, 'wb') if self._owns_file else sys.stdout.buffer
+            self.recorder = LandmarkRecorder(self.file, frame_size, chunk_frames=chunk_frames)
+
+    def write(self, frame_index: int, hands_data: List[Dict], timestamp: Optional[float] = None):
+        """Write one frame's hands"""
+        if self.recorder is not None:
+            self.recorder.record(hands_data, timestamp)
+            self.frames_written += 1
+        else:
+            self.write_record(frame_record(frame_index, hands_data, timestamp))
+
+    def write_record(self, record: Dict):
+        """Write one prebuilt frame record (ndjson only)"""
+        if self.recorder is not None:
+            raise ValueError("Prebuilt records need the ndjson format")
+        self.file.write(json.dumps(record, separators=(',', ':')))
+        self.file.write('\n')
+        self.file.flush()
+        self.frames_written += 1
+
+    def close(self):
+        """Flush pending data and close owned files"""
+        if self.recorder is not None:
+            self.recorder.close()
+        self.file.flush()
+        if self._owns_file:
+            self.file.close()
@@ -0,0 +1,256 @@
+"""
+Temporal Gesture Recognition
+Streaming subsequence DTW over per-track motion rings (swipes, circles)
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Wrist -> middle finger MCP length is the hand-size unit for speeds
+WRIST = 0
+MIDDLE_MCP = 9
+PALM = [0, 5, 9, 13, 17]
+PALM_WEIGHTS = np.zeros(21)
+PALM_WEIGHTS[PALM] = 1.0 / len(PALM)
+ZERO_SAMPLE = np.zeros(2)
+
+
+def swipe_template(dx: float, dy: float, steps: int = 6) -> np.ndarray:
+    """Constant-direction motion template, (1, steps, 2) unit vectors"""
+    direction = np.array([dx, dy], dtype=np.float32)
+    return np.tile(direction / np.linalg.norm(direction), (1, steps, 1))
+
+
+def circle_template(clockwise: bool = True, steps: int = 16, phases: int = 8) -> np.ndarray:
+    """
+    Full turn of motion directions (screen coordinates, y down)
+
+    Returns:
+        (phases, steps, 2) variants starting at evenly spaced headings, so a
+        circle can begin anywhere on its turn
+    """
+    angles = np.linspace(0, 2 * np.pi, steps, endpoint=False)
+    angles = angles[None] + np.linspace(0, 2 * np.pi, phases, endpoint=False)[:, None]
+    if not clockwise:
+        angles = -angles
+    return np.stack([np.cos(angles), np.sin(angles)], axis=-1).astype(np.float32)
+
+
+DEFAULT_TEMPLATES = {
+    'Swipe Left': swipe_template(-1, 0),
+    'Swipe Right': swipe_template(1, 0),
+    'Swipe Up': swipe_template(0, -1),
+    'Swipe Down': swipe_template(0, 1),
+    'Circle CW': circle_template(clockwise=True),
+    'Circle CCW': circle_template(clockwise=False),
+}
+
+
+class TemporalGestureEngine:
+    """
+    Matches each hand's recent motion against templates with streaming DTW
+
+    Every frame adds one motion sample (the palm's direction of travel, or
+    zero while the hand is slow). Each template keeps one DTW cost column
+    per hand that is advanced by that sample alone (SPRING-style subsequence
+    matching), so the per-frame cost depends only on the template lengths,
+    never on how long the hand has been tracked.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, np.ndarray]] = None,
+                 threshold: float = 0.35, min_speed: float = 3.0, smoothing: float = 0.5,
+                 max_duration: float = 1.5, ring_size: int = 64):
+        """
+        Initialize engine
+
+        Args:
+            templates: Name -> (steps, 2) or (variants, steps, 2) unit
+                direction sequences (default: swipes and circles)
+            threshold: Largest mean per-step cost accepted as a match
+            min_speed: Palm speed (hand lengths per second) below which the
+                hand counts as still
+            smoothing: Velocity low-pass factor per frame (1 = no smoothing)
+            max_duration: Longest match in seconds
+            ring_size: Palm positions kept per hand (normalized image coordinates)
+        """
+        self.templates = dict(DEFAULT_TEMPLATES if templates is None else templates)
+        self.threshold = threshold
+        self.min_speed = min_speed
+        self.max_duration = max_duration
+        self.smoothing = smoothing
+        self.ring_size = ring_size
+        self._compile()
+
+    def _compile(self):
+        """Stack template variants right-aligned to one length; each enters at its own column"""
+        variants = [(name, np.asarray(v, dtype=np.float64))
+                    for name, template in self.templates.items()
+                    for v in np.reshape(template, (-1,) + np.shape(template)[-2:])]
+        self._version = getattr(self, '_version', 0) + 1
+        self.names = [name for name, _ in variants]
+        self.lengths = np.array([len(v) for _, v in variants], dtype=np.float64)
+        steps = int(self.lengths.max()) if variants else 0
+        self._queries = np.zeros((len(variants), steps, 2), dtype=np.float64)
+        # Cost column 0 is "before the first step"; column i has matched step i
+        self._active_cells = np.zeros((len(variants), steps + 1), dtype=bool)
+        self._entries = np.zeros((len(variants), steps + 1), dtype=bool)
+        for k, (_, directions) in enumerate(variants):
+            offset = steps - len(directions)
+            self._queries[k, offset:] = directions
+            self._active_cells[k, offset:] = True
+            self._entries[k, offset] = True
+        self._progress = np.arange(steps + 1) - (steps - self.lengths)[:, None]
+        
+        # Constants of the per-frame update, so _step works in preallocated buffers
+        self._inactive = ~self._active_cells
+        # Flat index into the previous start array of cell (k, j + 1) reached by
+        # staying (choice 0); advancing and skipping subtract 1 and 2
+        self._start_index = (np.arange(len(variants))[:, None] * (steps + 1)
+                             + np.arange(1, steps + 1)[None])
+
+    def add_template(self, name: str, directions: np.ndarray):
+        """
+        Register a motion template; running matches restart
+
+        Args:
+            name: Gesture name reported on a match
+            directions: (steps, 2) unit motion directions, or
+                (variants, steps, 2) alternatives reported under one name
+        """
+        self.templates[name] = np.asarray(directions, dtype=np.float32)
+        self._compile()
+
+    def _new_state(self) -> Dict:
+        count, steps = self._queries.shape[:2]
+        return {
+            'cost': np.full((count, steps + 1), np.inf),
+            'start': np.zeros((count, steps + 1)),
+            # Scratch buffers reused every frame (cost/start are double-buffered)
+            'next_cost': np.empty((count, steps + 1)),
+            'next_start': np.empty((count, steps + 1)),
+            'previous': np.empty((3, count, steps)),
+            'offsets': np.empty((count, steps, 2)),
+            'distance': np.empty((count, steps)),
+            'choice': np.empty((count, steps), dtype=np.intp),
+            'ring': deque(maxlen=self.ring_size),
+            'velocity': np.zeros(2),
+            'last': None,
+            'candidate': None,
+            'matched_at': float('-inf'),
+            'version': self._version,
+        }
+
+    def update(self, state: Dict, landmarks: np.ndarray, timestamp: float) -> Dict:
+        """
+        Advance one hand by one frame
+
+        Args:
+            state: Per-hand dict owned by the caller (e.g. a track's state);
+                filled in on first use
+            landmarks: (21, 3) normalized landmarks of the hand
+            timestamp: Frame time in seconds
+
+        Returns:
+            {'gesture': matched template name or None, 'score': mean step cost,
+             'velocity': (vx, vy) smoothed palm velocity in hand lengths per second}
+        """
+        motion = state.get('motion')
+        if motion is None or motion['version'] != self._version:
+            motion = state['motion'] = self._new_state()
+
+        xy = landmarks[:, :2]
+        palm = PALM_WEIGHTS @ xy
+        scale = max(math.hypot(*(xy[MIDDLE_MCP] - xy[WRIST]).tolist()), 1e-6)
+        motion['ring'].append((timestamp, float(palm[0]), float(palm[1])))
+
+        last = motion['last']
+        motion['last'] = (timestamp, palm)
+        if last is None or timestamp <= last[0]:
+            return {'gesture': None, 'score': float('inf'), 'velocity': tuple(motion['velocity'].tolist())}
+
+        velocity = (palm - last[1]) / (scale * (timestamp - last[0]))
+        motion['velocity'] += self.smoothing * (velocity - motion['velocity'])
+        speed = math.hypot(*motion['velocity'].tolist())
+        sample = motion['velocity'] / speed if speed >= self.min_speed else ZERO_SAMPLE
+
+        gesture, score = self._step(motion, sample, timestamp)
+        return {'gesture': gesture, 'score': score, 'velocity': tuple(motion['velocity'].tolist())}
+
+    def _step(self, motion: Dict, sample: np.ndarray, timestamp: float) -> Tuple[Optional[str], float]:
+        """One streaming DTW column update for every template"""
+        if not self.names:
+            return None, float('inf')
+        cost, start = motion['cost'], motion['start']
+        new_cost, new_start = motion['next_cost'], motion['next_start']
+        previous, distance, choice = motion['previous'], motion['distance'], motion['choice']
+        offsets = motion['offsets']
+
+        # Distance of every template step to the sample
+        np.subtract(self._queries, sample, out=offsets)
+        np.square(offsets, out=offsets)
+        np.add.reduce(offsets, axis=-1, out=distance)
+        np.sqrt(distance, out=distance)
+
+        # Each sample either stays on a template step, advances one, or skips
+        # one (up to 2x faster than the template; the skipped step is matched
+        # against the same sample). Reading only the previous column keeps the
+        # update one vectorized pass over all templates
+        previous[0] = cost[:, 1:]
+        previous[1] = cost[:, :-1]
+        previous[2, :, 0] = np.inf
+        np.add(cost[:, :-2], distance[:, :-1], out=previous[2, :, 1:])
+        previous.argmin(axis=0, out=choice)
+
+        np.min(previous, axis=0, out=new_cost[:, 1:])
+        new_cost[:, 1:] += distance
+        np.subtract(self._start_index, choice, out=choice)
+        new_start[:, 1:] = start.reshape(-1)[choice]
+
+        # A match can begin at any frame at the template's first step
+        np.copyto(new_cost, np.inf, where=self._inactive)
+        np.copyto(new_cost, 0.0, where=self._entries)
+        np.copyto(new_start, timestamp, where=self._entries)
+        motion['cost'], motion['next_cost'] = new_cost, cost
+        motion['start'], motion['next_start'] = new_start, start
+
+        scores = new_cost[:, -1] / self.lengths
+        valid = (scores < self.threshold) & (timestamp - new_start[:, -1] <= self.max_duration)
+        valid &= new_start[:, -1] > motion['matched_at']
+
+        # Keep the longest (then cheapest) match as the candidate
+        candidate = motion['candidate']
+        for k in np.flatnonzero(valid):
+            rank = (-self.lengths[k], scores[k])
+            if candidate is None or rank < candidate['rank']:
+                candidate = {'index': int(k), 'rank': rank, 'score': float(scores[k]),
+                             'end': timestamp}
+        motion['candidate'] = candidate
+        if candidate is None:
+            return None, float(scores.min())
+
+        # Like SPRING, hold the candidate while the hand keeps moving along a
+        # cheap partial path that could still replace it: a longer template,
+        # or an equally long one heading for a lower cost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = new_cost[:, 1:-1] / self._progress[:, 1:-1]
+        length = -candidate['rank'][0]
+        bound = np.where(self.lengths > length, self.threshold,
+                         np.where(self.lengths == length, candidate['score'], -np.inf))
+        live = ((self._progress[:, 1:-1] >= 2) & (partial < bound[:, None])
+                & (new_start[:, 1:-1] <= candidate['end']))
+        moving = bool(sample.any())
+        if moving and live.any() and timestamp - candidate['end'] <= self.max_duration:
+            return None, float(scores.min())
+
+        # Report once; only motion starting after this frame can match again
+        motion['candidate'] = None
+        motion['matched_at'] = timestamp
+        return self.names[candidate['index']], candidate['score']
+
+    def trajectory(self, state: Dict) -> List[Tuple[float, float, float]]:
+        """Recent (timestamp, x, y) normalized palm positions of a hand, oldest first"""
+        motion = state.get('motion')
+        return list(motion['ring']) if motion is not None else []
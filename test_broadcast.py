@@ -0,0 +1,100 @@
+"""
+Landmark Broadcast Tests
+Packets round-trip through the codec, and a lost frame recovers at the next keyframe
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from landmark_broadcast import (ABSOLUTE, DELTA8, DELTA16, HAND_HEADER, HEADER, SCALE,
+                                PacketDecoder, PacketEncoder)
+
+rng = np.random.default_rng(0)
+BASE = rng.uniform(0.2, 0.8, (2, 21, 3)).astype(np.float32)
+
+
+def hands_at(step: float, ids=(4, 9), gesture: str = 'Fist') -> list:
+    """Two hand dicts drifting by `step` per frame"""
+    return [{
+        'id': track_id,
+        'handedness': ['Left', 'Right'][i],
+        'confidence': 0.9,
+        'gesture': {'name': gesture},
+        'motion': {'gesture': 'Swipe Left'} if i else None,
+        'landmarks': [tuple(p) for p in (BASE[i] + step).tolist()],
+    } for i, track_id in enumerate(ids)]
+
+
+def encodings(packet: bytes) -> list:
+    """Landmark encoding of each hand in a packet"""
+    count = HEADER.unpack_from(packet, 0)[-1]
+    offset, result = HEADER.size, []
+    for _ in range(count):
+        encoding = HAND_HEADER.unpack_from(packet, offset)[-1]
+        offset += HAND_HEADER.size + 63 * (1 if encoding == DELTA8 else 2)
+        result.append(encoding)
+    return result
+
+
+def assert_decoded(decoded: dict, hands: list):
+    assert [h['id'] for h in decoded['hands']] == [h['id'] for h in hands]
+    for got, sent in zip(decoded['hands'], hands):
+        assert np.abs(got['landmarks'] - np.array(sent['landmarks'])).max() <= 0.5 / SCALE + 1e-7
+        assert got['handedness'] == sent['handedness']
+        assert got['gesture'] == sent['gesture']['name']
+        assert abs(got['confidence'] - 0.9) < 1 / 255
+
+
+def test_round_trip_uses_smallest_delta():
+    encoder, decoder = PacketEncoder(), PacketDecoder()
+    # Frame-to-frame moves of ~8, ~8 and ~390 quantization steps
+    steps = [0.0, 0.001, 0.002, 0.05]
+    expected = [[ABSOLUTE] * 2, [DELTA8] * 2, [DELTA8] * 2, [DELTA16] * 2]
+    for frame, (step, kinds) in enumerate(zip(steps, expected)):
+        hands = hands_at(step)
+        delta, key = encoder.encode(hands, frame, frame / 30)
+        assert encodings(delta) == kinds and encodings(key) == [ABSOLUTE] * 2
+        decoded = decoder.decode(delta)
+        assert decoded['frame'] == frame and not decoded['keyframe']
+        assert decoded['millis'] == int(frame / 30 * 1000)
+        assert_decoded(decoded, hands)
+    assert decoded['hands'][1]['motion'] == 'Swipe Left' and decoded['hands'][0]['motion'] == ''
+
+
+def test_frame_gap_recovers_at_keyframe():
+    encoder, decoder = PacketEncoder(), PacketDecoder()
+    packets = [encoder.encode(hands_at(0.001 * i), i, i / 30) for i in range(6)]
+
+    for i in (0, 1):
+        assert_decoded(decoder.decode(packets[i][0]), hands_at(0.001 * i))
+    # Frame 2 is lost: the delta for frame 3 has no base and its hands are dropped
+    assert decoder.decode(packets[3][0])['hands'] == []
+    # The keyframe for frame 4 restores every hand, and deltas work again after it
+    recovered = decoder.decode(packets[4][1])
+    assert recovered['keyframe']
+    assert_decoded(recovered, hands_at(0.004))
+    assert_decoded(decoder.decode(packets[5][0]), hands_at(0.005))
+
+
+def test_encoder_gap_and_new_tracks_send_absolute():
+    encoder, decoder = PacketEncoder(), PacketDecoder()
+    decoder.decode(encoder.encode(hands_at(0.0), 0, 0.0)[0])
+    # The encoder skips frame 1: its next delta packet must stand alone
+    delta, _ = encoder.encode(hands_at(0.002), 2, 2 / 30)
+    assert encodings(delta) == [ABSOLUTE] * 2
+    assert_decoded(decoder.decode(delta), hands_at(0.002))
+
+    # A new track ID in a consecutive frame is absolute; the old one stays a delta
+    hands = hands_at(0.003, ids=(4, 11), gesture='Waving')
+    delta, _ = encoder.encode(hands, 3, 3 / 30)
+    assert encodings(delta) == [DELTA8, ABSOLUTE]
+    decoded = decoder.decode(delta)
+    assert [h['gesture'] for h in decoded['hands']] == ['Other', 'Other']
+    assert [h['id'] for h in decoded['hands']] == [4, 11]
+
+
+def test_rejects_foreign_packets():
+    with pytest.raises(ValueError):
+        PacketDecoder().decode(struct.pack('<2sBBIIB', b'XX', 1, 0, 0, 0, 0))
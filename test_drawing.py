@@ -0,0 +1,88 @@
+"""
+Virtual Drawing Tests
+Undo restores exactly the pixels a stroke changed, across tile boundaries
+"""
+
+import cv2
+import numpy as np
+
+from gesture_controller import VirtualDrawing
+
+# Canvas size not a multiple of the tile size, so edge tiles are partial
+SHAPE = (200, 300)
+TILE = 64
+
+STROKES = [
+    ((10, 10), [(60, 70), (130, 75), (250, 190)]),   # Crosses several tiles
+    ((290, 5), [(299, 199), (200, 199)]),            # Along the partial edge tiles
+    ((40, 80), [(280, 80)]),                         # Over the first two strokes
+]
+
+
+def draw(drawing: VirtualDrawing, start, points, color=(0, 255, 255)):
+    drawing.brush_color = color
+    drawing._stroke = None
+    for point in points:
+        drawing._draw_segment(start, point)
+        start = point
+
+
+def snapshot(drawing: VirtualDrawing):
+    return drawing.canvas.copy(), drawing.ink_mask.copy()
+
+
+def expected_ink_tiles(mask: np.ndarray) -> np.ndarray:
+    rows, cols = -(-mask.shape[0] // TILE), -(-mask.shape[1] // TILE)
+    return np.array([[mask[ty * TILE:(ty + 1) * TILE, tx * TILE:(tx + 1) * TILE].any()
+                      for tx in range(cols)] for ty in range(rows)])
+
+
+def assert_state(drawing: VirtualDrawing, state):
+    canvas, mask = state
+    assert np.array_equal(drawing.canvas, canvas)
+    assert np.array_equal(drawing.ink_mask, mask)
+    # Tiles are marked from segment bounds, so they may over-cover but never miss ink
+    assert not (expected_ink_tiles(mask) & ~drawing.ink_tiles).any()
+
+
+def test_undo_restores_each_stroke_across_tiles():
+    drawing = VirtualDrawing(SHAPE, tile_size=TILE)
+    states = [snapshot(drawing)]
+    for start, points in STROKES:
+        draw(drawing, start, points)
+        states.append(snapshot(drawing))
+    draw(drawing, (0, 100), [(299, 120)], color=(0, 0, 0))  # Eraser across the middle
+    states.append(snapshot(drawing))
+
+    assert len(drawing.strokes) == len(STROKES) + 1
+    for state in reversed(states[:-1]):
+        drawing.undo()
+        assert_state(drawing, state)
+    drawing.undo()  # Nothing left
+    assert_state(drawing, states[0])
+    assert not drawing.ink_tiles.any()
+
+
+def test_undo_mid_stroke_starts_a_new_stroke():
+    drawing = VirtualDrawing(SHAPE, tile_size=TILE)
+    drawing._draw_segment((10, 10), (100, 100))
+    before = snapshot(drawing)
+    drawing._draw_segment((100, 100), (200, 20))
+    drawing.undo()
+    assert_state(drawing, (np.zeros_like(before[0]), np.zeros_like(before[1])))
+
+    drawing._draw_segment((5, 190), (295, 190))
+    drawing.undo()
+    assert not drawing.ink_tiles.any() and not drawing.strokes
+
+
+def test_overlay_only_touches_inked_pixels():
+    drawing = VirtualDrawing(SHAPE, tile_size=TILE)
+    for start, points in STROKES:
+        draw(drawing, start, points)
+    frame = np.random.default_rng(0).integers(0, 255, SHAPE + (3,), dtype=np.uint8)
+
+    expected = frame.copy()
+    blended = cv2.addWeighted(frame, 0.7, drawing.canvas, 0.3, 0)
+    cv2.copyTo(blended, drawing.ink_mask, expected)
+    assert np.array_equal(drawing.overlay(frame.copy()), expected)
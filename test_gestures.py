@@ -0,0 +1,101 @@
+"""
+Gesture Registry Tests
+The built-in rules agree with the original if/elif gesture chain
+"""
+
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+import gesture_registry
+from gesture_registry import default_gestures
+from landmark_features import HandFeatures
+
+# Open right hand, normalized image coordinates
+OPEN_HAND = np.array([
+    [0.50, 0.80, 0.00],
+    [0.44, 0.76, -0.02], [0.40, 0.70, -0.03], [0.37, 0.65, -0.04], [0.34, 0.61, -0.05],
+    [0.46, 0.62, -0.01], [0.45, 0.54, -0.02], [0.45, 0.49, -0.03], [0.45, 0.45, -0.03],
+    [0.50, 0.61, -0.01], [0.50, 0.52, -0.02], [0.50, 0.47, -0.03], [0.50, 0.42, -0.03],
+    [0.54, 0.62, -0.01], [0.55, 0.54, -0.02], [0.55, 0.49, -0.03], [0.56, 0.45, -0.03],
+    [0.58, 0.64, -0.01], [0.60, 0.58, -0.02], [0.61, 0.54, -0.03], [0.62, 0.51, -0.03],
+], dtype=np.float32)
+
+FINGERS = [[2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 16], [17, 18, 19, 20]]
+
+
+def distance(p1, p2) -> float:
+    return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2)
+
+
+def reference_gesture(landmarks) -> tuple:
+    """The if/elif chain the registry replaced, on one hand's landmark tuples"""
+    curls = [1.0 if min(distance(landmarks[j], landmarks[f[-1]]) for j in f[:-1]) < 0.1 else 0.0
+             for f in FINGERS]
+    thumb_index_dist = distance(landmarks[4], landmarks[8])
+
+    name, confidence = "Unknown", 0.0
+    if sum(curls) < 1.5:
+        name, confidence = "Open Palm", 0.95
+    elif sum(curls) > 4.0:
+        name, confidence = "Fist", 0.95
+    elif curls[0] < 0.5 and sum(curls[1:]) > 3.5:
+        if landmarks[4][1] < landmarks[3][1] < landmarks[2][1]:
+            name, confidence = "Thumbs Up", 0.85
+    elif thumb_index_dist < 0.05 and sum(curls[1:]) < 2.0:
+        name, confidence = "OK Sign", 0.90
+    elif curls[1] < 0.5 and curls[2] < 0.5 and curls[3] > 0.8 and curls[4] > 0.8:
+        name, confidence = "Peace Sign", 0.90
+    else:
+        name, confidence = "Open Palm", 0.5
+    return name, confidence, curls
+
+
+def pose_hands() -> np.ndarray:
+    """Every curl pattern, with the thumb up or down and with or without a pinch"""
+    rng = np.random.default_rng(0)
+    hands = []
+    for curled, thumb_down, pinch in itertools.product(
+            itertools.product([False, True], repeat=5), [False, True], [False, True]):
+        # Spread the joints so an open finger's tip is clear of all of them
+        hand = (OPEN_HAND - OPEN_HAND[0]) * 3 + OPEN_HAND[0]
+        if thumb_down:
+            hand[2:5, 1] = hand[2, 1] + (hand[2, 1] - hand[2:5, 1])
+        for finger, is_curled in zip(FINGERS, curled):
+            if is_curled:
+                hand[finger[1:]] = hand[finger[0]] + 0.01
+        if pinch:
+            # The whole thumb folds onto the index tip, so it also counts as curled
+            hand[2:5] = hand[8] + 0.01
+        hand += rng.normal(0, 0.002, hand.shape).astype(np.float32)
+        hands.append(hand)
+    return np.stack(hands)
+
+
+def check_against_reference(hands: np.ndarray):
+    results = default_gestures().classify(HandFeatures(hands, (640, 480)))
+    names = set()
+    for hand, result in zip(hands, results):
+        name, confidence, curls = reference_gesture(list(map(tuple, hand.tolist())))
+        assert (result['name'], result['confidence'], result['curls']) == (name, confidence, curls)
+        names.add(name)
+    return names
+
+
+def test_default_gestures_match_if_elif_chain():
+    names = check_against_reference(pose_hands())
+    assert names == {"Open Palm", "Fist", "Thumbs Up", "Unknown", "OK Sign", "Peace Sign"}
+
+
+def test_rule_walk_agrees_on_large_frames(monkeypatch):
+    monkeypatch.setattr(gesture_registry, 'SCALAR_MATCH_LIMIT', 1 << 20)
+    check_against_reference(pose_hands())
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_small_frames_match_if_elif_chain(count):
+    hands = pose_hands()
+    for start in range(0, len(hands), count):
+        check_against_reference(hands[start:start + count])
@@ -0,0 +1,70 @@
+"""
+Hand Frame Tests
+HandFrame results keep behaving like the legacy list of hand dicts
+"""
+
+import numpy as np
+
+from gesture_registry import default_gestures
+from hand_frame import HAND_DTYPE, HandFrame
+from landmark_features import TIP_PAIR_NAMES, HandFeatures
+
+rng = np.random.default_rng(0)
+
+
+def make_frame(count: int = 2, buffer=None) -> HandFrame:
+    landmarks = rng.uniform(0.2, 0.8, (count, 21, 3)).astype(np.float32)
+    features = HandFeatures(landmarks, (640, 480))
+    return HandFrame.from_features(features, ['Right', 'Left'][:count], [0.9, 0.8][:count],
+                                   [7, 3][:count], default_gestures(), buffer)
+
+
+def test_hands_read_like_legacy_dicts():
+    frame = make_frame()
+    hand = frame[0]
+    legacy = hand.to_dict()
+
+    assert set(legacy) == set(HandFrame.FIELDS)
+    assert hand['id'] == 7 and frame[1]['handedness'] == 'Left'
+    assert hand['landmarks'][8] == tuple(frame.landmarks[0, 8].tolist())
+    assert hand['landmarks_px'][8] == tuple(hand.landmarks_px[8].tolist())
+    assert hand['center'] == hand.center and len(hand['bbox']) == 4
+    assert set(hand['gesture']) == {'name', 'confidence', 'curls'}
+    assert list(hand['fingertip_distances']) == TIP_PAIR_NAMES
+    assert 'landmarks' in hand and 'motion' not in hand
+    assert hand.get('motion') is None
+    assert [h['id'] for h in frame] == frame.ids == [7, 3]
+    assert frame.to_dicts()[1] == frame[1].to_dict()
+
+
+def test_setting_keys_overrides_and_extends():
+    frame = make_frame()
+    hand = frame[0]
+    hand['center'] = (1, 2)
+    hand['predicted'] = True
+
+    assert hand['center'] == (1, 2)
+    assert hand.to_dict()['center'] == (1, 2)
+    assert hand['predicted'] is True and 'predicted' in hand.keys()
+    assert frame[1]['center'] != (1, 2) and 'predicted' not in frame[1]
+
+
+def test_empty_frame_is_falsy_and_iterable():
+    frame = HandFrame()
+    assert not frame and len(frame) == 0
+    assert list(frame) == [] and frame.to_dicts() == []
+    assert frame.landmarks.shape == (0, 21, 3)
+
+
+def test_frames_on_a_shared_buffer_need_copy_to_outlive_it():
+    buffer = np.zeros(2, dtype=HAND_DTYPE)
+    first = make_frame(2, buffer)
+    kept = first.copy()
+    kept[0]['center'] = (5, 5)
+    landmarks = kept.landmarks.copy()
+
+    second = make_frame(1, buffer)
+    assert np.shares_memory(second.data, buffer) and len(second) == 1
+    assert np.array_equal(kept.landmarks, landmarks)
+    assert kept.ids == [7, 3] and kept[0]['center'] == (5, 5)
+    assert kept.gestures == [g['name'] for g in default_gestures().classify(kept._features)]
@@ -0,0 +1,53 @@
+"""
+Multi-Stream Tests
+A camera worker that dies without reporting is restarted while other streams stay busy
+"""
+
+import json
+import os
+import time
+
+from multi_stream import MultiStreamRunner
+from streaming import frame_record
+
+FLOOD_SECONDS = 3.0
+
+
+def fake_worker(stream_id, source, options, records, stop, ring=None):
+    """Stream 0 crashes on its first run; stream 1 floods the queue for a while"""
+    pid = os.getpid()
+    if source == 'flood':
+        frames, end = 0, time.time() + FLOOD_SECONDS
+        while time.time() < end and not stop.is_set():
+            records.put(('frame', stream_id, pid, frame_record(frames, [], stream=stream_id)))
+            frames += 1
+        records.put(('done', stream_id, pid, {'frames': frames, 'error': None}))
+        return
+
+    marker = options['marker']
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(3)  # No 'done' message: only supervision can notice
+    records.put(('frame', stream_id, pid, frame_record(0, [], stream=stream_id)))
+    records.put(('done', stream_id, pid, {'frames': 1, 'error': None}))
+
+
+class FakeRunner(MultiStreamRunner):
+    worker = staticmethod(fake_worker)
+
+
+def test_crashed_camera_worker_restarts_while_others_are_busy(tmp_path):
+    output = tmp_path / 'hands.ndjson'
+    runner = FakeRunner([0, 'flood'], output=str(output), max_restarts=1, merge_window=0.05)
+    runner.options['marker'] = str(tmp_path / 'crashed')
+    stats = runner.run(duration=30)
+
+    assert stats[0]['restarts'] == 1 and stats[0]['frames'] == 1 and stats[0]['done']
+    assert stats[1]['restarts'] == 0 and stats[1]['frames'] > 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    restarted = [r['timestamp'] for r in records if r['stream'] == 0]
+    flood = [r['timestamp'] for r in records if r['stream'] == 1]
+    assert len(restarted) == 1 and len(flood) == stats[1]['frames']
+    # The restart happened during the flood, not after it drained
+    assert restarted[0] < max(flood) - 1.0
@@ -0,0 +1,43 @@
+"""
+Pose Classifier Tests
+Attached models stay bound to the registry they were attached to
+"""
+
+import numpy as np
+
+from gesture_registry import FEATURES, default_gestures
+from landmark_features import HandFeatures
+from pose_classifier import PoseClassifier
+
+rng = np.random.default_rng(0)
+PROTOTYPES = rng.random((4, 21, 3)).astype(np.float32) * 0.2
+
+
+def sample(pose: int, count: int) -> np.ndarray:
+    """Noisy, shifted copies of a prototype hand"""
+    noise = rng.normal(0, 0.005, (count, 21, 3))
+    offset = np.zeros((count, 1, 3))
+    offset[:, :, :2] = rng.uniform(0.2, 0.6, (count, 1, 2))
+    return (PROTOTYPES[pose] + noise + offset).astype(np.float32)
+
+
+def train(labels, poses) -> PoseClassifier:
+    model = PoseClassifier(labels, hidden=16)
+    data = np.concatenate([sample(p, 100) for p in poses])
+    model.fit(data, np.repeat(labels, 100), epochs=60)
+    return model
+
+
+def test_two_models_on_two_registries():
+    first, second = train(['A', 'B'], [0, 1]), train(['C', 'D'], [2, 3])
+    r1, r2 = default_gestures(), default_gestures()
+    first.attach(r1)
+    second.attach(r2)
+
+    hands = np.concatenate([sample(0, 1), sample(1, 1), sample(2, 1), sample(3, 1)])
+    features = HandFeatures(hands, (640, 480))
+
+    # Both registries classify the same frame and share its feature cache
+    assert [g['name'] for g in r1.classify(features)[:2]] == ['A', 'B']
+    assert [g['name'] for g in r2.classify(features)[2:]] == ['C', 'D']
+    assert 'pose_probs' not in FEATURES
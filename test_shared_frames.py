@@ -0,0 +1,90 @@
+"""
+Shared Frame Ring Tests
+A writer and a reader in separate processes never see a torn or reused slot
+"""
+
+import multiprocessing as mproc
+import time
+
+import numpy as np
+
+from shared_frames import SharedFrameRing
+
+SHAPE = (48, 64, 3)
+FRAMES = 5000
+
+
+def fill_value(index: int) -> int:
+    return index % 251 + 1
+
+
+def write_frames(ring: SharedFrameRing, count: int, ready):
+    """Writer process: frame i is filled with fill_value(i) and stamped with i"""
+    ready.wait(30)
+    frame = np.empty(SHAPE, dtype=np.uint8)
+    for i in range(count):
+        frame[...] = fill_value(i)
+        ring.put(frame, timestamp=float(i))
+    ring.mark_closed()
+    ring.close()
+
+
+def read_frames(ring: SharedFrameRing, results, ready):
+    """Reader process: check every taken frame is whole and stays intact while held"""
+    reader = ring.reader(0)
+    ready.set()
+    taken, bad, last = 0, 0, -1
+    frame = None
+    while True:
+        item = reader.get_latest(timeout=5.0)
+        if item is None:
+            break
+        frame, timestamp, seq = item
+        expected = fill_value(int(timestamp))
+        for _ in range(2):
+            if frame.min() != expected or frame.max() != expected:
+                bad += 1
+            time.sleep(0.0002)  # The writer keeps going; a held slot must not change
+        if timestamp <= last:
+            bad += 1
+        last = timestamp
+        taken += 1
+    frame = None  # Views must be gone before the mapping closes
+    reader.release()
+    ring.close()
+    results.put((taken, bad, last))
+
+
+def test_put_and_get_across_processes():
+    context = mproc.get_context("spawn")
+    ring = SharedFrameRing.create(SHAPE, slots=3, max_readers=1, lock=context.Lock())
+    results = context.Queue()
+    ready = context.Event()
+    reader = context.Process(target=read_frames, args=(ring, results, ready))
+    reader.start()
+    writer = context.Process(target=write_frames, args=(ring, FRAMES, ready))
+    writer.start()
+
+    taken, bad, last = results.get(timeout=60)
+    writer.join(10)
+    reader.join(10)
+    assert writer.exitcode == 0 and reader.exitcode == 0
+    assert bad == 0
+    assert taken > 10 and last == FRAMES - 1
+    assert ring.stats()['captured'] == FRAMES
+    ring.close()
+
+
+def test_writer_skips_held_slots():
+    ring = SharedFrameRing.create((4, 4), slots=3, max_readers=1)
+    try:
+        reader = ring.reader(0)
+        ring.put(np.full((4, 4), 1, np.uint8))
+        frame, _, seq = reader.get_latest(timeout=1.0)
+        for value in range(2, 8):
+            ring.put(np.full((4, 4), value, np.uint8))
+        assert seq == 1 and (frame == 1).all()
+        del frame
+        reader.release()
+    finally:
+        ring.close()
@@ -0,0 +1,64 @@
+"""
+Hand Tracker Tests
+Track IDs stay with their hands and assignments are minimum-cost
+"""
+
+import itertools
+
+import numpy as np
+
+from tracking import HandTracker, linear_assignment
+
+
+def brute_force(cost: np.ndarray) -> float:
+    """Lowest total cost over every assignment of the smaller side"""
+    rows, cols = cost.shape
+    if rows > cols:
+        return brute_force(cost.T)
+    return min(sum(cost[r, c] for r, c in enumerate(p))
+               for p in itertools.permutations(range(cols), rows))
+
+
+def test_assignment_is_optimal():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        rows, cols = rng.integers(1, 6, 2)
+        cost = rng.random((rows, cols))
+        pairs = linear_assignment(cost)
+        assert len(pairs) == min(rows, cols)
+        assert len({r for r, _ in pairs}) == len({c for _, c in pairs}) == len(pairs)
+        assert np.isclose(sum(cost[r, c] for r, c in pairs), brute_force(cost))
+
+
+def test_ids_follow_hands_when_detection_order_swaps():
+    tracker = HandTracker()
+    left, right = np.array([100.0, 200.0]), np.array([500.0, 220.0])
+    sizes = np.array([150.0, 150.0])
+
+    ids = tracker.update(np.array([left, right]), sizes, ['Left', 'Right'], 0.0)
+    assert ids == [0, 1]
+    for step in range(1, 10):
+        offset = np.array([5.0 * step, 0.0])
+        order = [right + offset, left + offset] if step % 2 else [left + offset, right + offset]
+        labels = ['Right', 'Left'] if step % 2 else ['Left', 'Right']
+        ids = tracker.update(np.array(order), sizes, labels, step / 30)
+        assert ids == ([1, 0] if step % 2 else [0, 1])
+
+
+def test_ids_are_per_tracker_and_restart_after_reset():
+    centers, sizes = np.array([[100.0, 100.0]]), np.array([150.0])
+    first, second = HandTracker(), HandTracker()
+    assert first.update(centers, sizes, ['Left'], 0.0) == [0]
+    assert second.update(centers, sizes, ['Left'], 0.0) == [0]
+
+    # Lost past the timeout: the hand comes back under a new ID
+    assert first.update(centers, sizes, ['Left'], 1.0) == [1]
+    first.reset()
+    assert first.update(centers, sizes, ['Left'], 2.0) == [0]
+
+
+def test_far_detection_starts_a_new_track():
+    tracker = HandTracker()
+    sizes = np.array([100.0])
+    assert tracker.update(np.array([[100.0, 100.0]]), sizes, ['Left'], 0.0) == [0]
+    assert tracker.update(np.array([[600.0, 400.0]]), sizes, ['Left'], 0.03) == [1]
@@ -0,0 +1,224 @@
+"""
+Hand Tracking
+Associates detections with persistent track IDs across frames
+"""
+
+import itertools
+import math
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Problems with at most this many rows or columns (and a few more on the
+# other side) are solved by enumerating permutations instead of Hungarian
+SMALL_ASSIGNMENT = 3
+SMALL_ASSIGNMENT_SPAN = 8
+
+# Problems with at most this many permutations are scored on Python floats
+PYTHON_PERMUTATIONS = 24
+
+# (rows, cols) -> (permutations, rows) column choices, built once per shape,
+# as an array and as a list of tuples
+_PERMUTATIONS: Dict[Tuple[int, int], Tuple[np.ndarray, List[Tuple[int, ...]]]] = {}
+
+
+def _small_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """Best assignment of a small (rows <= cols) matrix by scoring every permutation"""
+    rows, cols = cost.shape
+    permutations = _PERMUTATIONS.get((rows, cols))
+    if permutations is None:
+        choices = list(itertools.permutations(range(cols), rows))
+        permutations = _PERMUTATIONS[(rows, cols)] = (np.array(choices, dtype=np.intp), choices)
+    choices, choice_list = permutations
+    if len(choice_list) <= PYTHON_PERMUTATIONS:
+        values = cost.tolist()
+        best = min(choice_list, key=lambda cs: sum(row[c] for row, c in zip(values, cs)))
+    else:
+        totals = cost[np.arange(rows), choices].sum(axis=1)
+        best = choices[int(np.argmin(totals))].tolist()
+    return list(enumerate(best))
+
+
+def linear_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment for a rectangular matrix
+
+    Small problems (the usual one or two hands) are solved exactly by
+    enumerating permutations; larger ones use the Hungarian algorithm.
+
+    Args:
+        cost: (rows, cols) cost matrix
+
+    Returns:
+        List of (row, col) pairs, one per row or column (whichever is fewer)
+    """
+    rows, cols = cost.shape
+    if rows == 0 or cols == 0:
+        return []
+    if rows > cols:
+        return sorted((r, c) for c, r in linear_assignment(cost.T))
+    if rows == 1:
+        return [(0, int(np.argmin(cost[0])))]
+    if rows <= SMALL_ASSIGNMENT and cols <= SMALL_ASSIGNMENT_SPAN:
+        return _small_assignment(cost)
+
+    # Shortest augmenting path with potentials, 1-based with a dummy column 0
+    inf = float('inf')
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    match = np.zeros(cols + 1, dtype=np.int64)  # match[col] = row
+    way = np.zeros(cols + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        match[0] = row
+        col0 = 0
+        min_v = np.full(cols + 1, inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            reduced = cost[row0 - 1] - u[row0] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_v[1:])
+            min_v[1:][better] = reduced[better]
+            way[1:][better] = col0
+
+            candidates = np.where(free, min_v[1:], inf)
+            col1 = int(np.argmin(candidates)) + 1
+            delta = candidates[col1 - 1]
+
+            u[match[used]] += delta
+            v[used] -= delta
+            min_v[1:][free] -= delta
+
+            col0 = col1
+            if match[col0] == 0:
+                break
+
+        # Augment along the path
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    return sorted((int(match[c]) - 1, c - 1) for c in range(1, cols + 1) if match[c])
+
+
+class Track:
+    """One persistent hand with its own state slot"""
+
+    def __init__(self, track_id: int, center: Tuple[float, float], size: float,
+                 handedness: str, timestamp: float, trail_length: int = 30):
+        self.id = track_id
+        self.center = center
+        self.size = size
+        self.handedness = handedness
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.hits = 1
+
+        # Per-track state: trail, gesture history and free-form caches
+        self.trail = deque(maxlen=trail_length)
+        self.gestures = deque(maxlen=10)
+        self.state: Dict[str, Any] = {}
+
+    def update(self, center: Tuple[float, float], size: float, handedness: str, timestamp: float):
+        self.center = center
+        self.size = size
+        self.handedness = handedness
+        self.last_seen = timestamp
+        self.hits += 1
+
+
+class HandTracker:
+    """Matches each frame's hands to tracks by center distance with optimal assignment"""
+
+    def __init__(self, max_distance: float = 0.6, handedness_penalty: float = 0.25,
+                 timeout: float = 0.5):
+        """
+        Initialize tracker
+
+        Args:
+            max_distance: Largest match distance, in units of the track's box diagonal
+            handedness_penalty: Cost added when handedness labels disagree
+            timeout: Seconds a lost track is kept before it expires
+        """
+        self.max_distance = max_distance
+        self.handedness_penalty = handedness_penalty
+        self.timeout = timeout
+        self.tracks: Dict[int, Track] = {}
+        self._ids = itertools.count()
+
+    def update(self, centers: Sequence[Tuple[float, float]], sizes: Sequence[float],
+               handedness: List[str], timestamp: float) -> List[int]:
+        """
+        Associate detections with tracks
+
+        Args:
+            centers: (x, y) center per hand, e.g. pixels from landmark_features.hand_extents
+            sizes: Box diagonal per hand in the same unit
+            handedness: Label per hand
+            timestamp: Frame time in seconds
+
+        Returns:
+            Track ID per detection (counted from 0 per tracker)
+        """
+        # Tracks still alive; the dict is only pruned when some have expired
+        cutoff = timestamp - self.timeout
+        tracks = list(self.tracks.values())
+        for track in tracks:
+            if track.last_seen < cutoff:
+                self._expire(timestamp)
+                tracks = list(self.tracks.values())
+                break
+        assigned: List[Optional[Track]] = [None] * len(centers)
+
+        if tracks and len(centers):
+            # Distance in units of each track's box size, plus the label penalty.
+            # A frame has a handful of hands, so the matrix is built on Python floats
+            penalty = self.handedness_penalty
+            cost, nearest = [], []
+            for (x, y), label in zip(centers, handedness):
+                row = []
+                for track in tracks:
+                    tx, ty = track.center
+                    row.append(math.hypot(x - tx, y - ty) / track.size
+                               + (penalty if label != track.handedness else 0.0))
+                cost.append(row)
+                nearest.append(row.index(min(row)))
+            # When no two detections share a cheapest track, those tracks are
+            # the optimal assignment: it sums each row's minimum
+            if len(set(nearest)) == len(nearest):
+                pairs = enumerate(nearest)
+            else:
+                pairs = linear_assignment(np.array(cost))
+            max_distance = self.max_distance
+            for det, trk in pairs:
+                if cost[det][trk] <= max_distance:
+                    assigned[det] = tracks[trk]
+
+        ids = []
+        for track, center, size, label in zip(assigned, centers, sizes, handedness):
+            center, size = tuple(center), max(size, 1.0)
+            if track is None:
+                track = Track(next(self._ids), center, size, label, timestamp)
+                self.tracks[track.id] = track
+            else:
+                track.update(center, size, label, timestamp)
+            ids.append(track.id)
+        return ids
+
+    def _expire(self, timestamp: float):
+        """Drop tracks not seen within the timeout"""
+        cutoff = timestamp - self.timeout
+        for track_id in [tid for tid, t in self.tracks.items() if t.last_seen < cutoff]:
+            del self.tracks[track_id]
+
+    def active_ids(self) -> List[int]:
+        return list(self.tracks)
+
+    def reset(self):
+        """Drop every track; IDs start from 0 again"""
+        self.tracks.clear()
+        self._ids = itertools.count()
@@ -0,0 +1,241 @@
+"""
+Offline Video Processing
+Shards a recorded video into segments and runs one HandDetector per worker process
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import multiprocessing as mproc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def get_video_info(path: str) -> Tuple[int, float]:
+    """Return (frame count, fps) of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return total, fps
+
+
+def plan_segments(total_frames: int, workers: int,
+                  segment_frames: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split [0, total_frames) into contiguous segments
+
+    Args:
+        total_frames: Number of frames in the video
+        workers: Number of worker processes
+        segment_frames: Frames per segment (default: ~4 segments per worker)
+
+    Returns:
+        List of (start, end) frame ranges
+    """
+    if total_frames <= 0:
+        return []
+    if not segment_frames:
+        segment_frames = max(1, -(-total_frames // (workers * 4)))
+    return [(start, min(start + segment_frames, total_frames))
+            for start in range(0, total_frames, segment_frames)]
+
+
+def _seek(cap: cv2.VideoCapture, frame_index: int):
+    """Position a freshly opened capture at frame_index, grabbing forward when seeking is inexact"""
+    if frame_index <= 0:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != frame_index:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in range(frame_index):
+            if not cap.grab():
+                break
+
+
+def _seeks_exactly(path: str, frame_index: int) -> bool:
+    """Whether the backend lands exactly on frame_index when seeking this file"""
+    cap = cv2.VideoCapture(path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        return int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_index
+    finally:
+        cap.release()
+
+
+def _process_segment(task: Dict) -> str:
+    """Worker: detect hands on one segment and write its arrays to an .npz file"""
+    from hand_detection import HandDetector
+
+    start, end = task['start'], task['end']
+    warmup_start = max(0, start - task['warmup_frames'])
+
+    cap = cv2.VideoCapture(task['path'])
+    _seek(cap, warmup_start)
+    detector = HandDetector(**task['detector_kwargs'])
+
+    frame_index = []
+    hand_counts = []
+    landmarks = []
+    handedness = []
+    confidence = []
+    gesture = []
+    gesture_confidence = []
+
+    for index in range(warmup_start, end):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if task['flip']:
+            frame = cv2.flip(frame, 1)
+        # Media time, so smoothing and motion do not depend on decode speed
+        _, hands = detector.detect_hands(frame, index / task['fps'])
+
+        # Warm-up frames only prime the tracker; the previous segment owns them
+        if index < start:
+            continue
+
+        frame_index.append(index)
+        hand_counts.append(len(hands))
+        if hands:
+            landmarks.append(detector.last_features.landmarks)
+            for hand in hands:
+                handedness.append(hand['handedness'])
+                confidence.append(hand['confidence'])
+                gesture.append(hand['gesture']['name'])
+                gesture_confidence.append(hand['gesture']['confidence'])
+
+    cap.release()
+
+    out_path = os.path.join(task['out_dir'], f"segment_{start:09d}.npz")
+    np.savez(
+        out_path,
+        frame_index=np.array(frame_index, dtype=np.int64),
+        hand_counts=np.array(hand_counts, dtype=np.int32),
+        landmarks=(np.concatenate(landmarks) if landmarks
+                   else np.zeros((0, 21, 3), dtype=np.float32)),
+        handedness=np.array(handedness, dtype='U5'),
+        confidence=np.array(confidence, dtype=np.float32),
+        gesture=np.array(gesture, dtype='U32'),
+        gesture_confidence=np.array(gesture_confidence, dtype=np.float32),
+    )
+    return out_path
+
+
+def merge_segments(segment_paths: List[str], output: str, fps: float) -> Dict[str, int]:
+    """Concatenate segment files in frame order into one .npz file"""
+    keys = ['frame_index', 'hand_counts', 'landmarks', 'handedness',
+            'confidence', 'gesture', 'gesture_confidence']
+    parts = {key: [] for key in keys}
+    for path in segment_paths:
+        with np.load(path) as data:
+            for key in keys:
+                parts[key].append(data[key])
+
+    merged = {key: np.concatenate(values) for key, values in parts.items()}
+    # hand_offsets[i]:hand_offsets[i + 1] are the hands of frame i
+    merged['hand_offsets'] = np.concatenate([[0], np.cumsum(merged['hand_counts'])]).astype(np.int64)
+    merged['timestamp'] = merged['frame_index'] / fps
+    np.savez(output, **merged)
+
+    return {'frames': len(merged['frame_index']), 'hands': len(merged['landmarks'])}
+
+
+def process_video(path: str, output: str, workers: Optional[int] = None,
+                  segment_frames: Optional[int] = None, warmup_frames: int = 15,
+                  flip: bool = False, detector_kwargs: Optional[Dict] = None) -> Dict:
+    """
+    Detect hands in a video file using a pool of worker processes
+
+    Args:
+        path: Input video file
+        output: Destination .npz file
+        workers: Worker processes (default: CPU count)
+        segment_frames: Frames per segment (default: ~4 segments per worker;
+            one per worker when the file cannot be seeked exactly)
+        warmup_frames: Frames decoded before each segment to prime tracking
+        flip: Mirror frames like the live app does
+        detector_kwargs: Extra HandDetector arguments
+
+    Returns:
+        Summary dict with frame/hand counts and throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    total_frames, fps = get_video_info(path)
+    segments = plan_segments(total_frames, workers, segment_frames)
+    if not segments:
+        raise ValueError(f"No frames in video: {path}")
+    if len(segments) > workers and not _seeks_exactly(path, segments[len(segments) // 2][0]):
+        # Without exact seeks every segment grabs from frame 0, so short
+        # segments would cost O(frames^2); one contiguous range per worker
+        # keeps the total linear
+        segments = plan_segments(total_frames, workers, -(-total_frames // workers))
+
+    out_dir = tempfile.mkdtemp(prefix="hand_segments_")
+    tasks = [{
+        'path': path,
+        'start': start,
+        'end': end,
+        'warmup_frames': warmup_frames,
+        'fps': fps,
+        'flip': flip,
+        'out_dir': out_dir,
+        'detector_kwargs': detector_kwargs or {},
+    } for start, end in segments]
+
+    start_time = time.time()
+    try:
+        # MediaPipe graphs are not fork-safe, so workers are spawned fresh
+        context = mproc.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            segment_paths = list(pool.map(_process_segment, tasks))
+        summary = merge_segments(segment_paths, output, fps)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    elapsed = time.time() - start_time
+    summary.update({
+        'segments': len(segments),
+        'workers': workers,
+        'seconds': elapsed,
+        'fps': summary['frames'] / elapsed if elapsed > 0 else 0.0,
+    })
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline hand detection on a video file")
+    parser.add_argument("video", help="Input video file")
+    parser.add_argument("output", help="Output .npz file")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = CPU count)")
+    parser.add_argument("--segment-frames", type=int, default=0, help="Frames per segment (0 = auto)")
+    parser.add_argument("--warmup", type=int, default=15, help="Warm-up frames before each segment")
+    parser.add_argument("--flip", action="store_true", help="Mirror frames before detection")
+    parser.add_argument("--max-hands", type=int, default=2, help="Maximum hands per frame")
+
+    args = parser.parse_args()
+
+    summary = process_video(
+        args.video, args.output,
+        workers=args.workers or None,
+        segment_frames=args.segment_frames or None,
+        warmup_frames=args.warmup,
+        flip=args.flip,
+        detector_kwargs={'max_hands': args.max_hands},
+    )
+
+    print(f"\n{'='*60}")
+    print("Offline Processing Summary:")
+    print(f"Frames: {summary['frames']}")
+    print(f"Hands: {summary['hands']}")
+    print(f"Segments: {summary['segments']} on {summary['workers']} workers")
+    print(f"Duration: {summary['seconds']:.1f}s ({summary['fps']:.1f} frames/s)")
+    print(f"{'='*60}\n")